@@ -1,5 +1,5 @@
 import tkinter as tk
-from tkinter import ttk, scrolledtext, messagebox
+from tkinter import ttk, scrolledtext
 import threading
 import base64
 import automic_rest as automic
@@ -7,6 +7,8 @@ import copy
 import re
 import os
 import json
+import functools
+from automic_engine import CreationEngine, concurrency_for
 
 #----------------------------
 # Helpers
@@ -204,6 +206,10 @@ class JobCreatorApp:
         if opts and self.client_var.get() not in opts: self.client_var.set(opts[0])
 
     def log(self,msg):
+        # Called from the worker thread; Tk widgets are only touched on the UI thread
+        self.root.after(0, self.append_log, msg)
+
+    def append_log(self,msg):
         self.log_box.config(state='normal'); self.log_box.insert('end',msg+'\n'); self.log_box.see('end'); self.log_box.config(state='disabled')
 
     def start(self):
@@ -255,26 +261,26 @@ class JobCreatorApp:
         default_login = extract_default_login(tmpl_jobs)
 
         # Loop create
-        jobps = []
-        for p in pairs:
-            jn = p['jobname']
-            if tmpl_jobp:
-                name_jobp = f"{base_jobp}_{jn}"
-                jobps.append(name_jobp)
-                njp = copy.deepcopy(tmpl_jobp)
-                njp['general_attributes']['name'] = name_jobp
-                for wf in njp.get('workflow_definitions', []):
-                    if wf.get('object_name') == tmpl_jobs['general_attributes']['name']:
-                        wf['object_name'] = f"{base_jobs}_{jn}"
-                res_p = automic.postObjects(client_id=cid, body={'total':1,'data':{'jobp':njp},'path':f'AUTOMATION_JOBS/{user}/{armt}','client':cid,'hasmore':False})
-                self.log(f"JOBP: {name_jobp}" if res_p.status==None else f"FAIL JOBP: {name_jobp} ({res_p.status})")
+        path = f'AUTOMATION_JOBS/{user}/{armt}'
 
-            name_jobs = f"{base_jobs}_{jn}"
+        def post(kind, name, obj):
+            res = automic.postObjects(client_id=cid, body={'total':1,'data':{kind.lower():obj},'path':path,'client':cid,'hasmore':False})
+            return res.status==None, res.status
+
+        def build_jobp(name_jobp, jn):
+            njp = copy.deepcopy(tmpl_jobp)
+            njp['general_attributes']['name'] = name_jobp
+            for wf in njp.get('workflow_definitions', []):
+                if wf.get('object_name') == tmpl_jobs['general_attributes']['name']:
+                    wf['object_name'] = f"{base_jobs}_{jn}"
+            return njp
+
+        def build_jobs(name_jobs, jn, p):
             # Create JOBS_R3
             login_val = f"LOGIN_R3_060_{p.get('login', default_login)}"
             if cid == 1111:
                 script = [
-                    f":INC BSH_XXXX_INC_MIGRATION_SIMULATION WAIT_TIME = \"<Random number ...>\" ,NOFOUND=IGNORE",
+                    ":INC BSH_XXXX_INC_MIGRATION_SIMULATION WAIT_TIME = \"<Random number ...>\" ,NOFOUND=IGNORE",
                     f":PUT_ATT JOB_NAME= \"{jn}\"",
                     f":PUT_ATT LOGIN='{login_val}'",
                     f"R3_ACTIVATE_REPORT REPORT='{p['program']}',VARIANT='{p['variant']}',COPIES=1,EXPIR=8,LINE_COUNT=65,LINE_SIZE=80,LAYOUT=X_FORMAT,DATA_SET=LIST1S,TYPE=TEXT"
@@ -289,10 +295,25 @@ class JobCreatorApp:
             for proc in nj.get('scripts', []):
                 if 'process' in proc:
                     proc['process'] = script
-            res_j = automic.postObjects(client_id=cid, body={'total':1,'data':{'jobs':nj},'path':f'AUTOMATION_JOBS/{user}/{armt}','client':cid,'hasmore':False})
-            self.log(f"JOBS: {name_jobs}" if res_j.status==None else f"FAIL JOBS: {name_jobs} ({res_j.status})")
+            return nj
+
+        # JOBP then JOBS within a pair, as before; pairs run in parallel
+        jobps = []
+        units = []
+        for p in pairs:
+            jn = p['jobname']
+            unit = []
+            if tmpl_jobp:
+                name_jobp = f"{base_jobp}_{jn}"
+                jobps.append(name_jobp)
+                unit.append(('JOBP', name_jobp, functools.partial(build_jobp, name_jobp, jn)))
+            name_jobs = f"{base_jobs}_{jn}"
+            unit.append(('JOBS', name_jobs, functools.partial(build_jobs, name_jobs, jn, p)))
+            units.append(unit)
+        engine = CreationEngine(post, max_workers=concurrency_for(env, self.config), log=self.log)
+        engine.run(units, total=sum(len(u) for u in units))
 
-        self.run_btn.config(state='normal')
+        self.root.after(0, lambda: self.run_btn.config(state='normal'))
         # Create main jobplan
         is_predecessor_var = self.is_predecessor_var.get()
         if create_main and main_name and tmpl_jobp:
@@ -353,7 +374,7 @@ class JobCreatorApp:
             self.log(f"MAIN JOBP: {main_name}" if resp_main.status==None else f"FAIL MAIN JOBP: {main_name} ({resp_main.status})")
 
         self.log("All done.")
-        self.run_btn.config(state='normal')
+        self.root.after(0, lambda: self.run_btn.config(state='normal'))
 if __name__ == '__main__':
     root = tk.Tk()
     JobCreatorApp(root)
@@ -1,84 +1,107 @@
 import tkinter as tk
-from tkinter import ttk, scrolledtext, messagebox, font, filedialog
+from tkinter import ttk, scrolledtext, messagebox, filedialog
+import importlib
 import threading
 import base64
-import automic_rest as automic
-import copy
-import re
 import os
 import json
 import sys
-import pandas as pd
-from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor, as_completed
-import requests  # Added for handling HTTP errors
+from contextlib import ExitStack
+# Start-up only loads the light modules below. The REST client (requests,
+# aiohttp) is imported on first use and preloaded once the window is up;
+# pandas/openpyxl only when a file is read or exported. Check with
+# benchmarks/import_profile.py.
+from automic_bulk import BulkCreator, expected_objects
+from automic_engine import MAIN_FAN_OUT, POST_BATCH_SIZE, CreationError, concurrency_for
+from automic_limits import limiter_for
+from automic_journal import RUNS_DIR, RunJournal
+from automic_metrics import Metrics
+from automic_names import name_rules_for
+from automic_cache import TemplateCache, TTLCache
+from automic_pairs import iter_pairs_text, iter_pairs_file, estimate_pairs_file, PAIRS_FILE_TYPES
+from automic_usage import USAGE_COLUMNS, ExecutionResolver, UsageStore, iter_usage, usage_rows
+from automic_log import LogSink
+from automic_export import EXPORT_FILE_TYPES, ExportCancelled, export_store
+from automic_index import UsageIndex, index_settings
+from automic_graph import CRAWL_DEPTH, CRAWL_MAX_NODES, GRAPH_FILE_TYPES, crawl_usage
+from automic_fanout import ENV_CLIENTS, FANOUT_COLUMNS, fan_out_usage, fanout_rows, parse_targets
+
+PRELOAD_MODULES = ('automic_session', 'automic_async', 'aiohttp')
+
+
+def preload_modules():
+    """Import the REST client ahead of the first request, off the UI thread."""
+    for name in PRELOAD_MODULES:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            pass  # aiohttp is optional
 
 #----------------------------
-# Helpers for JobCreatorApp
+# Progress panel
 #----------------------------
+class ProgressPanel:
+    """Progress bar and live metrics line (rate, ETA, latency) for one run."""
+    TICK_MS = 500
 
-def sanitize_string(s):
-    s = re.sub(r'^[^0-9A-Za-z_]+', '', s)
-    return re.sub(r'[^0-9A-Za-z_]', '_', s)
-
-def parse_flexible_pairs(data):
-    headers_by_length = {
-        1: ["jobp"],
-        3: ["jobname", "program", "variant"],
-        4: ["jobname", "program", "variant", "user"],
-        5: ["jobname", "program", "variant", "user", "language"],
-        6: ["jobname", "program", "variant", "user", "language", "extra"]
-    }
-    parsed = []
-    for line in data.strip().splitlines():
-        line = line.strip()
-        if not line:  # Skip blank lines
-            continue
-        parts = line.split()
-        n = len(parts)
-        if n == 2:
-            program, variant = parts
-            jobname = f"C_{sanitize_string(program)}_{sanitize_string(variant)}"
-            parsed.append({"jobname": jobname, "program": program, "variant": variant, "isBSH": True})
-        elif n in headers_by_length:
-            parsed.append(dict(zip(headers_by_length[n], parts)))
+    def __init__(self, parent):
+        self.parent = parent
+        self.metrics = None
+        self.frame = ttk.Frame(parent)
+        self.frame.columnconfigure(0, weight=1)
+        self.bar = ttk.Progressbar(self.frame, mode='determinate')
+        self.bar.grid(row=0, column=0, sticky='ew')
+        self.export_btn = ttk.Button(self.frame, text='Export Metrics...', command=self.export, state='disabled')
+        self.export_btn.grid(row=0, column=1, padx=(5, 0))
+        self.label = ttk.Label(self.frame, text='', anchor='w')
+        self.label.grid(row=1, column=0, columnspan=2, sticky='ew')
+
+    def grid(self, **kw):
+        self.frame.grid(**kw)
+
+    def attach(self, metrics):
+        """Follow `metrics` until it finishes; call on the UI thread."""
+        self.metrics = metrics
+        self.export_btn.config(state='normal')
+        self.bar.stop()
+        if metrics.total:
+            self.bar.config(mode='determinate', maximum=metrics.total, value=0)
+        else:
+            self.bar.config(mode='indeterminate')
+            self.bar.start(10)
+        self.tick(metrics)
+
+    def tick(self, metrics):
+        if metrics is not self.metrics:
+            return  # a newer run took over the panel
+        if metrics.total:
+            self.bar.config(maximum=metrics.total, value=metrics.done)
+        self.label.config(text=metrics.summary())
+        if metrics.finished:
+            self.bar.stop()
+            self.bar.config(mode='determinate', maximum=max(1, metrics.total or 0), value=metrics.total or 1)
         else:
-            parsed.append({f"col_{i+1}": v for i, v in enumerate(parts)})
-    print(parsed)
-    return parsed
-
-def extract_default_login(template_jobs):
-    for proc in template_jobs.get('scripts', []):
-        if 'process' in proc:
-            for line in proc['process']:
-                m = re.match(r":PUT_ATT\s+LOGIN\s*=\s*'([^']+)'", line)
-                if m:
-                    return m.group(1)
-    return 'LOGIN_R3_060_SY-BATCH-PM'
+            self.parent.after(self.TICK_MS, self.tick, metrics)
+
+    def export(self):
+        if self.metrics is None:
+            return
+        path = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("JSON Files", "*.json")], title="Export metrics")
+        if path:
+            try:
+                self.metrics.export(path)
+            except OSError as e:
+                messagebox.showerror("Export Failed", f"Could not write metrics:\n{e}")
 
 #----------------------------
 # JobCreatorApp
 #----------------------------
-import tkinter as tk
-from tkinter import ttk, scrolledtext, messagebox, font, filedialog
-import threading
-import base64
-import automic_rest as automic
-import copy
-import re
-import os
-import json
-import sys
-import pandas as pd
-from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor, as_completed
-import requests
-import uuid
-
-# ... (Existing helper functions: sanitize_string, parse_flexible_pairs, extract_default_login remain unchanged)
+# Pair parsing lives in automic_pairs, object building in automic_engine, bulk runs in automic_bulk
 
 class JobCreatorApp:
     CONFIG_PATH = os.path.join(os.path.expanduser('~'), '.automic_tools.json')
+    LOG_TICK_MS = 100
+    LOG_MAX_LINES = 5000  # older lines stay in the rotating log file
 
     def __init__(self, parent, env_var, client_var, entries, client_map):
         self.parent = parent
@@ -89,8 +112,12 @@ class JobCreatorApp:
         self.jobs_list = []  # Store created job names
         self.jobps_list = []  # Store created job plan names
         self.load_config()
+        self.cancel_event = threading.Event()
+        self.templates = TemplateCache(ttl=self.config.get('TEMPLATE_CACHE_TTL', 900))
+        self.log_sink = LogSink()
         self.build_ui()
         self.populate_fields()
+        self.drain_log()
 
     def load_config(self):
         try:
@@ -100,7 +127,8 @@ class JobCreatorApp:
             self.config = {}
 
     def save_config(self):
-        data = {
+        data = dict(self.config)  # keep keys not edited in the UI, e.g. RATE_LIMITS
+        data.update({
             'ENV': self.env_var.get(),
             'CLIENT_ID': self.client_var.get(),
             'USERID': self.entries['USERID'].get(),
@@ -109,10 +137,13 @@ class JobCreatorApp:
             'template_job_armt': self.template_job_armt.get(),
             'template_joplan_armt': self.template_joplan_armt.get(),
             'PAIRS_DATA': self.pairs_text.get('1.0', 'end'),
+            'PAIRS_FILE': self.pairs_file_entry.get(),
             'CREATE_MAIN': self.create_main_var.get(),
             'JOBP_MAIN_NAME': self.jobp_main_entry.get(),
-            'IS_MAIN_JOBP': self.is_main_jobp_var.get()
-        }
+            'IS_MAIN_JOBP': self.is_main_jobp_var.get(),
+            'MAIN_LANES': self.lanes_var.get()
+        })
+        self.config = data
         with open(self.CONFIG_PATH, 'w') as f:
             json.dump(data, f)
 
@@ -125,10 +156,12 @@ class JobCreatorApp:
             if cfg.get(fld): getattr(self, fld).insert(0, cfg[fld])
         if cfg.get('PAIRS_DATA'):
             self.pairs_text.insert('1.0', cfg['PAIRS_DATA'])
+        self.pairs_file_entry.insert(0, cfg.get('PAIRS_FILE', ''))
         self.create_main_var.set(cfg.get('CREATE_MAIN', False))
         self.toggle_main_fields()
         self.jobp_main_entry.insert(0, cfg.get('JOBP_MAIN_NAME', ''))
         self.is_main_jobp_var.set(cfg.get('IS_MAIN_JOBP', True))
+        self.lanes_var.set(cfg.get('MAIN_LANES', 1))
 
     def build_ui(self):
         frm = ttk.Frame(self.parent, padding=15)
@@ -151,7 +184,13 @@ class JobCreatorApp:
         # Sequential option
         self.is_predecessor_var = tk.BooleanVar()
         self.predecessor_chk = ttk.Checkbutton(frm, text='Use Sequential Predecessors', variable=self.is_predecessor_var)
-        self.predecessor_chk.grid(row=1, column=2, columnspan=2, sticky='w')
+        self.predecessor_chk.grid(row=1, column=2, sticky='w')
+        # Parallel lanes: N sequential chains running side by side
+        self.lanes_frm = ttk.Frame(frm)
+        ttk.Label(self.lanes_frm, text='Parallel Lanes:').pack(side='left')
+        self.lanes_var = tk.IntVar(value=1)
+        ttk.Spinbox(self.lanes_frm, from_=1, to=50, width=4, textvariable=self.lanes_var).pack(side='left', padx=5)
+        self.lanes_frm.grid(row=1, column=3, sticky='w')
         self.main_label = ttk.Label(frm, text='Main JOBP Name:')
         self.main_entry = ttk.Entry(frm)
         self.jobp_main_entry = self.main_entry
@@ -167,18 +206,40 @@ class JobCreatorApp:
         self.pairs_text.bind("<Control-y>", lambda e: self.pairs_text.event_generate("<<Redo>>"))
         self.pairs_text.bind("<Control-Y>", lambda e: self.pairs_text.event_generate("<<Redo>>"))
         self.pairs_text.grid(row=3, column=1, columnspan=3, sticky='ew', padx=5)
+        # Pairs File (used instead of the box when set)
+        ttk.Label(frm, text='Pairs File:').grid(row=4, column=0, sticky='w', pady=(4, 0))
+        self.pairs_file_entry = ttk.Entry(frm)
+        self.pairs_file_entry.grid(row=4, column=1, columnspan=2, sticky='ew', padx=5, pady=(4, 0))
+        ttk.Button(frm, text='Browse...', command=self.browse_pairs_file).grid(row=4, column=3, sticky='w', padx=5, pady=(4, 0))
         # Run Button
-        self.run_btn = ttk.Button(frm, text='Create Jobs', command=self.start)
-        self.run_btn.grid(row=4, column=0, columnspan=4, pady=12)
+        run_frm = ttk.Frame(frm)
+        run_frm.grid(row=5, column=0, columnspan=4, pady=12)
+        self.run_btn = ttk.Button(run_frm, text='Create Jobs', command=self.start)
+        self.run_btn.pack(side='left', padx=5)
+        self.resume_btn = ttk.Button(run_frm, text='Resume Run...', command=self.resume)
+        self.resume_btn.pack(side='left', padx=5)
+        self.rollback_btn = ttk.Button(run_frm, text='Rollback Run...', command=self.rollback)
+        self.rollback_btn.pack(side='left', padx=5)
+        self.cancel_btn = ttk.Button(run_frm, text='Cancel', command=self.cancel, state='disabled')
+        self.cancel_btn.pack(side='left', padx=5)
+        # Existing objects in the target folder are always skipped; these
+        # choose whether to overwrite changed ones and whether to write at all
+        self.update_changed_var = tk.BooleanVar()
+        ttk.Checkbutton(run_frm, text='Update Changed Objects', variable=self.update_changed_var).pack(side='left', padx=5)
+        self.dry_run_var = tk.BooleanVar()
+        ttk.Checkbutton(run_frm, text='Dry Run (plan only)', variable=self.dry_run_var).pack(side='left', padx=5)
         # Output Log
-        ttk.Label(frm, text='Output:').grid(row=5, column=0, sticky='nw')
+        ttk.Label(frm, text='Output:').grid(row=6, column=0, sticky='nw')
         self.log_box = scrolledtext.ScrolledText(frm, height=10, state='disabled')
-        self.log_box.grid(row=5, column=1, columnspan=3, sticky='ew', padx=5)
+        self.log_box.grid(row=6, column=1, columnspan=3, sticky='ew', padx=5)
         # New Buttons for Copying Lists
         self.copy_jobs_btn = ttk.Button(frm, text='Copy JOBS List', command=self.copy_jobs_list)
-        self.copy_jobs_btn.grid(row=6, column=1, sticky='w', padx=5, pady=5)
+        self.copy_jobs_btn.grid(row=7, column=1, sticky='w', padx=5, pady=5)
         self.copy_jobps_btn = ttk.Button(frm, text='Copy JOBP List', command=self.copy_jobps_list)
-        self.copy_jobps_btn.grid(row=6, column=2, sticky='w', padx=5, pady=5)
+        self.copy_jobps_btn.grid(row=7, column=2, sticky='w', padx=5, pady=5)
+        # Progress, throughput and request metrics of the current run
+        self.progress = ProgressPanel(frm)
+        self.progress.grid(row=8, column=1, columnspan=3, sticky='ew', padx=5)
         frm.columnconfigure((1, 3), weight=1)
         self.toggle_main_fields()
 
@@ -187,13 +248,21 @@ class JobCreatorApp:
             self.main_label.grid()
             self.main_entry.grid()
             self.predecessor_chk.grid()
+            self.lanes_frm.grid()
             self.main_jobp_chk.grid()
         else:
             self.main_label.grid_remove()
             self.main_entry.grid_remove()
             self.predecessor_chk.grid_remove()
+            self.lanes_frm.grid_remove()
             self.main_jobp_chk.grid_remove()
 
+    def browse_pairs_file(self):
+        path = filedialog.askopenfilename(filetypes=PAIRS_FILE_TYPES, title="Select pairs file")
+        if path:
+            self.pairs_file_entry.delete(0, 'end')
+            self.pairs_file_entry.insert(0, path)
+
     def copy_jobs_list(self):
         """Copy the list of created job names to the clipboard."""
         if not self.jobs_list:
@@ -224,17 +293,108 @@ class JobCreatorApp:
         if opts and self.client_var.get() not in opts: self.client_var.set(opts[0])
 
     def log(self, msg):
-        self.log_box.config(state='normal')
-        self.log_box.insert('end', msg + '\n')
-        self.log_box.see('end')
-        self.log_box.config(state='disabled')
-        self.parent.update_idletasks()
-
-    def start(self):
+        """Safe from any thread; lines reach the widget on the next drain tick."""
+        self.log_sink.write(msg)
+
+    def drain_log(self):
+        lines = self.log_sink.drain(keep=self.LOG_MAX_LINES)
+        if lines:
+            self.log_box.config(state='normal')
+            self.log_box.insert('end', '\n'.join(lines) + '\n')
+            excess = int(self.log_box.index('end-1c').split('.')[0]) - 1 - self.LOG_MAX_LINES
+            if excess > 0:
+                self.log_box.delete('1.0', f'{excess + 1}.0')
+            self.log_box.see('end')
+            self.log_box.config(state='disabled')
+        self.parent.after(self.LOG_TICK_MS, self.drain_log)
+
+    def start(self, journal_path=None, task=None):
         self.run_btn.config(state='disabled')
-        threading.Thread(target=self.execute, daemon=True).start()
+        self.resume_btn.config(state='disabled')
+        self.rollback_btn.config(state='disabled')
+        self.cancel_event.clear()
+        self.cancel_btn.config(state='normal')
+        threading.Thread(target=task or self.execute, args=(journal_path,), daemon=True).start()
+
+    def finished(self):
+        """Back to idle; called from the worker thread."""
+        self.parent.after(0, lambda: self.run_btn.config(state='normal'))
+        self.parent.after(0, lambda: self.resume_btn.config(state='normal'))
+        self.parent.after(0, lambda: self.rollback_btn.config(state='normal'))
+        self.parent.after(0, lambda: self.cancel_btn.config(state='disabled'))
+
+    def cancel(self):
+        # Cooperative: no new pair starts, posts already sent finish first
+        self.cancel_event.set()
+        self.cancel_btn.config(state='disabled')
+        self.log("Cancelling: waiting for in-flight requests to finish...")
+
+    def resume(self):
+        path = filedialog.askopenfilename(initialdir=RUNS_DIR, filetypes=[("Run journals", "*.jsonl")], title="Select run to resume")
+        if path:
+            self.start(path)
+
+    def rollback(self):
+        path = filedialog.askopenfilename(initialdir=RUNS_DIR, filetypes=[("Run journals", "*.jsonl")], title="Select run to roll back")
+        if not path:
+            return
+        journal = RunJournal(path)
+        count, folder = len(journal.posted), journal.settings.get('folder')
+        if not count:
+            messagebox.showinfo("Rollback", "The journal lists no objects created by this run that are still there.")
+            return
+        if not self.dry_run_var.get() and not messagebox.askyesno(
+                "Rollback", f"Delete the {count} objects this run created in {folder}?\n\nObjects that were already there are kept."):
+            return
+        self.start(path, self.execute_rollback)
+
+    def execute_rollback(self, journal_path):
+        from automic_session import get_session
+        from automic_rollback import Rollback
+        try:
+            env = self.env_var.get().strip()
+            cid = self.client_var.get().strip()
+            user = self.entries['USERID'].get().strip()
+            pwd = self.entries['PASSWORD'].get().strip()
+            dry_run = self.dry_run_var.get()
+            journal = RunJournal(journal_path)
+            cfg = journal.settings
+            if (cfg.get('env'), cfg.get('client')) != (env, cid) or not user or not pwd:
+                msg = f"This run was made on {cfg.get('env')} client {cfg.get('client')}; select them and enter your credentials first."
+                self.log(f"Error: {msg}")
+                self.parent.after(0, lambda: messagebox.showerror("Error", msg))
+                return
+            workers = concurrency_for(env, self.config)
+            limiter = limiter_for(env, self.config, cid)
+            session = get_session(env, int(cid), user, pwd, pool_size=workers, limiter=limiter)
+            metrics = Metrics('rollback', len(journal.posted))
+            self.parent.after(0, lambda: self.progress.attach(metrics))
+            rollback = Rollback(session, journal, max_workers=workers, log=self.log, on_result=lambda r: metrics.advance(r.ok))
+            try:
+                with session.observed(metrics):
+                    rollback.run(cancelled=self.cancel_event.is_set, dry_run=dry_run)
+                    if not dry_run and not self.cancel_event.is_set():
+                        rollback.verify()
+            except CreationError as e:
+                msg = str(e)
+                self.log(f"Error: {msg}")
+                self.parent.after(0, lambda: messagebox.showerror("Error", msg))
+                return
+            finally:
+                metrics.finish()
+                self.log(f"Metrics: {metrics.summary()}")
+                journal.close()
+            state = 'cancelled' if self.cancel_event.is_set() else 'done'
+            self.log(f"Rollback {state} ({limiter.summary()}). {journal.summary()}")
+        except Exception as e:
+            msg = str(e)
+            self.log(f"Unexpected error: {msg}")
+            self.parent.after(0, lambda: messagebox.showerror("Error", f"An unexpected error occurred: {msg}"))
+        finally:
+            self.finished()
 
-    def execute(self):
+    def execute(self, journal_path=None):
+        from automic_session import get_session
         try:
             self.jobs_list = []  # Reset jobs list
             self.jobps_list = []  # Reset job plans list
@@ -242,277 +402,132 @@ class JobCreatorApp:
             try:
                 cid = int(self.client_var.get().strip())
             except ValueError:
-                self.parent.after(0, lambda: self.log("Error: Invalid Client ID"))
+                self.log("Error: Invalid Client ID")
                 self.parent.after(0, lambda: messagebox.showerror("Error", "Invalid Client ID. Please enter a numeric value."))
                 return
 
             user = self.entries['USERID'].get().strip()
             pwd = self.entries['PASSWORD'].get().strip()
             armt = self.entries['ARMT_NO'].get().strip()
-            api_url = f'https://rb-{env}-api.bosch.com'
             t_job = self.template_job_armt.get().strip()
             t_joplan = self.template_joplan_armt.get().strip()
             raw = self.pairs_text.get('1.0', 'end')
+            pairs_file = self.pairs_file_entry.get().strip()
             create_main = self.create_main_var.get()
-            main_name = self.jobp_main_entry.get().strip()
+            main_name = self.jobp_main_entry.get().strip() if create_main else None
             is_main_jobp = self.is_main_jobp_var.get()
+            sequential = self.is_predecessor_var.get()
+            try:
+                lanes = max(1, int(self.lanes_var.get()))
+            except (tk.TclError, ValueError):
+                lanes = 1
+            fan_out = self.config.get('MAIN_FAN_OUT', MAIN_FAN_OUT)
+            dry_run = self.dry_run_var.get()
             if not user or not pwd:
-                self.parent.after(0, lambda: self.log("Error: User ID and Password are required"))
+                self.log("Error: User ID and Password are required")
                 self.parent.after(0, lambda: messagebox.showerror("Error", "Please provide both User ID and Password"))
                 return
 
-            self.save_config()
-
-            # Authenticate
-            auth = base64.b64encode(f"{user}:{pwd}".encode()).decode()
-            try:
-                automic.connection(url=api_url, auth=auth, noproxy=True, sslverify=False)
-            except requests.exceptions.HTTPError as e:
-                self.parent.after(0, lambda: self.log(f"Authentication failed: {str(e)}"))
-                self.parent.after(0, lambda: messagebox.showerror("Authentication Error", f"Failed to authenticate: {str(e)}. Please check your credentials."))
-                return
-
-            # Fetch jobplan template
-            tmpl_jobp = None
-            base_jobp = ''
-            if t_joplan:
-                self.parent.after(0, lambda: self.log(f"Fetching jobplan {t_joplan}"))
-                try:
-                    rp = automic.getObjects(client_id=cid, object_name=t_joplan)
-                    if rp.status != 200:
-                        self.parent.after(0, lambda: self.log(f"Failed to fetch jobplan {t_joplan}: {rp.status}"))
-                        self.parent.after(0, lambda: messagebox.showerror("Error", f"Failed to fetch jobplan {t_joplan}: {rp.status}"))
-                        return
-                    if 'data' not in rp.response or 'jobp' not in rp.response['data']:
-                        self.parent.after(0, lambda: self.log(f"Error: Jobplan {t_joplan} not found or invalid response"))
-                        self.parent.after(0, lambda: messagebox.showerror("Error", f"Jobplan {t_joplan} not found or invalid response from server"))
-                        return
-                    tmpl_jobp = rp.response['data']['jobp']
-                    if cid == 1111:
-                        base_jobp = tmpl_jobp['general_attributes']['name'][:31]
-                    else:
-                        base_jobp = tmpl_jobp['general_attributes']['name'][:23]
-                except requests.exceptions.HTTPError as e:
-                    self.parent.after(0, lambda: self.log(f"HTTP error fetching jobplan {t_joplan}: {str(e)}"))
-                    self.parent.after(0, lambda: messagebox.showerror("HTTP Error", f"Failed to fetch jobplan {t_joplan}: {str(e)}"))
-                    return
-                except Exception as e:
-                    self.parent.after(0, lambda: self.log(f"Unexpected error fetching jobplan {t_joplan}: {str(e)}"))
-                    self.parent.after(0, lambda: messagebox.showerror("Error", f"Unexpected error fetching jobplan {t_joplan}: {str(e)}"))
+            if journal_path:
+                # Resume: everything but the credentials comes from the journal
+                journal = RunJournal(journal_path)
+                cfg = journal.settings
+                if (cfg.get('env'), cfg.get('client')) != (env, str(cid)):
+                    msg = f"This run was made on {cfg.get('env')} client {cfg.get('client')}; select them first."
+                    self.log(f"Error: {msg}")
+                    self.parent.after(0, lambda: messagebox.showerror("Error", msg))
                     return
-
-            # Fetch job template
-            if t_job:
-                self.parent.after(0, lambda: self.log(f"Fetching job {t_job}"))
-                try:
-                    rj = automic.getObjects(client_id=cid, object_name=t_job)
-                    if rj.status != 200:
-                        self.parent.after(0, lambda: self.log(f"Failed to fetch job {t_job}: {rj.status}"))
-                        self.parent.after(0, lambda: messagebox.showerror("Error", f"Failed to fetch job {t_job}: {rj.status}"))
-                        return
-                    if 'data' not in rj.response or 'jobs' not in rj.response['data']:
-                        self.parent.after(0, lambda: self.log(f"Error: Job {t_job} not found or invalid response"))
-                        self.parent.after(0, lambda: messagebox.showerror("Error", f"Job {t_job} not found or invalid response from server"))
-                        return
-                    tmpl_jobs = rj.response['data']['jobs']
-                    if cid == 1111:
-                        base_jobs = tmpl_jobs['general_attributes']['name'][:21]
-                    else:
-                        base_jobs = tmpl_jobs['general_attributes']['name'][:15]
-                except requests.exceptions.HTTPError as e:
-                    self.parent.after(0, lambda: self.log(f"HTTP error fetching job {t_job}: {str(e)}"))
-                    self.parent.after(0, lambda: messagebox.showerror("HTTP Error", f"Failed to fetch job {t_job}: {str(e)}"))
-                    return
-                except Exception as e:
-                    self.parent.after(0, lambda: self.log(f"Unexpected error fetching job {t_job}: {str(e)}"))
-                    self.parent.after(0, lambda: messagebox.showerror("Error", f"Unexpected error fetching job {t_job}: {str(e)}"))
-                    return
-
-                default_login = extract_default_login(tmpl_jobs)
-            pairs = parse_flexible_pairs(raw)
-
-            # Create jobplans and jobs
-            self.jobps_list = []  # Ensure list is reset
-            self.jobs_list = []   # Ensure list is reset
-        
-            if pairs[0].get("jobp"):
-                t_joplan = pairs[0]["jobp"]
-                self.parent.after(0, lambda: self.log(f"Fetching jobplan {t_joplan}"))
-                try:
-                    rp = automic.getObjects(client_id=cid, object_name=t_joplan)
-                    if rp.status != 200:
-                        self.parent.after(0, lambda: self.log(f"Failed to fetch jobplan {t_joplan}: {rp.status}"))
-                        self.parent.after(0, lambda: messagebox.showerror("Error", f"Failed to fetch jobplan {t_joplan}: {rp.status}"))
-                        return
-                    if 'data' not in rp.response or 'jobp' not in rp.response['data']:
-                        self.parent.after(0, lambda: self.log(f"Error: Jobplan {t_joplan} not found or invalid response"))
-                        self.parent.after(0, lambda: messagebox.showerror("Error", f"Jobplan {t_joplan} not found or invalid response from server"))
-                        return
-                    tmpl_jobp = rp.response['data']['jobp']
-                except requests.exceptions.HTTPError as e:
-                    self.parent.after(0, lambda: self.log(f"HTTP error fetching jobplan {t_joplan}: {str(e)}"))
-                    self.parent.after(0, lambda: messagebox.showerror("HTTP Error", f"Failed to fetch jobplan {t_joplan}: {str(e)}"))
-                    return
-                except Exception as e:
-                    self.parent.after(0, lambda: self.log(f"Unexpected error fetching jobplan {t_joplan}: {str(e)}"))
-                    self.parent.after(0, lambda: messagebox.showerror("Error", f"Unexpected error fetching jobplan {t_joplan}: {str(e)}"))
-                    return
-                for p in pairs:
-                    self.jobps_list.append(p['jobp'])
+                folder = cfg['folder']
+                t_job, t_joplan = cfg.get('job_template'), cfg.get('jobplan_template')
+                main_name, is_main_jobp, sequential = cfg.get('main_name'), cfg.get('main_contains_jobplans', True), cfg.get('sequential', False)
+                lanes, fan_out = cfg.get('lanes', 1), cfg.get('fan_out', MAIN_FAN_OUT)
+                # All pairs, so a main jobplan still lists every child; created ones are skipped
+                pairs, done, rebuild = journal.recorded_pairs(), journal.created(), journal.partial()
+                total = len(pairs)
+                self.log(f"Resuming {journal_path}: {journal.summary()}")
             else:
-                for p in pairs:
-                    jn = p['jobname']
-                    if tmpl_jobp:
-                        name_jobp = f"{base_jobp}_{jn}"
-                        self.jobps_list.append(name_jobp)
-                        njp = copy.deepcopy(tmpl_jobp)
-                        njp['general_attributes']['name'] = name_jobp
-                        for wf in njp.get('workflow_definitions', []):
-                            if wf.get('object_name') == tmpl_jobs['general_attributes']['name']:
-                                wf['object_name'] = f"{base_jobs}_{jn}"
-                        try:
-                            res_p = automic.postObjects(client_id=cid, body={'total':1,'data':{'jobp':njp},'path':f'AUTOMATION_JOBS/{user}/{armt}','client':cid,'hasmore':False})
-                            self.parent.after(0, lambda: self.log(f"JOBP: {name_jobp}" if res_p.status is None else f"FAIL JOBP: {name_jobp} ({res_p.status})"))
-                        except requests.exceptions.HTTPError as e:
-                            self.parent.after(0, lambda: self.log(f"HTTP error creating jobplan {name_jobp}: {str(e)}"))
-                            continue
-                        except Exception as e:
-                            self.parent.after(0, lambda: self.log(f"Unexpected error creating jobplan {name_jobp}: {str(e)}"))
-                            continue
-
-                    name_jobs = f"{base_jobs}_{jn}"
-                    self.jobs_list.append(name_jobs)
-                    login_val = f"LOGIN_R3_060_{p.get('login', default_login)}"
-                    if cid == 1111:
-                        script = [
-                            f":INC BSH_XXXX_INC_MIGRATION_SIMULATION WAIT_TIME = \"<Random number ...>\" ,NOFOUND=IGNORE",
-                            f":PUT_ATT JOB_NAME= \"{jn}\"",
-                            f":PUT_ATT LOGIN='{login_val}'",
-                            f"R3_ACTIVATE_REPORT REPORT='{p['program']}',VARIANT='{p['variant']}',COPIES=1,EXPIR=8,LINE_COUNT=65,LINE_SIZE=80,LAYOUT=X_FORMAT,DATA_SET=LIST1S,TYPE=TEXT"
-                        ]
-                    else:
-                        script = (
-                            ([f':PUT_ATT JOB_NAME= "{jn}"'] if not p.get('isBSH') else [])
-                            + [f"R3_ACTIVATE_REPORT REPORT='{p['program']}',VARIANT='{p['variant']}'"]
-                        )
-                    nj = copy.deepcopy(tmpl_jobs)
-                    nj['general_attributes']['name'] = name_jobs
-                    for proc in nj.get('scripts', []):
-                        if 'process' in proc:
-                            proc['process'] = script
-                    try:
-                        res_j = automic.postObjects(client_id=cid, body={'total':1,'data':{'jobs':nj},'path':f'AUTOMATION_JOBS/{user}/{armt}','client':cid,'hasmore':False})
-                        self.parent.after(0, lambda: self.log(f"JOBS: {name_jobs}" if res_j.status is None else f"FAIL JOBS: {name_jobs} ({res_j.status})"))
-                    except requests.exceptions.HTTPError as e:
-                        self.parent.after(0, lambda: self.log(f"HTTP error creating job {name_jobs}: {str(e)}"))
-                        continue
-                    except Exception as e:
-                        self.parent.after(0, lambda: self.log(f"Unexpected error creating job {name_jobs}: {str(e)}"))
-                        continue
-
-            # Create main jobplan
-            is_predecessor_var = self.is_predecessor_var.get()
-            if create_main and main_name and tmpl_jobp:
-                # self.jobps_list.append(main_name)
-                data = tmpl_jobp
-                start_node = next(obj for obj in data['workflow_definitions'] if obj['object_type'] == '<START>')
-                end_node = next(obj for obj in data['workflow_definitions'] if obj['object_type'] == '<END>')
-                new_defs = [start_node]
-                line_no = 2
-                if is_main_jobp:
-                    for jp in self.jobps_list:  # Exclude main jobplan
-                        new_node = {
-                            'line_number': line_no,
-                            'object_type': 'JOBP',
-                            'object_name': jp,
-                            'precondition_error_action': 'H',
-                            'predecessors': 1,
-                            'active': 1,
-                            'mrt_time': '000000',
-                            'childflags': '0000000000000000',
-                            'rollback_enabled': 1
-                        }
-                        if is_predecessor_var:
-                            new_node['row'] = 1
-                            new_node['column'] = line_no
-                        else:
-                            new_node['row'] = line_no - 1
-                            new_node['column'] = 2
-                        new_defs.append(new_node)
-                        line_no += 1
-                else:
-                    for j in self.jobs_list:  # Exclude main jobplan
-                        new_node = {
-                            'line_number': line_no,
-                            'object_type': 'JOBS',
-                            'object_name':j,
-                            'precondition_error_action': 'H',
-                            'predecessors': 1,
-                            'active': 1,
-                            'mrt_time': '000000',
-                            'childflags': '0000000000000000',
-                            'rollback_enabled': 1
-                        }
-                        if is_predecessor_var:
-                            new_node['row'] = 1
-                            new_node['column'] = line_no
-                        else:
-                            new_node['row'] = line_no - 1
-                            new_node['column'] = 2
-                        new_defs.append(new_node)
-                        line_no += 1
-                end_node['predecessors'] = line_no - 2
-                end_node['line_number'] = line_no
-                end_node['row'] = 1
-                if is_predecessor_var:
-                    end_node['column'] = line_no
+                self.save_config()
+                folder = f'AUTOMATION_JOBS/{user}/{armt}'
+                # Pairs are parsed lazily and checked 500 at a time while earlier ones post
+                if pairs_file:
+                    pairs, total = iter_pairs_file(pairs_file), estimate_pairs_file(pairs_file)
                 else:
-                    end_node['column'] = 3
-                new_defs.append(end_node)
-                data['workflow_definitions'] = new_defs
-
-                def gen_conditions(defs):
-                    conds = []
-                    for node in defs:
-                        ln = node['line_number']
-                        if 'predecessors' in node:
-                            preds = node.get('predecessors', [])
-                            if not is_predecessor_var:
-                                if node['object_type'] == '<END>': preds = list(range(2, preds + 2))
-                                else: preds = [1]
-                            else:
-                                preds = [ln - 1]
-                            for idx, p in enumerate(preds, 1):
-                                conds.append({'workflow_line_number': ln, 'line_number': idx, 'predecessor_line_number': p})
-                    return conds
-
-                data['line_conditions'] = gen_conditions(new_defs)
-                data['general_attributes']['name'] = main_name
-                body = {'total': 1, 'data': {'jobp': data}, 'path': f'AUTOMATION_JOBS/{user}/{armt}', 'client': cid, 'hasmore': False}
-                try:
-                    resp_main = automic.postObjects(client_id=cid, body=body)
-                    self.parent.after(0, lambda: self.log(f"MAIN JOBP: {main_name}" if resp_main.status is None else f"FAIL MAIN JOBP: {main_name} ({resp_main.status})"))
-                except requests.exceptions.HTTPError as e:
-                    self.parent.after(0, lambda: self.log(f"HTTP error creating main jobplan {main_name}: {str(e)}"))
-                    self.parent.after(0, lambda: messagebox.showerror("HTTP Error", f"Failed to create main jobplan {main_name}: {str(e)}"))
-                except Exception as e:
-                    self.parent.after(0, lambda: self.log(f"Unexpected error creating main jobplan {main_name}: {str(e)}"))
-                    self.parent.after(0, lambda: messagebox.showerror("Error", f"Unexpected error creating main jobplan {main_name}: {str(e)}"))
-
-            self.parent.after(0, lambda: self.log("All done."))
+                    pairs = list(iter_pairs_text(raw))
+                    total = len(pairs)
+                done = rebuild = ()
+                journal = None
+                if not dry_run:
+                    journal = RunJournal.start({
+                        'env': env, 'client': str(cid), 'user': user, 'folder': folder,
+                        'job_template': t_job, 'jobplan_template': t_joplan, 'main_name': main_name,
+                        'main_contains_jobplans': is_main_jobp, 'sequential': sequential,
+                        'lanes': lanes, 'fan_out': fan_out,
+                    })
+                    self.log(f"Journal: {journal.path}")
+
+            # Shared keep-alive session, pooled for the creation workers and
+            # throttled by the client's adaptive limiter
+            workers = concurrency_for(env, self.config)
+            limiter = limiter_for(env, self.config, cid)
+            session = get_session(env, cid, user, pwd, pool_size=workers, limiter=limiter)
+            metrics = Metrics('create', expected_objects(total, t_joplan, done, main_name))
+            self.parent.after(0, lambda: self.progress.attach(metrics))
+            creator = BulkCreator(session, folder, templates=self.templates, max_workers=workers, log=self.log, journal=journal,
+                                  on_result=lambda r: metrics.advance(r.ok),
+                                  batch_size=self.config.get('POST_BATCH_SIZE', POST_BATCH_SIZE),
+                                  name_rules=name_rules_for(cid, self.config))
+            try:
+                with session.observed(metrics):
+                    creator.load_templates(t_job, t_joplan)
+                    creator.run(pairs, main_name=main_name, main_contains_jobplans=is_main_jobp, sequential=sequential, done=done,
+                                check_changes=self.update_changed_var.get(), dry_run=dry_run, lanes=lanes, fan_out=fan_out,
+                                rebuild=rebuild, cancelled=self.cancel_event.is_set)
+            except CreationError as e:
+                msg = str(e)
+                self.log(f"Error: {msg}")
+                self.parent.after(0, lambda: messagebox.showerror("Error", msg))
+                return
+            finally:
+                metrics.finish()
+                self.log(f"Metrics: {metrics.summary()}")
+                if journal:
+                    journal.close()
+                    try:
+                        metrics.export(os.path.splitext(journal.path)[0] + '.metrics.json')
+                    except OSError as e:
+                        self.log(f"Could not save the run's metrics: {e}")  # never hide the run's own outcome
+                self.jobs_list = creator.jobs_list
+                self.jobps_list = creator.jobps_list
+
+            if self.cancel_event.is_set():
+                self.log(f"Cancelled ({limiter.summary()})." + (f" {journal.summary()}. Use Resume Run... to finish it." if journal else ''))
+            else:
+                self.log(f"All done ({limiter.summary()})." + (f" {journal.summary()}" if journal else ''))
 
         except Exception as e:
-            self.parent.after(0, lambda: self.log(f"Unexpected error: {str(e)}"))
-            self.parent.after(0, lambda: messagebox.showerror("Error", f"An unexpected error occurred: {str(e)}"))
+            msg = str(e)
+            self.log(f"Unexpected error: {msg}")
+            self.parent.after(0, lambda: messagebox.showerror("Error", f"An unexpected error occurred: {msg}"))
         finally:
-            self.parent.after(0, lambda: self.run_btn.config(state='normal'))
+            self.finished()
 
 #----------------------------
 # AutomicApp
 #----------------------------
 class AutomicApp:
-    def __init__(self, parent, env_var, client_var, entries):
+    ROW_HEIGHT = 25  # matches the Treeview rowheight style
+    REFRESH_MS = 100
+    EXECUTION_CACHE_TTL = 300  # seconds a resolved last execution is reused
+
+    def __init__(self, parent, env_var, client_var, entries, config=dict, log=print):
         self.parent = parent
+        self.config = config  # callable returning the current settings
+        self.log = log  # lookup errors; safe from any thread
+        self.exec_cache = TTLCache(ttl=self.EXECUTION_CACHE_TTL)
+        self.fetch_future = None
+        self.export_cancel = None
+        self.index = None  # automic_index.UsageIndex, opened on first use
+        self.graph = None  # automic_graph.UsageGraph of the last crawl
         self.env_var = env_var
         self.client_var = client_var
         self.entries = entries
@@ -540,12 +555,45 @@ class AutomicApp:
         self.spinner.grid(row=1, column=1, sticky="e", padx=10)
         self.spinner.grid_remove()
 
+        # Local usage index: repeat lookups are served from it, and it can be
+        # searched for the objects that list a name among their references
+        tools_frm = ttk.Frame(top_frame)
+        tools_frm.grid(row=2, column=0, columnspan=2, sticky="w", padx=5)
+        # Fan-out: blank fetches on the selected client; e.g. "eup6/1001 eup7"
+        # fetches on each target at once into one table with a Target column
+        ttk.Label(tools_frm, text="Targets:").pack(side="left")
+        self.targets_entry = ttk.Entry(tools_frm, width=22)
+        self.targets_entry.pack(side="left", padx=(5, 10))
+        self.use_index_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(tools_frm, text="Use Local Index", variable=self.use_index_var).pack(side="left")
+        self.search_index_button = ttk.Button(tools_frm, text="🔎 Search Index", command=self.search_index)
+        self.search_index_button.pack(side="left", padx=10)
+        # Recursive crawl: users of the users, level by level
+        ttk.Label(tools_frm, text="Crawl Depth:").pack(side="left", padx=(10, 0))
+        self.crawl_depth_var = tk.IntVar(value=CRAWL_DEPTH)
+        ttk.Spinbox(tools_frm, from_=1, to=20, width=4, textvariable=self.crawl_depth_var).pack(side="left", padx=5)
+        self.crawl_button = ttk.Button(tools_frm, text="🕸 Crawl", command=self.crawl)
+        self.crawl_button.pack(side="left")
+        ttk.Button(tools_frm, text="Export Graph...", command=self.export_graph).pack(side="left", padx=10)
+
+        self.progress = ProgressPanel(top_frame)
+        self.progress.grid(row=3, column=0, columnspan=2, sticky="ew", padx=5)
+
         table_frame = ttk.Frame(self.parent)
         table_frame.grid(row=1, column=0, sticky="nsew", padx=10, pady=7)
         table_frame.grid_rowconfigure(0, weight=1)
         table_frame.grid_columnconfigure(0, weight=1)
 
-        self.columns = ("Object Name", "Usage", "Type", "Folder", "Last Modified", "Last Execution")
+        # Results live in a columnar store; the Treeview only holds the rows
+        # currently visible and is re-filled as the view scrolls.
+        self.columns = USAGE_COLUMNS
+        self.store = UsageStore(self.columns)
+        self.view_offset = 0
+        self.view_rows = 20
+        self.selected_index = None
+        self.refresh_pending = False
+        self.configured_tags = set()
+        self.total_refs_found = 0
         self.tree = ttk.Treeview(table_frame, columns=self.columns, show="headings")
         self.tree.bind("<Button-1>", self.on_column_click)
 
@@ -553,15 +601,21 @@ class AutomicApp:
             self.tree.heading(col, text=col)
             self.tree.column(col, width=145, stretch=True)
 
-        scrollbar_y = ttk.Scrollbar(table_frame, orient="vertical", command=self.tree.yview)
+        self.scrollbar_y = ttk.Scrollbar(table_frame, orient="vertical", command=self.on_vscroll)
         scrollbar_x = ttk.Scrollbar(table_frame, orient="horizontal", command=self.tree.xview)
-        self.tree.configure(yscroll=scrollbar_y.set, xscroll=scrollbar_x.set)
+        self.tree.configure(xscroll=scrollbar_x.set)
 
         self.tree.grid(row=0, column=0, sticky="nsew")
-        scrollbar_y.grid(row=0, column=1, sticky="ns")
+        self.scrollbar_y.grid(row=0, column=1, sticky="ns")
         scrollbar_x.grid(row=1, column=0, sticky="ew")
 
         self.tree.bind("<<TreeviewSelect>>", self.on_row_select)
+        self.tree.bind("<Configure>", self.on_tree_resize)
+        self.tree.bind("<MouseWheel>", lambda e: self.scroll_rows(-1 * (e.delta // 120) * 3))
+        self.tree.bind("<Button-4>", lambda e: self.scroll_rows(-3))
+        self.tree.bind("<Button-5>", lambda e: self.scroll_rows(3))
+        self.tree.bind("<Up>", lambda e: self.move_selection(-1))
+        self.tree.bind("<Down>", lambda e: self.move_selection(1))
 
         details_frame = ttk.Frame(self.parent)
         details_frame.grid(row=2, column=0, sticky="nsew", padx=10, pady=6)
@@ -583,7 +637,8 @@ class AutomicApp:
         export_frame = ttk.Frame(self.parent)
         export_frame.grid(row=3, column=0, sticky="ew", padx=10, pady=(0, 5))
 
-        ttk.Button(export_frame, text="📤 Export to Excel", command=self.export_to_excel).pack(side="left", anchor="w")
+        self.export_button = ttk.Button(export_frame, text="📤 Export...", command=self.export_results)
+        self.export_button.pack(side="left", anchor="w")
         self.status = tk.Label(export_frame, text="", bd=1, relief="sunken", anchor="w")
         self.status.pack(side="right", anchor="e", fill="x", expand=True)
 
@@ -608,7 +663,7 @@ class AutomicApp:
             col_index = int(col_id[1:]) - 1
             column_name = self.columns[col_index]
             self.tree.selection_set(row_id)
-            self.selected_data = dict(zip(self.columns, self.tree.item(row_id)["values"]))
+            self.selected_data = dict(zip(self.columns, self.store.row(self.view_offset + self.tree.index(row_id))))
 
             self.menu.delete(0, "end")
             self.menu.add_command(label=f"📋 Copy {column_name}", command=lambda c=column_name: self.copy_column_value(c))
@@ -620,8 +675,7 @@ class AutomicApp:
             col_id = self.tree.identify_column(event.x)
             col_index = int(col_id.replace("#", "")) - 1
             col_name = self.columns[col_index]
-            values = [self.tree.item(item)["values"][col_index] for item in self.tree.get_children()]
-            text = "\n".join(str(v) for v in values)
+            text = "\n".join(str(v) for v in self.store.column(col_name))
             self.parent.clipboard_clear()
             self.parent.clipboard_append(text)
             self.parent.update()
@@ -635,8 +689,84 @@ class AutomicApp:
             self.parent.update()
             self.status.config(text=f"Copied {column} to clipboard ✔")
 
+    #----- virtual view -----
+
+    def on_tree_resize(self, event):
+        rows = max(1, (event.height - self.ROW_HEIGHT) // self.ROW_HEIGHT)
+        if rows != self.view_rows:
+            self.view_rows = rows
+            self.render_view()
+
+    def on_vscroll(self, *args):
+        total = len(self.store)
+        if args[0] == 'moveto':
+            self.view_offset = int(float(args[1]) * total)
+        elif args[0] == 'scroll':
+            step = self.view_rows if args[2] == 'pages' else 1
+            self.view_offset += int(args[1]) * step
+        self.render_view()
+
+    def scroll_rows(self, delta):
+        self.view_offset += delta
+        self.render_view()
+
+    def move_selection(self, delta):
+        if self.selected_index is None:
+            return
+        index = min(max(self.selected_index + delta, 0), len(self.store) - 1)
+        if index < self.view_offset:
+            self.view_offset = index
+        elif index >= self.view_offset + self.view_rows:
+            self.view_offset = index - self.view_rows + 1
+        self.selected_index = index
+        self.render_view()
+        self.show_details(index)
+        return "break"
+
+    def request_refresh(self):
+        # Coalesce refreshes requested by the fetch thread into one per tick
+        if not self.refresh_pending:
+            self.refresh_pending = True
+            self.parent.after(self.REFRESH_MS, self.refresh_view)
+
+    def refresh_view(self):
+        self.refresh_pending = False
+        self.render_view()
+        self.status.config(text=f"Fetched {self.total_refs_found} references so far...")
+
+    def render_view(self):
+        total = len(self.store)
+        self.view_offset = max(0, min(self.view_offset, total - self.view_rows))
+        rows, tags = self.store.rows(self.view_offset, self.view_offset + self.view_rows)
+        items = self.tree.get_children()
+        for item in items[len(rows):]:
+            self.tree.delete(item)
+        for i, (values, tag) in enumerate(zip(rows, tags)):
+            if tag and tag not in self.configured_tags:
+                self.tree.tag_configure(tag, background=self.color_map.get(tag))
+                self.configured_tags.add(tag)
+            tag_list = (tag,) if tag else ()
+            if i < len(items):
+                self.tree.item(items[i], values=values, tags=tag_list)
+            else:
+                self.tree.insert("", "end", values=values, tags=tag_list)
+        items = self.tree.get_children()
+        position = None if self.selected_index is None else self.selected_index - self.view_offset
+        if position is not None and 0 <= position < len(items):
+            if self.tree.selection() != (items[position],):
+                self.tree.selection_set(items[position])
+        elif self.tree.selection():
+            self.tree.selection_remove(*self.tree.selection())
+        if total:
+            self.scrollbar_y.set(self.view_offset / total, min(1.0, (self.view_offset + len(rows)) / total))
+        else:
+            self.scrollbar_y.set(0, 1)
+
     def start_batch_fetch_spinner(self):
+        # Anything that resets the table waits until the running fetch is done
         self.batch_fetch_button.grid_remove()
+        self.search_index_button.config(state='disabled')
+        self.crawl_button.config(state='disabled')
         self.spinner.grid()
         self.spinner.start(10)
 
@@ -644,8 +774,13 @@ class AutomicApp:
         self.spinner.stop()
         self.spinner.grid_remove()
         self.batch_fetch_button.grid()
+        self.search_index_button.config(state='normal')
+        self.crawl_button.config(state='normal')
 
     def batch_fetch(self):
+        from automic_session import get_session
+        from automic_async import AsyncExecutionResolver, fetch_usage_all, get_client, loop_thread
+        from automic_async import available as async_available
         client_id = self.client_var.get()
         userid = self.entries['USERID'].get()
         password = self.entries['PASSWORD'].get()
@@ -655,70 +790,319 @@ class AutomicApp:
         if not object_names:
             messagebox.showinfo("Input Missing", "Please enter at least one object name.")
             return
+        if self.targets_entry.get().strip():
+            self.fan_out_fetch(self.targets_entry.get().strip(), object_names)
+            return
+        try:
+            cid = int(client_id)
+        except ValueError:
+            messagebox.showerror("Error", "Invalid Client ID. Please enter a numeric value.")
+            return
 
         self.cancel_batch = False
+        # Worker count is only a ceiling: the environment's limiter decides
+        # how many lookups are actually in flight.
+        limiter = limiter_for(env, self.config(), cid)
+        workers = limiter.max_limit
+        self.reset_table()
+        self.render_view()
+        store = self.store
+        metrics = Metrics('usage', len(object_names))
+        self.progress.attach(metrics)
+
+        def add_result(obj_name, refs, last_exec, error=None):
+            metrics.advance(error is None)
+            if refs:
+                self.get_object_color(obj_name)
+            store.extend(usage_rows(obj_name, refs, last_exec), tag=obj_name if refs else None)
+            self.total_refs_found += len(refs)
+            self.request_refresh()
+
+        index = self.usage_index() if self.use_index_var.get() else None
+        fetched = []  # network results, written to the index at the end
+        stale = []
+        to_fetch = object_names
+        if index is not None:
+            # Indexed objects show at once; only the others go to the server
+            entries, stale, to_fetch = index.split(env, cid, object_names)
+            for name in dict.fromkeys(object_names):
+                if name in entries:
+                    add_result(name, entries[name].refs, entries[name].last_exec)
+        served = len(object_names) - len(to_fetch)
+
+        def fetched_result(obj_name, refs, last_exec, error=None):
+            if error is None:
+                fetched.append((obj_name, refs, last_exec))
+            add_result(obj_name, refs, last_exec, error)
+
+        def finish(error=None):
+            metrics.finish()
+            total_refs_found = self.total_refs_found
+            note = ''
+            if index is not None:
+                index.store(env, cid, fetched)
+                if stale and not self.cancel_batch:
+                    session = get_session(env, client_id, userid, password, pool_size=workers, limiter=limiter)
+                    index.refresh(session, stale, workers, on_done=lambda n: self.parent.after(
+                        0, lambda: self.status.config(text=f"Refreshed {n} stale index entries in the background.")),
+                        log=self.log)
+                if served:
+                    note = f" {served} from the local index" + (f", {len(stale)} refreshing in the background." if stale else ".")
+            self.parent.after(0, self.render_view)
+            if error is not None:
+                self.parent.after(0, lambda: messagebox.showerror("Error", f"Batch fetch failed:\n{error}"))
+            elif not self.cancel_batch:
+                self.parent.after(0, lambda: self.status.config(text=f"Done fetching {len(object_names)} objects. {total_refs_found} references total.{note}"))
+            else:
+                self.parent.after(0, lambda: self.status.config(text="Fetch cancelled."))
+            self.parent.after(0, self.stop_batch_fetch_spinner)
+            self.parent.after(0, self.hide_cancel_button)
 
-        def fetch_single_object(obj_name):
+        self.start_batch_fetch_spinner()
+        self.show_cancel_button()
+        if not to_fetch:
+            finish()
+            return
+        if async_available():
+            # Lookups are coroutines on the shared background loop, over a
+            # client kept open on it; cancelling the future aborts the
+            # requests still in flight.
+            async def fetch_objects():
+                client = await get_client(env, client_id, userid, password, max_concurrency=workers, limiter=limiter)
+                client.observers = (metrics,)
+                try:
+                    executions = AsyncExecutionResolver(client, cache=self.exec_cache, log=self.log)
+                    await fetch_usage_all(client, to_fetch, fetched_result, executions, log=self.log)
+                finally:
+                    client.observers = ()
+
+            def done(future):
+                error = None
+                if not future.cancelled() and future.exception() is not None:
+                    error = str(future.exception())
+                finish(error)
+
+            self.fetch_future = loop_thread().submit(fetch_objects())
+            self.fetch_future.add_done_callback(done)
+            return
+
+        session = get_session(env, client_id, userid, password, pool_size=workers, limiter=limiter)
+        executions = ExecutionResolver(session, cache=self.exec_cache, max_workers=workers, log=self.log)
+
+        def fetch_objects():
             try:
-                if self.cancel_batch:
-                    return None
-                result = automic.usageObject(client_id=int(client_id), object_name=obj_name)
-                response_data = result.response
-                refs = response_data.get("references", [])
-                last_exec = self.get_last_execution(client_id, obj_name)
-                color = self.get_object_color(obj_name)
-                return obj_name, refs, last_exec, color
+                with session.observed(metrics):
+                    for result in iter_usage(session, to_fetch, workers, lambda: self.cancel_batch, executions, self.log):
+                        fetched_result(*result)
+                finish()
             except Exception as e:
-                print(f"Error fetching {obj_name}: {e}")
-                return obj_name, [], None, None
+                finish(str(e))
 
-        def fetch_objects():
+        threading.Thread(target=fetch_objects, daemon=True).start()
+
+    def reset_table(self, columns=USAGE_COLUMNS):
+        """Empty the results, switching the table to `columns` if they differ."""
+        columns = tuple(columns)
+        if columns != self.columns:
+            self.columns = columns
+            self.store = UsageStore(columns)
+            self.tree.delete(*self.tree.get_children())
+            self.tree.configure(columns=columns)
+            for col in columns:
+                self.tree.heading(col, text=col)
+                self.tree.column(col, width=145, stretch=True)
+        else:
+            self.store.clear()
+        self.view_offset = 0
+        self.selected_index = None
+        self.total_refs_found = 0
+
+    def fan_out_fetch(self, spec, object_names):
+        """Batch fetch on every target in `spec` at once, each through its own
+        session and limiter, merged into one table with a Target column."""
+        from automic_session import get_session
+        try:
+            targets = parse_targets(spec)
+        except ValueError as e:
+            messagebox.showerror("Error", f"Targets: {e}")
+            return
+        userid = self.entries['USERID'].get()
+        password = self.entries['PASSWORD'].get()
+        config = self.config()
+        sessions = {}
+        for target in targets:
+            limiter = limiter_for(target.env, config, target.client)
+            sessions[target] = get_session(target.env, target.client, userid, password, pool_size=limiter.max_limit, limiter=limiter)
+        workers = max(session.limiter.max_limit for session in sessions.values())
+        self.cancel_batch = False
+        self.reset_table(FANOUT_COLUMNS)
+        self.render_view()
+        store = self.store
+        metrics = Metrics('usage', len(object_names) * len(targets))
+        self.progress.attach(metrics)
+        failed = {}
+
+        def run():
+            error = None
             try:
-                auth = base64.b64encode(f"{userid}:{password}".encode()).decode()
-                url = f"https://rb-{env}-api.bosch.com"
-                automic.connection(url=url, auth=auth, noproxy=True, sslverify=False, cert="/path/to/certfile", timeout=60)
-
-                self.parent.after(0, lambda: self.tree.delete(*self.tree.get_children()))
-                total_refs_found = 0
-
-                with ThreadPoolExecutor(max_workers=10) as executor:
-                    futures = {executor.submit(fetch_single_object, obj_name): obj_name for obj_name in object_names}
-                    for future in as_completed(futures):
-                        if self.cancel_batch:
-                            print("Batch fetch cancelled.")
-                            break
-                        result = future.result()
-                        if result is None:
+                with ExitStack() as stack:
+                    for session in sessions.values():
+                        stack.enter_context(session.observed(metrics))
+                    for target, obj_name, refs, last_exec, err in fan_out_usage(
+                            sessions.__getitem__, targets, object_names, workers, lambda: self.cancel_batch, self.log):
+                        if obj_name is None:
+                            failed[str(target)] = err
                             continue
-                        obj_name, refs, last_exec, color = result
-
-                        def insert_row():
-                            nonlocal total_refs_found
-                            if not refs:
-                                self.tree.insert("", "end", values=(obj_name, "None", "None", "None", "None", last_exec))
-                            else:
-                                for r in refs:
-                                    self.tree.insert("", "end", values=(obj_name, r["name"], r["type"], r["folderpath"], r["lastmodified"][:10], last_exec), tags=(obj_name,))
-                                self.tree.tag_configure(obj_name, background=color)
-                            total_refs_found += len(refs)
-                            self.status.config(text=f"Fetched {total_refs_found} references so far...")
-
-                        self.parent.after(0, insert_row)
-
-                if not self.cancel_batch:
-                    self.parent.after(0, lambda: self.status.config(text=f"Done fetching {len(object_names)} objects. {total_refs_found} references total."))
-                else:
-                    self.parent.after(0, lambda: self.status.config(text="Fetch cancelled."))
+                        metrics.advance(err is None)
+                        tag = f"{target} {obj_name}" if refs else None
+                        if tag:
+                            self.get_object_color(tag)
+                        store.extend(fanout_rows(target, obj_name, refs, last_exec), tag=tag)
+                        self.total_refs_found += len(refs)
+                        self.request_refresh()
+            except Exception as e:
+                error = str(e)
+            metrics.finish()
+            self.parent.after(0, lambda: self.fan_out_finished(len(object_names), targets, failed, error))
 
+        self.start_batch_fetch_spinner()
+        self.show_cancel_button()
+        threading.Thread(target=run, daemon=True).start()
+
+    def fan_out_finished(self, count, targets, failed, error=None):
+        self.render_view()
+        self.stop_batch_fetch_spinner()
+        self.hide_cancel_button()
+        if error is not None:
+            messagebox.showerror("Error", f"Batch fetch failed:\n{error}")
+        elif self.cancel_batch:
+            self.status.config(text="Fetch cancelled.")
+        else:
+            text = f"Done fetching {count} objects on {len(targets)} targets. {self.total_refs_found} references total."
+            if failed:
+                text += " Failed: " + ", ".join(f"{target} ({err})" for target, err in failed.items())
+            self.status.config(text=text)
+
+    def usage_index(self):
+        """The local usage index, opened on first use; None if it cannot be opened."""
+        settings = index_settings(self.config())
+        if self.index is None:
+            try:
+                self.index = UsageIndex(**settings)
             except Exception as e:
-                self.parent.after(0, lambda: messagebox.showerror("Error", f"Batch fetch failed:\n{str(e)}"))
-            finally:
-                self.parent.after(0, self.stop_batch_fetch_spinner)
-                self.parent.after(0, self.hide_cancel_button)
+                self.log(f"Usage index unavailable: {e}")
+                return None
+        self.index.fresh, self.index.max_age = settings['fresh'], settings['max_age']
+        return self.index
+
+    def search_index(self):
+        """Show every indexed object whose references match the names entered
+        (* and ? wildcards allowed), without contacting the server."""
+        patterns = [name.strip() for name in self.batch_input.get("1.0", tk.END).strip().splitlines() if name.strip()]
+        if not patterns:
+            messagebox.showinfo("Input Missing", "Please enter at least one object name.")
+            return
+        try:
+            cid = int(self.client_var.get())
+        except ValueError:
+            messagebox.showerror("Error", "Invalid Client ID. Please enter a numeric value.")
+            return
+        index = self.usage_index()
+        if index is None:
+            messagebox.showerror("Error", "The local usage index could not be opened.")
+            return
+        self.reset_table()
+        for pattern in patterns:
+            for row in index.find_usage(self.env_var.get(), cid, pattern):
+                self.get_object_color(row[0])
+                self.store.extend([row], tag=row[0])
+        self.render_view()
+        self.status.config(text=f"Local index: {len(self.store)} references to {', '.join(patterns)}")
+
+    def crawl(self):
+        """Expand usage breadth-first from the names entered, up to the crawl depth."""
+        from automic_session import get_session
+        env = self.env_var.get()
+        object_names = [name.strip() for name in self.batch_input.get("1.0", tk.END).strip().splitlines() if name.strip()]
+        if not object_names:
+            messagebox.showinfo("Input Missing", "Please enter at least one object name.")
+            return
+        try:
+            int(self.client_var.get())
+        except ValueError:
+            messagebox.showerror("Error", "Invalid Client ID. Please enter a numeric value.")
+            return
+        try:
+            depth = max(1, int(self.crawl_depth_var.get()))
+        except (tk.TclError, ValueError):
+            depth = CRAWL_DEPTH
+        config = self.config()
+        limiter = limiter_for(env, config, self.client_var.get())
+        workers = limiter.max_limit
+        session = get_session(env, self.client_var.get(), self.entries['USERID'].get(), self.entries['PASSWORD'].get(),
+                              pool_size=workers, limiter=limiter)
+        self.cancel_batch = False
+        self.graph = None
+        self.reset_table()
+        self.render_view()
+        store = self.store
+        metrics = Metrics('crawl')
+        self.progress.attach(metrics)
+
+        def on_result(obj_name, refs, level, error):
+            metrics.advance(error is None)
+            if refs:
+                self.get_object_color(obj_name)
+            # Last executions are not looked up while crawling
+            store.extend(usage_rows(obj_name, refs, ""), tag=obj_name if refs else None)
+            self.total_refs_found += len(refs)
+            self.request_refresh()
+
+        def run():
+            graph, error = None, None
+            try:
+                with session.observed(metrics):
+                    graph = crawl_usage(session, object_names, depth, workers, config.get('CRAWL_MAX_NODES', CRAWL_MAX_NODES),
+                                        lambda: self.cancel_batch, on_result, self.log)
+            except Exception as e:
+                error = str(e)
+            metrics.finish()
+            self.parent.after(0, lambda: self.crawl_finished(graph, depth, error))
 
         self.start_batch_fetch_spinner()
         self.show_cancel_button()
-        threading.Thread(target=fetch_objects, daemon=True).start()
+        threading.Thread(target=run, daemon=True).start()
+
+    def crawl_finished(self, graph, depth, error=None):
+        self.graph = graph
+        self.render_view()
+        self.stop_batch_fetch_spinner()
+        self.hide_cancel_button()
+        if error is not None:
+            messagebox.showerror("Error", f"Crawl failed:\n{error}")
+            return
+        text = f"Crawl: {len(graph.nodes)} objects, {len(graph.edges)} references, depth {depth}"
+        if graph.errors:
+            text += f", {len(graph.errors)} lookups failed"
+        if graph.truncated:
+            text += ", stopped at the node limit"
+        if self.cancel_batch:
+            text += " (cancelled)"
+        self.status.config(text=text)
+
+    def export_graph(self):
+        if self.graph is None:
+            messagebox.showinfo("No Graph", "Run a crawl first.")
+            return
+        file_path = filedialog.asksaveasfilename(defaultextension=".graphml", filetypes=GRAPH_FILE_TYPES, title="Save graph as")
+        if not file_path:
+            return
+        try:
+            self.graph.export(file_path)
+        except Exception as e:
+            messagebox.showerror("Export Failed", f"Could not export the graph:\n{str(e)}")
+            return
+        self.status.config(text=f"Graph exported to {file_path}")
 
     def show_cancel_button(self):
         self.cancel_button.grid()
@@ -728,20 +1112,8 @@ class AutomicApp:
 
     def cancel_batch_fetch(self):
         self.cancel_batch = True
-
-    def get_last_execution(self, client_id, obj_name):
-        try:
-            re = automic.listExecutions(client_id=int(client_id), query=f"{obj_name}&max_results=1")
-            o = re.response.get('data', [])
-            if o:
-                raw_time = o[0]["start_time"]
-                dt = datetime.strptime(raw_time, "%Y-%m-%dT%H:%M:%SZ")
-                return dt.strftime("%Y-%m-%d %H:%M:%S")
-            else:
-                return "N/A"
-        except Exception as e:
-            print(f"Error fetching last execution for {obj_name}: {e}")
-            return "Error"
+        if self.fetch_future is not None:
+            self.fetch_future.cancel()
 
     def get_object_color(self, obj_name):
         if obj_name not in self.color_map:
@@ -759,11 +1131,13 @@ class AutomicApp:
         selected = self.tree.selection()
         if not selected:
             return
-        values = self.tree.item(selected[0])["values"]
-        self.selected_data = dict(zip(self.columns, values))
-        self.object_name_label.config(text=self.selected_data.get("Object Name", ""))
-        for key in self.columns[1:]:
-            self.detail_labels[key].config(text=self.selected_data.get(key, ""))
+        self.selected_index = self.view_offset + self.tree.index(selected[0])
+        self.show_details(self.selected_index)
+
+    def show_details(self, index):
+        self.selected_data = dict(zip(self.columns, self.store.row(index)))
+        for key, label in self.detail_labels.items():
+            label.config(text=self.selected_data.get(key, ""))
 
     def copy_field(self, field):
         value = self.selected_data.get(field, "")
@@ -773,20 +1147,42 @@ class AutomicApp:
             self.parent.update()
             self.status.config(text=f"Copied {field} to clipboard ✔")
 
-    def export_to_excel(self):
-        try:
-            rows = [self.tree.item(row)["values"] for row in self.tree.get_children()]
-            if not rows:
-                messagebox.showinfo("No Data", "There is no data to export.")
-                return
-            df = pd.DataFrame(rows, columns=self.columns)
-            file_path = filedialog.asksaveasfilename(defaultextension=".xlsx", filetypes=[("Excel Files", "*.xlsx")], title="Save as")
-            if file_path:
-                df.to_excel(file_path, index=False)
-                messagebox.showinfo("Export Successful", f"Data exported to:\n{file_path}")
-                self.status.config(text=f"Exported to {file_path}")
-        except Exception as e:
-            messagebox.showerror("Export Failed", f"Could not export to Excel:\n{str(e)}")
+    def export_results(self):
+        # While an export runs the button cancels it
+        if self.export_cancel is not None:
+            self.export_cancel.set()
+            return
+        if not len(self.store):
+            messagebox.showinfo("No Data", "There is no data to export.")
+            return
+        file_path = filedialog.asksaveasfilename(defaultextension=".xlsx", filetypes=EXPORT_FILE_TYPES, title="Save as")
+        if not file_path:
+            return
+        cancel = self.export_cancel = threading.Event()
+        self.export_button.config(text="✖ Cancel Export")
+
+        def progress(done, total):
+            self.parent.after(0, lambda: self.status.config(text=f"Exporting {done}/{total} rows..."))
+
+        def export():
+            # Rows stream from the store on a worker thread; the UI stays live
+            try:
+                count = export_store(self.store, file_path, progress, cancel.is_set)
+                self.parent.after(0, lambda: self.status.config(text=f"Exported {count} rows to {file_path}"))
+                self.parent.after(0, lambda: messagebox.showinfo("Export Successful", f"Data exported to:\n{file_path}"))
+            except ExportCancelled:
+                self.parent.after(0, lambda: self.status.config(text="Export cancelled."))
+            except Exception as e:
+                msg = str(e)
+                self.parent.after(0, lambda: messagebox.showerror("Export Failed", f"Could not export:\n{msg}"))
+            finally:
+                self.parent.after(0, self.export_finished)
+
+        threading.Thread(target=export, daemon=True).start()
+
+    def export_finished(self):
+        self.export_cancel = None
+        self.export_button.config(text="📤 Export...")
 
 #----------------------------
 # Main Application
@@ -794,11 +1190,7 @@ class AutomicApp:
 class AutomicToolsApp:
     CONFIG_PATH = os.path.join(os.path.expanduser('~'), '.automic_tools.json')
     ENV_OPTIONS = ['eup4', 'eup6', 'eup7']
-    CLIENT_MAP = {
-        'eup4': ['1100'],
-        'eup6': ['1001', '1111'],
-        'eup7': ['1101', '1301', '1401', '7101']
-    }
+    CLIENT_MAP = ENV_CLIENTS
 
     def __init__(self, root):
         self.root = root
@@ -866,7 +1258,10 @@ class AutomicToolsApp:
         self.notebook.add(self.usage_viewer_frame, text='Usage Viewer')
 
         self.job_creator = JobCreatorApp(self.job_creator_frame, self.env_var, self.client_var, self.entries, self.CLIENT_MAP)
-        self.usage_viewer = AutomicApp(self.usage_viewer_frame, self.env_var, self.client_var, self.entries)
+        self.usage_viewer = AutomicApp(self.usage_viewer_frame, self.env_var, self.client_var, self.entries,
+                                       config=lambda: self.job_creator.config,
+                                       log=lambda msg: self.job_creator.log(f"Usage Viewer: {msg}"))
+        self.root.after(200, lambda: threading.Thread(target=preload_modules, daemon=True).start())
 
     def load_config(self):
         try:
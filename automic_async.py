@@ -0,0 +1,333 @@
+"""asyncio counterparts of the REST calls the tools make.
+
+Needs aiohttp, which is optional: callers check `available()` and keep the
+thread pool path without it.
+"""
+import asyncio
+import base64
+import importlib.util
+import json
+import threading
+import time
+from urllib.parse import quote
+
+from automic_limits import call_kind
+from automic_metrics import call_name
+from automic_session import api_url
+from automic_usage import ExecutionResolver, format_start_time
+
+
+def available():
+    return importlib.util.find_spec('aiohttp') is not None
+
+#----------------------------
+# Responses
+#----------------------------
+
+class AsyncAutomicResponse:
+    """Same attributes as automic_session.AutomicResponse."""
+
+    def __init__(self, url, status, headers, text):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.text = text
+        try:
+            self.response = json.loads(text) if text else {}
+        except ValueError:
+            self.response = {}
+
+    @property
+    def ok(self):
+        return 200 <= self.status < 300
+
+#----------------------------
+# Client
+#----------------------------
+
+class AsyncAutomicClient:
+    """aiohttp client for one (env, client_id, user), used from one event loop.
+
+    At most `max_concurrency` requests are in flight; `limiter` and `observers`
+    work as for AutomicSession.
+    """
+
+    def __init__(self, env, client_id, user, password, max_concurrency=50, timeout=120, verify=False,
+                 base_url=None, limiter=None):
+        self.env = env
+        self.client_id = int(client_id)
+        self.user = user
+        self.url = (base_url or api_url(env)).rstrip('/') + '/ae/api/v1'
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.verify = verify
+        self.limiter = limiter
+        self.observers = ()
+        self.headers = {'Content-type': 'application/json', 'Accept': 'application/json'}
+        self.set_password(password)
+        self.http = None
+        self.slots = None
+
+    def set_password(self, password):
+        auth = base64.b64encode(f"{self.user}:{password}".encode()).decode()
+        self.headers['Authorization'] = f"Basic {auth}"
+
+    async def open(self):
+        import aiohttp
+        if self.http is None:
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency, ssl=None if self.verify else False)
+            # trust_env=False: same as the sync session, no proxy from the environment
+            self.http = aiohttp.ClientSession(connector=connector, trust_env=False,
+                                              timeout=aiohttp.ClientTimeout(total=self.timeout))
+            self.slots = asyncio.Semaphore(self.max_concurrency)
+        return self
+
+    async def close(self):
+        if self.http is not None:
+            await self.http.close()
+            self.http = None
+
+    async def __aenter__(self):
+        return await self.open()
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def _limit(self):
+        limiter = self.limiter
+        loop = asyncio.get_running_loop()
+        waiter = limiter.wait_slot(loop)
+        while waiter is not None:
+            await waiter
+            waiter = limiter.wait_slot(loop)
+        try:
+            wait = limiter.bucket.take() if limiter.bucket else 0
+            while wait:
+                await asyncio.sleep(wait)
+                wait = limiter.bucket.take()
+        except asyncio.CancelledError:
+            limiter.discard()
+            raise
+
+    async def _send(self, method, url, data, headers):
+        async with self.http.request(method, url, data=data, headers=dict(self.headers, **(headers or {}))) as r:
+            return AsyncAutomicResponse(url, r.status, r.headers, await r.text())
+
+    async def request(self, method, path, query=None, body=None, headers=None):
+        url = f"{self.url}/{self.client_id}{path}" + (f"?{query}" if query else '')
+        data = json.dumps(body) if body is not None else None
+        async with self.slots:
+            limiter = self.limiter
+            observers = self.observers
+            if limiter is None and not observers:
+                return await self._send(method, url, data, headers)
+            if limiter:
+                await self._limit()
+            label = call_name(method, path)
+            for o in observers:
+                o.call_started(label)
+            status = None
+            started = time.monotonic()
+            try:
+                res = await self._send(method, url, data, headers)
+                status = res.status
+            except asyncio.CancelledError:
+                if limiter:
+                    limiter.discard()  # says nothing about the server
+                    limiter = None
+                raise
+            finally:
+                latency = time.monotonic() - started
+                if limiter:
+                    limiter.release(latency, status, call_kind(label, data))
+                for o in observers:
+                    o.call_finished(label, latency, status)
+            return res
+
+    async def get_object(self, object_name, query=None, headers=None):
+        return await self.request('GET', f"/objects/{quote(object_name, safe='')}", query, headers=headers)
+
+    async def post_objects(self, body, query=None):
+        return await self.request('POST', '/objects', query, body)
+
+    async def usage(self, object_name):
+        return await self.request('GET', f"/objects/{quote(object_name, safe='')}/usage")
+
+    async def list_executions(self, query=None):
+        return await self.request('GET', '/executions', query)
+
+#----------------------------
+# Client registry
+#----------------------------
+
+_clients = {}
+
+
+async def get_client(env, client_id, user, password, max_concurrency=50, base_url=None, limiter=None):
+    """Return the open client for (env, client_id, user) on the running loop,
+    creating it on first use, so its connections are kept between fetches.
+
+    Like automic_session.get_session; only ever touched from its loop's thread.
+    """
+    key = (asyncio.get_running_loop(), env, str(client_id), user, base_url, max_concurrency)
+    client = _clients.get(key)
+    if client is None:
+        client = _clients[key] = AsyncAutomicClient(env, client_id, user, password, max_concurrency=max_concurrency,
+                                                    base_url=base_url, limiter=limiter)
+    else:
+        client.set_password(password)
+        if limiter is not None:
+            client.limiter = limiter
+    return await client.open()
+
+
+async def close_clients():
+    """Close every client of the running loop."""
+    loop = asyncio.get_running_loop()
+    for key in [key for key in _clients if key[0] is loop]:
+        await _clients.pop(key).close()
+
+#----------------------------
+# Usage lookups
+#----------------------------
+
+async def get_last_execution(client, obj_name, log=print):
+    try:
+        re = await client.list_executions(query=f"{obj_name}&max_results=1")
+        o = re.response.get('data', [])
+        return format_start_time(o[0]["start_time"]) if o else "N/A"
+    except Exception as e:
+        log(f"Error fetching last execution for {obj_name}: {e}")
+        return "Error"
+
+
+class AsyncExecutionResolver(ExecutionResolver):
+    """ExecutionResolver over an AsyncAutomicClient."""
+
+    async def resolve(self, names, on_found=None):
+        result, wanted = self._split_cached(names)
+        if result and on_found:
+            on_found(dict(result))
+        if not wanted:
+            return result
+        found, exhausted = await self._scan(wanted, on_found)
+        missing = self._unresolved(wanted, found, exhausted)
+        if missing:
+            values = await asyncio.gather(*(get_last_execution(self.session, n, self.log) for n in missing))
+            found.update(zip(missing, values))
+        self._remember(found)
+        result.update(found)
+        return result
+
+    async def _scan(self, wanted, on_found=None):
+        found = {}
+        base = self._base_query(wanted)
+        last_run_id = None
+        for _ in range(self.max_pages):
+            try:
+                res = await self.session.list_executions(query=self._page_query(base, last_run_id))
+            except Exception as e:
+                self.log(f"Error listing executions: {e}")
+                break
+            finished, exhausted, last_run_id = self._absorb(res, wanted, found, on_found)
+            if finished:
+                return found, exhausted
+        return found, False
+
+
+async def fetch_usage_all(client, object_names, on_result, executions=None, log=print):
+    """Look up every object concurrently, calling `on_result(name, refs, last_exec, error)`.
+
+    Same results as automic_usage.iter_usage, rows likewise reported as
+    soon as their last execution turns up. Cancelling the task stops every
+    pending and in-flight lookup at once.
+    """
+    resolver = executions or AsyncExecutionResolver(client, log=log)
+    loop = asyncio.get_running_loop()
+    known = {}
+    waiters = {}  # name -> future of its last execution, for rows fetched first
+
+    def on_found(found):
+        known.update(found)
+        for name, last_exec in found.items():
+            waiter = waiters.pop(name, None)
+            if waiter and not waiter.done():
+                waiter.set_result(last_exec)
+
+    def on_resolved(task):
+        for name, waiter in waiters.items():
+            if waiter.done():
+                continue
+            if task.cancelled():
+                waiter.cancel()
+            elif task.exception():
+                waiter.set_exception(task.exception())
+            else:
+                waiter.set_result(task.result().get(name, "N/A"))
+        waiters.clear()
+
+    last_execs = asyncio.ensure_future(resolver.resolve(object_names, on_found))
+    last_execs.add_done_callback(on_resolved)
+    # Keeps the lookups from queueing ahead of the resolver's own requests
+    gate = asyncio.Semaphore(client.max_concurrency)
+
+    async def one(obj_name):
+        try:
+            async with gate:
+                res = await client.usage(obj_name)
+            refs = res.response.get("references", [])
+        except Exception as e:
+            log(f"Error fetching {obj_name}: {e}")
+            on_result(obj_name, [], None, str(e))
+            return
+        if obj_name in known:
+            last_exec = known[obj_name]
+        elif last_execs.done():
+            last_exec = last_execs.result().get(obj_name, "N/A")
+        else:
+            if obj_name not in waiters:
+                waiters[obj_name] = loop.create_future()
+            last_exec = await asyncio.shield(waiters[obj_name])
+        on_result(obj_name, refs, last_exec, None)
+
+    try:
+        await asyncio.gather(*(one(name) for name in object_names))
+    finally:
+        last_execs.cancel()
+
+#----------------------------
+# Background loop
+#----------------------------
+
+class LoopThread:
+    """One asyncio event loop on a daemon thread, shared by the UI.
+
+    Cancelling the Future from `submit(coro)` cancels the coroutine's task.
+    """
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name='automic-asyncio', daemon=True)
+        self.thread.start()
+
+    def submit(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def stop(self, timeout=5):
+        """Close the loop's clients, then stop it."""
+        try:
+            self.submit(close_clients()).result(timeout)
+        finally:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+
+
+_loop_thread = None
+_loop_lock = threading.Lock()
+
+
+def loop_thread():
+    global _loop_thread
+    with _loop_lock:
+        if _loop_thread is None:
+            _loop_thread = LoopThread()
+        return _loop_thread
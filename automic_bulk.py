@@ -0,0 +1,319 @@
+import functools
+import itertools
+from collections import Counter
+
+from automic_engine import (FALLBACK_CONCURRENCY, MAIN_FAN_OUT, BatchEngine, CreationEngine, CreationError, PostResult,
+                            TemplateRenderer, build_jobplan, extract_default_login, fetch_template, job_script,
+                            list_folder, plan_main_jobplans)
+from automic_journal import RunState
+from automic_names import base_name, name_rules_for
+from automic_plan import ObjectPlan, PairCheck, check_main_name
+
+#----------------------------
+# Bulk creation run
+#----------------------------
+
+def expected_objects(pair_count, with_jobplans, done=(), main_name=None):
+    """Objects a run over `pair_count` pairs posts, for progress totals; None if unknown.
+
+    Sub-jobplans of a split main jobplan are not counted.
+    """
+    if pair_count is None:
+        return None
+    main = 1 if main_name and with_jobplans and main_name not in done else 0
+    return max(0, pair_count * (2 if with_jobplans else 1) + main - len(done))
+
+
+def describe_results(results):
+    """One line of counts, e.g. '12 posted, 30 exists, 2 failed'."""
+    counts = Counter(r.status if isinstance(r.status, str) and r.ok else 'posted' if r.ok else 'failed'
+                     for r in results)
+    return ', '.join(f"{n} {label}" for label, n in counts.most_common())
+
+
+class BulkCreator:
+    """One Job Creator run, independent of any UI.
+
+    Load the templates, then `run()` the pairs: a JOBS per pair, plus its
+    JOBP with a jobplan template, then optionally a main jobplan over what
+    was created. `log` gets the lines the Job Creator tab shows.
+    """
+
+    def __init__(self, session, folder, templates=None, max_workers=FALLBACK_CONCURRENCY, log=print, on_result=None,
+                 retry=None, journal=None, batch_size=1, name_rules=None):
+        if retry is None:
+            from automic_session import RetryPolicy
+            retry = RetryPolicy()
+        self.session = session
+        self.cid = session.client_id
+        self.folder = folder
+        self.templates = templates
+        self.max_workers = max_workers
+        self.log = log
+        self.on_result = on_result
+        self.retry = retry
+        self.journal = journal
+        self.batch_size = max(1, int(batch_size))
+        self.name_rules = name_rules or name_rules_for(self.cid)
+        self.state = RunState()
+        self.objects = ObjectPlan(session, retry=retry)
+        self.cancelled = lambda: False
+        self.dry_run = False
+        self.tmpl_jobs = None
+        self.tmpl_jobp = None
+        self.base_jobs = ''
+        self.base_jobp = ''
+        self.default_login = None
+        self.jobs_renderer = None
+        self.jobp_renderer = None
+        self.jobs_list = []
+        self.jobps_list = []
+        self.results = []
+        self.sub_results = []
+        self.main_result = None
+
+    def load_templates(self, t_job, t_joplan):
+        if t_joplan:
+            self.log(f"Fetching jobplan {t_joplan}")
+            self.tmpl_jobp = fetch_template(self.session, t_joplan, 'jobp', 'jobplan', self.templates)
+            self.base_jobp = base_name(self.tmpl_jobp['general_attributes']['name'], self.cid, 'JOBP')
+        if t_job:
+            self.log(f"Fetching job {t_job}")
+            self.tmpl_jobs = fetch_template(self.session, t_job, 'jobs', 'job', self.templates)
+            self.base_jobs = base_name(self.tmpl_jobs['general_attributes']['name'], self.cid, 'JOBS')
+            self.default_login = extract_default_login(self.tmpl_jobs)
+
+    def post(self, kind, name, obj):
+        action = self.objects.action(name, obj)
+        if self.dry_run:
+            return True, f"would {action}" if action in ('create', 'update') else action
+        if action in ('exists', 'unchanged'):
+            return True, action
+        body = {'total':1,'data':{kind.lower():obj},'path':self.folder,'client':self.cid,'hasmore':False}
+        query = 'overwrite_existing_objects=true' if action == 'update' else None
+        def on_retry(attempt, delay, reason):
+            self.log(f"RETRY {kind}: {name} ({reason}), attempt {attempt + 1}/{self.retry.attempts} in {delay:.1f}s")
+        res = self.retry.call(lambda: self.session.post_objects(body, query), on_retry)
+        if res.ok and action == 'update':
+            return True, 'updated'
+        return res.ok, res.status
+
+    def post_batch(self, kind, items, cancelled=lambda: False):
+        """Post [(name, body)] of one kind, `batch_size` per request; returns {name: (ok, status)}.
+
+        A rejected chunk is split in half and posted again, down to single
+        objects. Objects of chunks not sent once `cancelled()` are left out.
+        """
+        outcome = {}
+        todo = {'create': [], 'update': []}
+        for name, obj in items:
+            try:
+                action = self.objects.action(name, obj)
+            except Exception as e:
+                outcome[name] = (False, str(e))
+                continue
+            if self.dry_run:
+                outcome[name] = (True, f"would {action}" if action in todo else action)
+            elif action in todo:
+                todo[action].append((name, obj))
+            else:
+                outcome[name] = (True, action)
+        for action, pending in todo.items():
+            for i in range(0, len(pending), self.batch_size):
+                self._post_chunk(kind, action, pending[i:i + self.batch_size], outcome, cancelled)
+        return outcome
+
+    def _post_chunk(self, kind, action, chunk, outcome, cancelled=lambda: False):
+        if cancelled():
+            return
+        # A single object keeps the one-object envelope
+        data = {kind.lower(): chunk[0][1]} if len(chunk) == 1 else [{kind.lower(): obj} for _, obj in chunk]
+        body = {'total': len(chunk), 'data': data, 'path': self.folder, 'client': self.cid, 'hasmore': False}
+        query = 'overwrite_existing_objects=true' if action == 'update' else None
+        def on_retry(attempt, delay, reason):
+            self.log(f"RETRY {kind} x{len(chunk)}: {chunk[0][0]}... ({reason}), attempt {attempt + 1}/{self.retry.attempts} in {delay:.1f}s")
+        try:
+            res = self.retry.call(lambda: self.session.post_objects(body, query), on_retry)
+            ok, status = res.ok, res.status
+        except Exception as e:
+            ok, status = False, str(e)
+        # Retries already covered 429 and 5xx: only a refused chunk is worth splitting
+        rejected = isinstance(status, int) and 400 <= status < 500 and status != 429
+        if ok or len(chunk) == 1 or not rejected:
+            for name, _ in chunk:
+                outcome[name] = (ok, 'updated' if ok and action == 'update' else status)
+            return
+        half = len(chunk) // 2
+        self._post_chunk(kind, action, chunk[:half], outcome, cancelled)
+        self._post_chunk(kind, action, chunk[half:], outcome, cancelled)
+
+    def engine(self, cancelled=lambda: False):
+        if self.batch_size > 1:
+            return BatchEngine(self.post_batch, self.batch_size, max_workers=self.max_workers, log=self.log,
+                               on_result=self.record, cancelled=cancelled)
+        return CreationEngine(self.post, max_workers=self.max_workers, log=self.log, on_result=self.record,
+                              cancelled=cancelled)
+
+    def record(self, result):
+        self.state.result(result)
+        if self.on_result:
+            self.on_result(result)
+
+    def reject(self, pair, names, reason, taken=()):
+        """Fail the objects of a pair refused by the name check, without posting."""
+        results = [PostResult(-1, kind, name, False, reason) for kind, name in zip(('JOBS', 'JOBP'), names)]
+        self.state.rejected(pair, names, results, taken)
+        for result in results:
+            self.log(f"FAIL {result.kind}: {result.name} ({reason})")
+            self.results.append(result)
+            if self.on_result:
+                self.on_result(result)
+
+    def jobs_body(self, name_jobs, jn, p):
+        return self.jobs_renderer.render(name_jobs, script=job_script(self.cid, jn, p, self.default_login))
+
+    def names_for(self, p):
+        """Names a pair creates: its JOBS, then its JOBP when there is a jobplan template."""
+        names = [f"{self.base_jobs}_{p['jobname']}"]
+        if self.tmpl_jobp:
+            names.append(f"{self.base_jobp}_{p['jobname']}")
+        return names
+
+    def iter_units(self, planned):
+        template_job_name = self.tmpl_jobs['general_attributes']['name']
+        self.jobs_renderer = TemplateRenderer(self.tmpl_jobs)
+        if self.tmpl_jobp:
+            self.jobp_renderer = TemplateRenderer(self.tmpl_jobp, template_job_name)
+        for p, names in planned:
+            jn = p['jobname']
+            name_jobs = names[0]
+            unit = [('JOBS', name_jobs, functools.partial(self.jobs_body, name_jobs, jn, p))]
+            if self.tmpl_jobp:
+                name_jobp = names[1]
+                unit.append(('JOBP', name_jobp, functools.partial(self.jobp_renderer.render, name_jobp, job_name=name_jobs)))
+            self.state.pair(p, [name for _, name, _ in unit])
+            if self.cancelled():
+                continue  # journaled, so a resume picks it up, but not started
+            self.jobs_list.append(name_jobs)
+            if self.tmpl_jobp:
+                self.jobps_list.append(name_jobp)
+            unit = self.state.outstanding(unit)
+            if unit:
+                yield unit
+
+    def run(self, pairs, main_name=None, main_contains_jobplans=True, sequential=False, done=(),
+            precheck=True, check_changes=False, dry_run=False, lanes=1, fan_out=MAIN_FAN_OUT,
+            rebuild=(), cancelled=lambda: False, validate=True):
+        """Create everything for `pairs` (any iterable, consumed lazily).
+
+        Objects named in `done` are taken as already created and skipped;
+        those in `rebuild` are overwritten whether they exist or not.
+        """
+        self.jobs_list = []
+        self.jobps_list = []
+        self.results = []
+        self.sub_results = []
+        self.main_result = None
+        self.state = RunState(self.journal, done, rebuild, dry_run)
+        self.cancelled = cancelled
+        self.dry_run = dry_run
+        count = len(pairs) if hasattr(pairs, '__len__') else None
+        existing = {}
+        if precheck:
+            existing = list_folder(self.session, self.folder)
+            self.log(f"Pre-check: {len(existing)} objects already in {self.folder}")
+        self.objects = ObjectPlan(self.session, existing, self.state.rebuild, check_changes, self.retry)
+        if dry_run:
+            self.log("Dry run: nothing will be written")
+        pairs = iter(pairs)
+        first = next(pairs, None)
+        if first is None:
+            self.log("No pairs to process.")
+            return self.results
+        if first.get("jobp"):
+            # First line names an existing jobplan: list the given jobplans under a main one
+            self.tmpl_jobp = fetch_template(self.session, first["jobp"], 'jobp', 'jobplan', self.templates)
+            listed = [first] + list(pairs)
+            for p in listed:
+                self.state.pair(p, [])
+            self.jobps_list = [p['jobp'] for p in listed]
+        else:
+            if not self.tmpl_jobs:
+                raise CreationError("A Jobs template is required to create jobs")
+            self.log(f"Creating pairs with {self.max_workers} workers")
+            if self.state.done:
+                self.log(f"Resuming: {len(self.state.done)} objects already created are skipped")
+            if self.batch_size > 1:
+                self.log(f"Posting up to {self.batch_size} objects per request")
+            planned = ((p, self.names_for(p)) for p in itertools.chain([first], pairs))
+            if validate:
+                if main_name and self.tmpl_jobp:
+                    check_main_name(main_name, count, fan_out, lanes, self.name_rules)
+                check = PairCheck(self.session, self.folder, self.name_rules, self.reject, self.retry, self.log)
+                planned = check.iter_checked(planned, lookup=precheck, cancelled=cancelled)
+            units = self.iter_units(planned)
+            posted = self.engine(cancelled).run(units)
+            self.results.extend(posted)  # after the pairs rejected while reading
+            if cancelled() and self.state.journal:
+                for _ in units:  # journals the pairs left in the input
+                    pass
+            # Only what exists can go under the main jobplan or be copied from the lists
+            created = self.state.done | {r.name for r in self.results if r.ok}
+            listed = len(self.jobs_list) + len(self.jobps_list)
+            self.jobs_list = [name for name in self.jobs_list if name in created]
+            self.jobps_list = [name for name in self.jobps_list if name in created]
+            missing = listed - len(self.jobs_list) - len(self.jobps_list)
+            if missing:
+                self.log(f"{missing} objects not created are left out of the lists and the main jobplan")
+
+        partial = cancelled()
+        if partial:
+            self.state.cancelled()
+        if main_name and self.tmpl_jobp:
+            if main_name in self.state.done:
+                self.log(f"MAIN JOBP: {main_name} (already created)")
+            elif partial and not (self.jobps_list if main_contains_jobplans else self.jobs_list):
+                self.log(f"Cancelled before anything was created: {main_name} not built")
+            else:
+                self.create_main(main_name, main_contains_jobplans, sequential, lanes, fan_out)
+                if partial:
+                    self.log(f"Cancelled: {main_name} lists only the objects created so far; resume the run to complete it")
+                    self.state.partial([r.name for r in self.sub_results + [self.main_result] if r.ok])
+        outcome = self.results + self.sub_results + ([self.main_result] if self.main_result else [])
+        if outcome:
+            self.log(f"{'Plan' if dry_run else 'Outcome'}: {describe_results(outcome)}")
+        return self.results
+
+    def create_main(self, main_name, main_contains_jobplans=True, sequential=False, lanes=1, fan_out=MAIN_FAN_OUT):
+        """Create the main jobplan, through sub-jobplans when it exceeds `fan_out` children."""
+        children = self.jobps_list if main_contains_jobplans else self.jobs_list
+        plans = plan_main_jobplans(main_name, children, 'JOBP' if main_contains_jobplans else 'JOBS',
+                                   fan_out, sequential, lanes)
+        *subs, main = plans
+        if subs:
+            self.log(f"Main jobplan split into {len(subs)} sub-jobplans of at most {fan_out} nodes")
+        failed = None
+        # A jobplan can only reference objects that exist: post level by level
+        for _, group in itertools.groupby(subs, key=lambda p: p.level):
+            units = [[('JOBP', p.name, functools.partial(build_jobplan, self.tmpl_jobp, p.name, p.items, p.lanes, p.sequential))]
+                     for p in group if p.name not in self.state.done]
+            results = self.engine().run(units)
+            self.sub_results.extend(results)
+            failed = next((r for r in results if not r.ok), None)
+            if failed:
+                break
+        if failed:
+            ok, status = False, f"sub-jobplan {failed.name} failed"
+        else:
+            data = build_jobplan(self.tmpl_jobp, main_name, main.items, main.lanes, main.sequential)
+            try:
+                ok, status = self.post('JOBP', main_name, data)
+            except Exception as e:
+                ok, status = False, str(e)
+        self.main_result = PostResult(-1, 'JOBP', main_name, ok, status)
+        if ok:
+            self.log(f"MAIN JOBP: {main_name}" + (f" ({status})" if isinstance(status, str) else ''))
+        else:
+            self.log(f"FAIL MAIN JOBP: {main_name} ({status})")
+        self.record(self.main_result)
+        return self.main_result
@@ -0,0 +1,147 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+#----------------------------
+# Template cache
+#----------------------------
+
+TEMPLATE_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.automic_tools_templates.json')
+
+
+class CachedResponse:
+    """Stand-in for a 200 AutomicResponse served from the cache."""
+
+    def __init__(self, text, cached=True):
+        self.text = text
+        self.response = json.loads(text)
+        self.status = 200
+        self.ok = True
+        self.headers = {}
+        self.cached = cached
+
+
+def modified_stamp(obj):
+    """The last-modified date Automic keeps for an object, or None."""
+    return (obj or {}).get('general_attributes', {}).get('date_modified')
+
+
+class TemplateCache:
+    """Persistent LRU cache of template objects keyed by (env, client, object_name).
+
+    Entries older than `ttl` are revalidated against the server's
+    `date_modified`; the file is capped at `max_bytes`.
+    """
+
+    def __init__(self, path=TEMPLATE_CACHE_PATH, ttl=900, max_bytes=20 * 1024 * 1024):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, 'r') as f:
+                self.entries = OrderedDict(json.load(f).get('entries', {}))
+        except (FileNotFoundError, ValueError):
+            self.entries = OrderedDict()
+
+    def save(self):
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump({'entries': self.entries}, f)
+        os.replace(tmp, self.path)
+
+    @staticmethod
+    def key(env, client_id, object_name):
+        return f"{env}|{client_id}|{object_name}"
+
+    def get_object(self, session, object_name, force=False):
+        key = self.key(session.env, session.client_id, object_name)
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry:
+                self.entries.move_to_end(key)
+        if entry and not force:
+            if time.time() - entry['validated'] < self.ttl:
+                return CachedResponse(entry['text'])
+            if entry.get('modified') and self.current_stamp(session, object_name) == entry['modified']:
+                self._store(key, dict(entry, validated=time.time()))
+                return CachedResponse(entry['text'])
+
+        res = session.get_object(object_name)
+        if res.status == 200 and res.response.get('data'):
+            obj = next(iter(res.response['data'].values()))
+            self._store(key, {'text': res.text, 'modified': modified_stamp(obj), 'validated': time.time()})
+            return CachedResponse(res.text, cached=False)
+        return res
+
+    @staticmethod
+    def current_stamp(session, object_name):
+        """The server's `date_modified` for `object_name`, or None if it cannot be read."""
+        body = {'filters': [{'filter_identifier': 'object_name', 'object_name': object_name}], 'max_results': 1}
+        try:
+            res = session.search_objects(body)
+        except Exception:
+            return None
+        found = res.response.get('data', []) if res.ok else []
+        return next((o.get('date_modified') for o in found if o.get('name', '').upper() == object_name.upper()), None)
+
+    def invalidate(self, env=None, client_id=None, object_name=None):
+        with self._lock:
+            if object_name is None:
+                self.entries.clear()
+            else:
+                self.entries.pop(self.key(env, client_id, object_name), None)
+            self.save()
+
+    def _store(self, key, entry):
+        with self._lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            total = sum(len(e['text']) for e in self.entries.values())
+            while total > self.max_bytes and len(self.entries) > 1:
+                _, evicted = self.entries.popitem(last=False)
+                total -= len(evicted['text'])
+            try:
+                self.save()
+            except OSError:
+                pass  # the cache is an optimisation, never fail a run over it
+
+#----------------------------
+# Short-lived lookup cache
+#----------------------------
+
+class TTLCache:
+    """In-memory map whose entries expire `ttl` seconds after being set."""
+
+    def __init__(self, ttl=300, max_entries=50000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self.entries.get(key)
+            if item is None:
+                return default
+            if item[1] < time.monotonic():
+                del self.entries[key]
+                return default
+            return item[0]
+
+    def set(self, key, value):
+        with self._lock:
+            self.entries[key] = (value, time.monotonic() + self.ttl)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
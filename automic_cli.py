@@ -0,0 +1,478 @@
+"""Headless entry point for the Automic bulk tools: create, usage, index, crawl
+and rollback, streaming NDJSON progress events to stdout.
+
+    python automic_cli.py create --env eup6 --client 1001 --user U --armt A123 \\
+        --job-template JOBS_TMPL --jobplan-template JOBP_TMPL --pairs pairs.csv
+    python automic_cli.py usage --env eup7 --client 1301 --input names.txt
+
+Exit status: 0 everything succeeded, 1 some objects failed, 2 bad arguments
+or input, 3 the run could not start (templates, connection), 130 interrupted.
+"""
+import argparse
+import base64
+import copy
+import functools
+import json
+import os
+import signal
+import sys
+import threading
+from contextlib import contextmanager
+
+from automic_fanout import fan_out, parse_targets
+from automic_bulk import BulkCreator, expected_objects
+from automic_engine import MAIN_FAN_OUT, POST_BATCH_SIZE, CreationError, concurrency_for
+from automic_journal import RunJournal, latest_journal
+from automic_graph import CRAWL_DEPTH, CRAWL_MAX_NODES, crawl_usage
+from automic_limits import limiter_for
+from automic_metrics import Metrics
+from automic_names import name_rules_for
+from automic_session import get_session
+from automic_cache import TemplateCache
+from automic_pairs import estimate_pairs_file, iter_pairs_file, iter_pairs_text
+
+CONFIG_PATH = os.path.join(os.path.expanduser('~'), '.automic_tools.json')
+
+EXIT_OK = 0
+EXIT_FAILURES = 1
+EXIT_USAGE = 2
+EXIT_FATAL = 3
+EXIT_INTERRUPTED = 130
+
+#----------------------------
+# NDJSON output
+#----------------------------
+
+_emit_lock = threading.Lock()
+
+
+def emit(event, **fields):
+    line = json.dumps(dict(event=event, **fields), default=str)
+    with _emit_lock:
+        sys.stdout.write(line + '\n')
+        sys.stdout.flush()
+
+
+def log(msg):
+    emit('log', message=msg)
+
+
+@contextmanager
+def cancel_on_interrupt(cancel, emit=emit):
+    """While active, a first Ctrl+C sets `cancel` and a second one raises
+    KeyboardInterrupt. Does nothing outside the main thread."""
+    def on_interrupt(signum, frame):
+        if cancel.is_set():
+            raise KeyboardInterrupt
+        cancel.set()
+        emit('cancelling', message='waiting for in-flight posts; Ctrl+C again to abort')
+
+    if threading.current_thread() is not threading.main_thread():
+        yield
+        return
+    previous = signal.signal(signal.SIGINT, on_interrupt)
+    try:
+        yield
+    finally:
+        signal.signal(signal.SIGINT, previous)
+
+#----------------------------
+# Arguments
+#----------------------------
+
+def load_config(path):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def resolve_connection(args, cfg):
+    args.env = args.env or cfg.get('ENV')
+    args.client = args.client or cfg.get('CLIENT_ID')
+    args.user = args.user or cfg.get('USERID')
+    if not args.password:
+        args.password = os.environ.get('AUTOMIC_PASSWORD')
+    if not args.password and cfg.get('PASSWORD'):
+        try: args.password = base64.b64decode(cfg['PASSWORD']).decode()
+        except Exception: pass
+    missing = [opt for opt, val in (('--env', args.env), ('--client', args.client), ('--user', args.user), ('--password', args.password)) if not val]
+    if missing:
+        raise SystemExit(f"missing {', '.join(missing)} (not given and not in {args.config})")
+
+
+def open_resume(args, name):
+    """Load the journal `name` (a path or 'latest') and take unset connection options from it."""
+    path = latest_journal() if name == 'latest' else name
+    if not path or not os.path.exists(path):
+        raise SystemExit(f"journal not found: {name}")
+    journal = RunJournal(path)
+    args.env = args.env or journal.settings.get('env')
+    args.client = args.client or journal.settings.get('client')
+    args.user = args.user or journal.settings.get('user')
+    return journal
+
+
+def build_parser():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--env', help='environment, e.g. eup6')
+    common.add_argument('--client', help='client id, e.g. 1001')
+    common.add_argument('--user')
+    common.add_argument('--password', help='defaults to $AUTOMIC_PASSWORD or the config file')
+    common.add_argument('--url', help='override the REST base URL (e.g. a mock server)')
+    common.add_argument('--workers', type=int, help='concurrent requests (default: per-environment limit)')
+    common.add_argument('--config', default=CONFIG_PATH, help='settings file used for defaults')
+    common.add_argument('--metrics', metavar='PATH', help='write the run metrics to this JSON file')
+    targets = argparse.ArgumentParser(add_help=False)
+    targets.add_argument('--targets', metavar='SPEC',
+                         help="run on several env/client targets at once, e.g. 'eup6/1001 eup6/1111 eup7'")
+    sub = ap.add_subparsers(dest='command', required=True)
+
+    create = sub.add_parser('create', parents=[common, targets], help='create JOBS/JOBP from program/variant pairs')
+    create.add_argument('--armt', help='ARMT number (target folder AUTOMATION_JOBS/<user>/<armt>)')
+    create.add_argument('--job-template')
+    create.add_argument('--jobplan-template')
+    create.add_argument('--pairs', help="CSV/TSV/XLSX/text file, or '-' for stdin")
+    create.add_argument('--main-name', help='also create a main jobplan with this name')
+    create.add_argument('--main-jobs', action='store_true', help='main jobplan holds the JOBS instead of the JOBPs')
+    create.add_argument('--sequential', action='store_true', help='chain main jobplan children one after another')
+    create.add_argument('--lanes', type=int, default=1, help='run main jobplan children as N chains side by side')
+    create.add_argument('--fan-out', type=int, help=f'most children per generated jobplan (default {MAIN_FAN_OUT})')
+    create.add_argument('--batch-size', type=int, help=f'objects per POST request, above 1 to try batched posts (default {POST_BATCH_SIZE})')
+    create.add_argument('--dry-run', action='store_true', help='list the target folder and print the plan without writing')
+    create.add_argument('--update-changed', action='store_true', help='compare existing objects and overwrite the ones that differ')
+    create.add_argument('--no-precheck', action='store_true', help='post every object without listing the target folder first')
+    create.add_argument('--resume', metavar='JOURNAL', help="re-run the outstanding objects of a journaled run ('latest' for the newest)")
+
+    usage = sub.add_parser('usage', parents=[common, targets], help='batch usage lookup')
+    usage.add_argument('--input', required=True, help="object names, one per line, or '-' for stdin")
+    usage.add_argument('--use-index', action='store_true', help='answer from the local usage index where possible and update it')
+
+    crawl = sub.add_parser('crawl', parents=[common], help='follow usage recursively and export the graph')
+    crawl.add_argument('--input', required=True, help="root object names, one per line, or '-' for stdin")
+    crawl.add_argument('--depth', type=int, default=CRAWL_DEPTH, help=f'levels to expand (default {CRAWL_DEPTH})')
+    crawl.add_argument('--max-nodes', type=int, help=f'stop adding objects past this many (default {CRAWL_MAX_NODES})')
+    crawl.add_argument('--output', metavar='PATH', help='write the graph as .graphml, .dot or .json')
+
+    rollback = sub.add_parser('rollback', parents=[common], help="delete the objects a journaled create run made")
+    rollback.add_argument('run', metavar='JOURNAL', help="journal of the run to undo ('latest' for the newest)")
+    rollback.add_argument('--dry-run', action='store_true', help='list what would be deleted without deleting')
+    rollback.add_argument('--yes', action='store_true', help='confirm the deletion')
+
+    index = sub.add_parser('index', parents=[common], help='query the local usage index (no requests)')
+    index.add_argument('--usage', required=True, metavar='PATTERN', help='objects listing a matching name among their references (* and ? wildcards)')
+    return ap
+
+#----------------------------
+# Commands
+#----------------------------
+
+def finish_metrics(args, metrics, journal=None):
+    emit, log = args.emit, args.log
+    metrics.finish()
+    log(metrics.summary())
+    emit('metrics', **metrics.snapshot())
+    path = args.metrics or (journal and os.path.splitext(journal.path)[0] + '.metrics.json')
+    if path:
+        try:
+            metrics.export(path)
+        except OSError as e:
+            log(f"Could not write metrics to {path}: {e}")
+
+
+def run_create(args, cfg):
+    emit, log = args.emit, args.log
+    journal = getattr(args, 'journal', None)
+    if journal:
+        settings = journal.settings
+        folder = settings['folder']
+        t_job, t_joplan = settings.get('job_template'), settings.get('jobplan_template')
+        main_name, main_jobplans = settings.get('main_name'), settings.get('main_contains_jobplans', True)
+        sequential = settings.get('sequential', False)
+        lanes, fan_out = settings.get('lanes', 1), settings.get('fan_out', MAIN_FAN_OUT)
+        # All pairs, so a main jobplan still lists every child; created ones are skipped
+        pairs, done, rebuild = journal.recorded_pairs(), journal.created(), journal.partial()
+        total = len(pairs)
+        log(f"Resuming {journal.path}: {journal.summary()}")
+    else:
+        args.armt = args.armt or cfg.get('ARMT_NO')
+        if not args.armt:
+            raise SystemExit("missing --armt")
+        if not args.pairs:
+            raise SystemExit("missing --pairs")
+        folder = f'AUTOMATION_JOBS/{args.user}/{args.armt}'
+        t_job = args.job_template or cfg.get('template_job_armt')
+        t_joplan = args.jobplan_template or cfg.get('template_joplan_armt')
+        main_name, main_jobplans, sequential = args.main_name, not args.main_jobs, args.sequential
+        lanes, fan_out = args.lanes, args.fan_out or cfg.get('MAIN_FAN_OUT', MAIN_FAN_OUT)
+        if args.pairs == '-':
+            pairs = list(iter_pairs_text(sys.stdin.read()))
+            total = len(pairs)
+        elif not os.path.exists(args.pairs):
+            raise SystemExit(f"pairs file not found: {args.pairs}")
+        else:
+            pairs = iter_pairs_file(args.pairs)
+            total = estimate_pairs_file(args.pairs)
+        done = rebuild = ()
+    if args.dry_run:
+        journal = None
+    elif not journal:
+        journal = RunJournal.start({
+            'env': args.env, 'client': str(args.client), 'user': args.user, 'folder': folder,
+            'job_template': t_job, 'jobplan_template': t_joplan, 'main_name': main_name,
+            'main_contains_jobplans': main_jobplans, 'sequential': sequential,
+            'lanes': lanes, 'fan_out': fan_out,
+        })
+    if journal:
+        emit('journal', path=journal.path)
+    args.workers = args.workers or concurrency_for(args.env, cfg)
+    limiter = limiter_for(args.env, cfg, args.client)
+    session = get_session(args.env, args.client, args.user, args.password, pool_size=args.workers, base_url=args.url, limiter=limiter)
+    templates = TemplateCache(ttl=cfg.get('TEMPLATE_CACHE_TTL', 900))
+    metrics = Metrics('create', expected_objects(total, t_joplan, done, main_name))
+
+    def on_result(r):
+        metrics.advance(r.ok)
+        emit('object', kind=r.kind, name=r.name, ok=r.ok, status=r.status)
+
+    cancel = getattr(args, 'cancel', None) or threading.Event()
+    batch_size = args.batch_size or cfg.get('POST_BATCH_SIZE', POST_BATCH_SIZE)
+    creator = BulkCreator(session, folder, templates=templates, max_workers=args.workers, log=log, journal=journal,
+                          on_result=on_result, batch_size=batch_size, name_rules=name_rules_for(args.client, cfg))
+    try:
+        with cancel_on_interrupt(cancel, emit), session.observed(metrics):
+            creator.load_templates(t_job, t_joplan)
+            results = creator.run(pairs, main_name=main_name, main_contains_jobplans=main_jobplans,
+                                  sequential=sequential, done=done, precheck=not args.no_precheck,
+                                  check_changes=args.update_changed, dry_run=args.dry_run, lanes=lanes, fan_out=fan_out,
+                                  rebuild=rebuild, cancelled=cancel.is_set)
+    except CreationError as e:
+        emit('error', message=str(e))
+        return EXIT_FATAL
+    finally:
+        if journal:
+            journal.close()
+        finish_metrics(args, metrics, journal)
+    results = results + creator.sub_results
+    if creator.main_result:
+        results = results + [creator.main_result]
+    failed = sum(1 for r in results if not r.ok)
+    log(limiter.summary())
+    if journal:
+        log(journal.summary())
+    emit('summary', objects=len(results), failed=failed, jobs=len(creator.jobs_list), jobplans=len(creator.jobps_list),
+         cancelled=cancel.is_set())
+    if cancel.is_set():
+        return EXIT_INTERRUPTED
+    return EXIT_FAILURES if failed else EXIT_OK
+
+
+def read_names(path):
+    if path == '-':
+        lines = sys.stdin
+    elif not os.path.exists(path):
+        raise SystemExit(f"input file not found: {path}")
+    else:
+        lines = open(path, 'r')
+    with lines:
+        return [line.strip() for line in lines if line.strip()]
+
+
+def run_usage(args, cfg):
+    from automic_usage import iter_usage
+    emit, log = args.emit, args.log
+    names = read_names(args.input)
+    limiter = limiter_for(args.env, cfg, args.client)
+    args.workers = args.workers or limiter.max_limit
+    session = get_session(args.env, args.client, args.user, args.password, pool_size=args.workers, base_url=args.url, limiter=limiter)
+    failed = references = 0
+    metrics = Metrics('usage', len(names))
+    index = stale = None
+    to_fetch = names
+    if args.use_index:
+        from automic_index import UsageIndex, index_settings
+        index = UsageIndex(**index_settings(cfg))
+        entries, stale, to_fetch = index.split(session.env, session.client_id, names)
+        for entry in entries.values():
+            references += len(entry.refs)
+            metrics.advance()
+            emit('usage', object=entry.name, references=entry.refs, last_execution=entry.last_exec, error=None, indexed=True)
+        log(f"Usage index: {len(entries)} served, {len(stale)} stale, {len(to_fetch)} to fetch")
+    fetched = []
+    with session.observed(metrics):
+        for obj_name, refs, last_exec, error in iter_usage(session, to_fetch, args.workers, log=log):
+            failed += bool(error)
+            references += len(refs)
+            metrics.advance(not error)
+            if not error:
+                fetched.append((obj_name, refs, last_exec))
+            emit('usage', object=obj_name, references=refs, last_execution=last_exec, error=error)
+        if index:
+            index.store(session.env, session.client_id, fetched)
+            refresh = index.refresh(session, stale, args.workers, on_done=lambda n: log(f"Usage index: refreshed {n} stale entries"), log=log)
+            if refresh:
+                refresh.join()  # the process is about to exit
+            index.close()
+    log(limiter.summary())
+    finish_metrics(args, metrics)
+    emit('summary', objects=len(names), references=references, failed=failed)
+    return EXIT_FAILURES if failed else EXIT_OK
+
+
+def run_crawl(args, cfg):
+    emit, log = args.emit, args.log
+    names = read_names(args.input)
+    limiter = limiter_for(args.env, cfg, args.client)
+    args.workers = args.workers or limiter.max_limit
+    session = get_session(args.env, args.client, args.user, args.password, pool_size=args.workers, base_url=args.url, limiter=limiter)
+    metrics = Metrics('crawl')
+
+    def on_result(obj_name, refs, depth, error):
+        metrics.advance(not error)
+        emit('crawl', object=obj_name, depth=depth, references=refs, error=error)
+
+    with session.observed(metrics):
+        graph = crawl_usage(session, names, args.depth, args.workers, args.max_nodes or cfg.get('CRAWL_MAX_NODES', CRAWL_MAX_NODES),
+                            on_result=on_result, log=log)
+    if args.output:
+        graph.export(args.output)
+    log(limiter.summary())
+    finish_metrics(args, metrics)
+    emit('summary', objects=len(graph.nodes), references=len(graph.edges), failed=len(graph.errors),
+         truncated=graph.truncated, output=args.output)
+    return EXIT_FAILURES if graph.errors else EXIT_OK
+
+
+def run_fan_out(args, cfg, command, targets):
+    """Run `command` on every target at once, each with its own session,
+    pool and limiter. Events carry a 'target' field; per-target metrics go
+    to --metrics with the target added to the name. Returns the worst exit
+    status."""
+    if getattr(args, 'journal', None):
+        raise SystemExit("--targets cannot be combined with --resume")
+    if '-' in (getattr(args, 'pairs', None), getattr(args, 'input', None)):
+        raise SystemExit("--targets reads its input once per target: give a file, not '-'")
+    cancel = threading.Event()
+
+    def run(target):
+        run_args = copy.copy(args)
+        run_args.env, run_args.client, run_args.cancel = target.env, target.client, cancel
+        run_args.emit = functools.partial(emit, target=str(target))
+        run_args.log = lambda msg: run_args.emit('log', message=msg)
+        if args.metrics:
+            base, ext = os.path.splitext(args.metrics)
+            run_args.metrics = f"{base}.{target.env}-{target.client}{ext}"
+        try:
+            return [command(run_args, cfg)]
+        except SystemExit as e:
+            run_args.emit('error', message=str(e.code))
+            return [EXIT_USAGE]
+
+    emit('targets', targets=[str(t) for t in targets])
+    status = {}
+    with cancel_on_interrupt(cancel):
+        for target, code, error in fan_out(targets, run):
+            if error:
+                emit('error', target=str(target), message=f"Unexpected error: {error}")
+                code = EXIT_FATAL
+            status[str(target)] = code
+    emit('fan_out', status={str(t): status[str(t)] for t in targets})
+    return max(status.values())
+
+
+def run_rollback(args, cfg):
+    from automic_rollback import Rollback
+    emit, log = args.emit, args.log
+    journal = args.journal
+    args.workers = args.workers or concurrency_for(args.env, cfg)
+    limiter = limiter_for(args.env, cfg, args.client)
+    session = get_session(args.env, args.client, args.user, args.password, pool_size=args.workers, base_url=args.url, limiter=limiter)
+
+    def on_result(r):
+        metrics.advance(r.ok)
+        emit('object', kind=r.kind, name=r.name, ok=r.ok, status=r.status)
+
+    rollback = Rollback(session, journal, max_workers=args.workers, log=log, on_result=on_result)
+    if not args.dry_run and not args.yes and rollback.targets:
+        raise SystemExit(f"rollback deletes {len(rollback.targets)} objects from {journal.settings.get('folder')}: "
+                         "pass --yes to confirm, or --dry-run to list them")
+    metrics = Metrics('rollback', len(rollback.targets))
+    cancel = threading.Event()
+    remaining = []
+    try:
+        with cancel_on_interrupt(cancel, emit), session.observed(metrics):
+            results = rollback.run(cancelled=cancel.is_set, dry_run=args.dry_run)
+            if not args.dry_run and rollback.targets:
+                remaining = rollback.verify()
+    except CreationError as e:
+        emit('error', message=str(e))
+        return EXIT_FATAL
+    finally:
+        journal.close()
+        finish_metrics(args, metrics)  # not next to the journal: that file is the create run's
+    failed = sum(1 for r in results if not r.ok)
+    log(limiter.summary())
+    log(journal.summary())
+    emit('summary', objects=len(results), failed=failed, remaining=len(remaining), cancelled=cancel.is_set())
+    if cancel.is_set():
+        return EXIT_INTERRUPTED
+    return EXIT_FAILURES if failed or remaining else EXIT_OK
+
+
+def run_index(args, cfg):
+    from automic_index import UsageIndex, index_settings
+    emit = args.emit
+    args.env = args.env or cfg.get('ENV')
+    args.client = args.client or cfg.get('CLIENT_ID')
+    if not args.env or not args.client:
+        raise SystemExit(f"missing --env/--client (not given and not in {args.config})")
+    index = UsageIndex(**index_settings(cfg))
+    rows = index.find_usage(args.env, int(args.client), args.usage)
+    index.close()
+    for obj_name, ref_name, ref_type, folder, modified, last_exec in rows:
+        emit('usage_row', object=obj_name, usage=ref_name, type=ref_type, folder=folder,
+             last_modified=modified, last_execution=last_exec)
+    emit('summary', rows=len(rows), objects=len({row[0] for row in rows}))
+    return EXIT_OK
+
+
+def main(argv=None):
+    ap = build_parser()
+    args = ap.parse_args(argv)
+    args.emit, args.log = emit, log
+    cfg = load_config(args.config)
+    try:
+        if getattr(args, 'resume', None):
+            args.journal = open_resume(args, args.resume)
+        elif args.command == 'rollback':
+            args.journal = open_resume(args, args.run)
+        if args.command == 'index':
+            return run_index(args, cfg)  # local only, no credentials needed
+        targets = None
+        if getattr(args, 'targets', None):
+            try:
+                targets = parse_targets(args.targets)
+            except ValueError as e:
+                raise SystemExit(f"--targets: {e}")
+            args.env, args.client = targets[0]  # checked per target below
+        resolve_connection(args, cfg)
+        command = {'create': run_create, 'usage': run_usage, 'crawl': run_crawl, 'rollback': run_rollback}[args.command]
+        if targets:
+            return run_fan_out(args, cfg, command, targets)
+        return command(args, cfg)
+    except SystemExit as e:
+        if isinstance(e.code, str):
+            ap.error(e.code)
+        raise
+    except KeyboardInterrupt:
+        emit('error', message='interrupted')
+        return EXIT_INTERRUPTED
+    except Exception as e:
+        emit('error', message=f"Unexpected error: {e}")
+        return EXIT_FATAL
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,459 @@
+import itertools
+import re
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from automic_limits import limits_for
+
+#----------------------------
+# Concurrency limits
+#----------------------------
+
+FALLBACK_CONCURRENCY = 4
+# Objects per POST /objects request; 'POST_BATCH_SIZE' in the config. Off (1)
+# by default: the multi-object envelope is only known to work with the mock.
+POST_BATCH_SIZE = 1
+
+
+def concurrency_for(env, config=None):
+    """Workers for a creation run on `env`: its RATE_LIMITS max_concurrency, so
+    the pool never holds the adaptive limiter below its ceiling."""
+    return limits_for(env, config)['max_concurrency']
+
+#----------------------------
+# Throughput meter
+#----------------------------
+
+class RateMeter:
+    def __init__(self, total=None):
+        self.total = total
+        self.done = 0
+        self.failed = 0
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+
+    def add(self, ok=True):
+        with self._lock:
+            self.done += 1
+            if not ok:
+                self.failed += 1
+
+    def rate(self):
+        elapsed = time.monotonic() - self.started
+        return self.done / elapsed if elapsed > 0 else 0.0
+
+    def summary(self):
+        count = f"{self.done}/{self.total}" if self.total else f"{self.done}"
+        text = f"{count} objects, {self.rate():.1f} obj/s"
+        if self.failed:
+            text += f", {self.failed} failed"
+        return text
+
+#----------------------------
+# Creation engine
+#----------------------------
+
+PostResult = namedtuple('PostResult', 'unit kind name ok status')
+
+
+class CreationEngine:
+    """Posts units of objects through a bounded worker pool.
+
+    A unit is a list of (kind, name, body) steps posted in order; a failed
+    step skips the rest of its unit. After `cancelled()` no new unit starts.
+    """
+
+    def __init__(self, post, max_workers=FALLBACK_CONCURRENCY, log=print, report_interval=2.0, on_result=None,
+                 cancelled=lambda: False):
+        self.post = post
+        self.max_workers = max(1, int(max_workers))
+        self.log = log
+        self.report_interval = report_interval
+        self.on_result = on_result
+        self.cancelled = cancelled
+        self.meter = RateMeter()
+
+    def run(self, units, total=None):
+        self.meter = RateMeter(total)
+        results = []
+        lock = threading.Lock()
+        # Bound queued units too, so a generator input is consumed lazily.
+        slots = threading.BoundedSemaphore(self.max_workers + self.lookahead())
+        stop = threading.Event()
+        reporter = threading.Thread(target=self._report, args=(stop,), daemon=True)
+        reporter.start()
+
+        errors = []
+
+        def done(future):
+            slots.release()
+            try:
+                unit_results = future.result()
+            except Exception as e:
+                # e.g. raised by on_result; the unit's results are unknown
+                errors.append(e)
+                return
+            with lock:
+                results.extend(unit_results)
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                for index, unit in enumerate(units):
+                    if self.cancelled() or errors:
+                        break
+                    slots.acquire()
+                    pool.submit(self._run_unit, index, unit).add_done_callback(done)
+        finally:
+            stop.set()
+            reporter.join()
+        if errors:
+            self.log(f"Stopped: {errors[0]!r} after {self.meter.summary()}")
+            raise errors[0]
+        if self.cancelled():
+            self.log(f"Cancelled after in-flight posts finished: {self.meter.summary()}")
+        else:
+            self.log(f"Finished: {self.meter.summary()}")
+        results.sort(key=lambda r: r.unit)
+        return results
+
+    def lookahead(self):
+        """Units queued for the pool beyond the ones being posted."""
+        return self.max_workers
+
+    def _run_unit(self, index, unit):
+        if self.cancelled():
+            return []  # queued behind the pool when the run was cancelled
+        out = []
+        steps = iter(unit)
+        for kind, name, body in steps:
+            try:
+                ok, status = self.post(kind, name, body() if callable(body) else body)
+            except Exception as e:
+                ok, status = False, str(e)
+            self._record(out, PostResult(index, kind, name, ok, status))
+            if not ok:
+                self._skip(out, index, steps)
+                break
+        return out
+
+    def _record(self, out, result):
+        self.meter.add(result.ok)
+        out.append(result)
+        if result.status == 'skipped':
+            self.log(f"SKIP {result.kind}: {result.name} (depends on failed object)")
+        elif result.ok:
+            self.log(f"{result.kind}: {result.name}" + (f" ({result.status})" if isinstance(result.status, str) else ''))
+        else:
+            self.log(f"FAIL {result.kind}: {result.name} ({result.status})")
+        if self.on_result:
+            self.on_result(result)
+
+    def _skip(self, out, index, steps):
+        for kind, name, _ in steps:
+            self._record(out, PostResult(index, kind, name, False, 'skipped'))
+
+    def _report(self, stop):
+        last = -1
+        while not stop.wait(self.report_interval):
+            if self.meter.done != last:
+                last = self.meter.done
+                self.log(f"Progress: {self.meter.summary()}")
+
+
+class BatchEngine(CreationEngine):
+    """CreationEngine that hands each worker `batch_size` units at a time.
+
+    Step n of every unit in a batch goes in one `post_batch(kind, [(name,
+    body), ...], cancelled)` call, which returns {name: (ok, status)}.
+    """
+
+    def __init__(self, post_batch, batch_size=POST_BATCH_SIZE, **kwargs):
+        super().__init__(None, **kwargs)
+        self.post_batch = post_batch
+        self.batch_size = max(1, int(batch_size))
+
+    def run(self, units, total=None):
+        units = iter(units)
+        batches = iter(lambda: list(itertools.islice(units, self.batch_size)), [])
+        return super().run(batches, total)
+
+    def lookahead(self):
+        return 1
+
+    def _run_unit(self, index, batch):
+        out = []
+        live = [(index * self.batch_size + i, iter(unit)) for i, unit in enumerate(batch)]
+        while live and not self.cancelled():
+            by_kind = {}
+            for unit, steps in live:
+                step = next(steps, None)
+                if step:
+                    by_kind.setdefault(step[0], []).append((unit, steps, step))
+            live = []
+            for kind, group in by_kind.items():
+                items = []
+                for unit, steps, (_, name, body) in group:
+                    try:
+                        items.append((unit, steps, name, body() if callable(body) else body))
+                    except Exception as e:
+                        self._record(out, PostResult(unit, kind, name, False, str(e)))
+                        self._skip(out, unit, steps)
+                if not items:
+                    continue
+                try:
+                    outcome = self.post_batch(kind, [(name, body) for _, _, name, body in items], self.cancelled)
+                except Exception as e:
+                    outcome = {name: (False, str(e)) for _, _, name, _ in items}
+                for unit, steps, name, _ in items:
+                    if name not in outcome:
+                        continue  # not sent: the run was cancelled
+                    ok, status = outcome[name]
+                    self._record(out, PostResult(unit, kind, name, ok, status))
+                    if ok:
+                        live.append((unit, steps))
+                    else:
+                        self._skip(out, unit, steps)
+        return out
+
+#----------------------------
+# Object builders
+#----------------------------
+
+class CreationError(Exception):
+    """A bulk run cannot start; the message is meant for the user."""
+
+
+def extract_default_login(template_jobs):
+    for proc in template_jobs.get('scripts', []):
+        if 'process' in proc:
+            for line in proc['process']:
+                m = re.match(r":PUT_ATT\s+LOGIN\s*=\s*'([^']+)'", line)
+                if m:
+                    return m.group(1)
+    return 'LOGIN_R3_060_SY-BATCH-PM'
+
+
+def fetch_template(session, name, kind, label, templates=None):
+    try:
+        res = templates.get_object(session, name) if templates else session.get_object(name)
+    except Exception as e:
+        raise CreationError(f"Unexpected error fetching {label} {name}: {str(e)}")
+    if res.status != 200:
+        raise CreationError(f"Failed to fetch {label} {name}: {res.status}")
+    if 'data' not in res.response or kind not in res.response['data']:
+        raise CreationError(f"{label.capitalize()} {name} not found or invalid response from server")
+    return res.response['data'][kind]
+
+
+def job_script(cid, jn, p, default_login):
+    login_val = f"LOGIN_R3_060_{p.get('login', default_login)}"
+    if cid == 1111:
+        return [
+            ":INC BSH_XXXX_INC_MIGRATION_SIMULATION WAIT_TIME = \"<Random number ...>\" ,NOFOUND=IGNORE",
+            f":PUT_ATT JOB_NAME= \"{jn}\"",
+            f":PUT_ATT LOGIN='{login_val}'",
+            f"R3_ACTIVATE_REPORT REPORT='{p['program']}',VARIANT='{p['variant']}',COPIES=1,EXPIR=8,LINE_COUNT=65,LINE_SIZE=80,LAYOUT=X_FORMAT,DATA_SET=LIST1S,TYPE=TEXT"
+        ]
+    return (
+        ([f':PUT_ATT JOB_NAME= "{jn}"'] if not p.get('isBSH') else [])
+        + [f"R3_ACTIVATE_REPORT REPORT='{p['program']}',VARIANT='{p['variant']}'"]
+    )
+
+
+class TemplateRenderer:
+    """Template compiled once into a per-pair body builder.
+
+    Only the changing paths are copied; the rest is shared with the
+    template, so rendered bodies are read-only.
+    """
+
+    def __init__(self, template, template_job_name=None):
+        self.template = template
+        self.template_job_name = template_job_name
+        self.process_idx = {i for i, proc in enumerate(template.get('scripts', [])) if 'process' in proc}
+        self.workflow_idx = {i for i, wf in enumerate(template.get('workflow_definitions', []))
+                             if template_job_name is not None and wf.get('object_name') == template_job_name}
+
+    def render(self, name, script=None, job_name=None):
+        body = dict(self.template)
+        body['general_attributes'] = dict(self.template['general_attributes'], name=name)
+        if script is not None and self.process_idx:
+            body['scripts'] = [dict(proc, process=script) if i in self.process_idx else proc
+                               for i, proc in enumerate(self.template['scripts'])]
+        if job_name is not None and self.workflow_idx:
+            body['workflow_definitions'] = [dict(wf, object_name=job_name) if i in self.workflow_idx else wf
+                                            for i, wf in enumerate(self.template['workflow_definitions'])]
+        return body
+
+
+#----------------------------
+# Main jobplans
+#----------------------------
+
+# Most children one generated jobplan holds; longer lists are split into
+# sub-jobplans. Can be overridden with 'MAIN_FAN_OUT' in ~/.automic_tools.json.
+MAIN_FAN_OUT = 100
+GRID_ROWS = 25  # parallel children per editor column before wrapping
+
+JobplanPlan = namedtuple('JobplanPlan', 'name items lanes sequential level')
+
+
+def _chain_node(line_no, name, object_type, row, column, predecessors):
+    return {
+        'line_number': line_no,
+        'object_type': object_type,
+        'object_name': name,
+        'precondition_error_action': 'H',
+        'predecessors': predecessors,
+        'active': 1,
+        'mrt_time': '000000',
+        'childflags': '0000000000000000',
+        'rollback_enabled': 1,
+        'row': row,
+        'column': column,
+    }
+
+
+def lane_sizes(count, lanes):
+    """Split `count` items into `lanes` contiguous lanes as evenly as possible."""
+    lanes = min(max(1, lanes), count) or 1
+    size, extra = divmod(count, lanes)
+    return [size + (lane < extra) for lane in range(lanes)]
+
+
+def build_jobplan(tmpl_jobp, name, items, lanes=1, sequential=False):
+    """Jobplan body running `items`, a list of (object_name, object_type).
+
+    Parallel by default, one chain if `sequential`, or `lanes` chains side by side.
+    """
+    defs = tmpl_jobp['workflow_definitions']
+    start_node = dict(next(obj for obj in defs if obj['object_type'] == '<START>'))
+    end_node = dict(next(obj for obj in defs if obj['object_type'] == '<END>'))
+    start_node.update(line_number=1, row=1, column=1)
+    nodes = [start_node]
+    conds = []
+    tails = []  # line numbers END waits for
+    line_no = 2
+
+    sizes = lanes if isinstance(lanes, (list, tuple)) else lane_sizes(len(items), lanes)
+    if len(sizes) > 1 or sequential:
+        pos = 0
+        for row, count in enumerate(sizes, 1):
+            prev = 1
+            for column, (child, child_type) in enumerate(items[pos:pos + count], 2):
+                nodes.append(_chain_node(line_no, child, child_type, row, column, 1))
+                conds.append({'workflow_line_number': line_no, 'line_number': 1, 'predecessor_line_number': prev})
+                prev = line_no
+                line_no += 1
+            pos += count
+            if prev != 1:
+                tails.append(prev)
+        end_column = max(sizes, default=0) + 2
+    else:
+        for i, (child, child_type) in enumerate(items):
+            nodes.append(_chain_node(line_no, child, child_type, i % GRID_ROWS + 1, i // GRID_ROWS + 2, 1))
+            conds.append({'workflow_line_number': line_no, 'line_number': 1, 'predecessor_line_number': 1})
+            tails.append(line_no)
+            line_no += 1
+        end_column = (len(items) - 1) // GRID_ROWS + 3 if items else 2
+
+    end_node.update(line_number=line_no, row=1, column=end_column, predecessors=len(tails))
+    for idx, p in enumerate(tails, 1):
+        conds.append({'workflow_line_number': line_no, 'line_number': idx, 'predecessor_line_number': p})
+    nodes.append(end_node)
+
+    data = dict(tmpl_jobp, workflow_definitions=nodes, line_conditions=conds)
+    data['general_attributes'] = dict(tmpl_jobp['general_attributes'], name=name)
+    return data
+
+
+def plan_main_jobplans(main_name, children, child_type='JOBP', fan_out=MAIN_FAN_OUT, sequential=False, lanes=1):
+    """Split a main jobplan over `children` into jobplans of at most `fan_out` nodes.
+
+    Returns JobplanPlan entries in creation order, the main jobplan last.
+    """
+    fan_out = max(2, int(fan_out))
+    lanes = max(1, int(lanes))
+    chained = sequential or lanes > 1
+    plans = []
+    counter = itertools.count(1)
+
+    def reduce(items, limit):
+        level = 0
+        while len(items) > limit:
+            level += 1
+            grouped = []
+            for i in range(0, len(items), fan_out):
+                name = f"{main_name}_{next(counter):03d}"
+                plans.append(JobplanPlan(name, items[i:i + fan_out], 1, chained, level))
+                grouped.append((name, 'JOBP'))
+            items = grouped
+        return items
+
+    items = [(child, child_type) for child in children]
+    if lanes == 1:
+        plans.append(JobplanPlan(main_name, reduce(items, fan_out), 1, sequential, 0))
+        return plans
+    # Each lane is reduced on its own so that all lanes together fit the
+    # main jobplan; lanes may then differ in length, so pass their sizes.
+    top, pos = [], 0
+    sizes = lane_sizes(len(items), lanes)
+    for count in sizes:
+        top.append(reduce(items[pos:pos + count], max(1, fan_out // len(sizes))))
+        pos += count
+    plans.sort(key=lambda p: p.level)
+    plans.append(JobplanPlan(main_name, [item for lane in top for item in lane], [len(lane) for lane in top], True, 0))
+    return plans
+
+#----------------------------
+# Object search
+#----------------------------
+
+SEARCH_PAGE_SIZE = 1000
+
+
+def search_pages(session, body, what, page_size=SEARCH_PAGE_SIZE, retry=None):
+    """Yield the objects an object search finds, read in pages; none on 404.
+
+    With `retry` (a RetryPolicy) each page is retried on transient failures.
+    """
+    start = 0
+    while True:
+        page = dict(body, max_results=page_size, start_at=start)
+        res = retry.call(lambda: session.search_objects(page)) if retry else session.search_objects(page)
+        if res.status == 404:
+            return  # e.g. folder not created yet
+        if not res.ok:
+            raise CreationError(f"Failed to {what}: {res.status}")
+        data = res.response.get('data', [])
+        yield from data
+        if not data or not res.response.get('hasmore'):
+            return
+        start += len(data)
+
+
+def list_folder(session, folder, page_size=SEARCH_PAGE_SIZE):
+    """Return {name: type} for the objects directly in `folder`, read in pages."""
+    body = {
+        'filters': [{'filter_identifier': 'object_name', 'object_name': '*'}],
+        'folder': '/' + folder.strip('/'),
+        'include_subfolders': False,
+    }
+    return {obj['name']: obj.get('type') for obj in search_pages(session, body, f"list folder {folder}", page_size)}
+
+
+def find_objects(session, patterns, page_size=SEARCH_PAGE_SIZE, retry=None):
+    """Return {NAME: folder} for the objects anywhere in the client whose
+    name matches one of `patterns` (* wildcards): one paged search each,
+    run side by side."""
+    def search(pattern):
+        body = {'filters': [{'filter_identifier': 'object_name', 'object_name': pattern}]}
+        return list(search_pages(session, body, f"look up {pattern}", page_size, retry))
+
+    patterns = list(dict.fromkeys(patterns))
+    if not patterns:
+        return {}
+    with ThreadPoolExecutor(max_workers=len(patterns)) as pool:
+        return {obj['name'].upper(): obj.get('folder') or '/' for objs in pool.map(search, patterns) for obj in objs}
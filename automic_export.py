@@ -0,0 +1,87 @@
+import csv
+import os
+
+#----------------------------
+# Streaming export
+#----------------------------
+
+EXPORT_FILE_TYPES = [("Excel Files", "*.xlsx"), ("CSV Files", "*.csv"), ("Parquet Files", "*.parquet")]
+EXPORT_CHUNK_ROWS = 5000
+
+
+class ExportError(Exception):
+    pass
+
+
+class ExportCancelled(Exception):
+    pass
+
+
+def _write_xlsx(path, columns, chunks):
+    # Write-only mode streams rows to disk instead of keeping every cell object
+    from openpyxl import Workbook
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append(columns)
+    try:
+        for rows in chunks:
+            for row in rows:
+                ws.append(row)
+    except BaseException:
+        ws.close()  # end the sheet's writer before its temporary file is removed
+        raise
+    wb.save(path)
+
+
+def _write_csv(path, columns, chunks):
+    # utf-8-sig so Excel picks the encoding up when the file is double-clicked
+    with open(path, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        for rows in chunks:
+            writer.writerows(rows)
+
+
+def _write_parquet(path, columns, chunks):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ExportError("Parquet export needs pyarrow (pip install pyarrow)")
+    schema = pa.schema([(c, pa.string()) for c in columns])
+    with pq.ParquetWriter(path, schema) as writer:
+        for rows in chunks:
+            arrays = [pa.array([None if v is None else str(v) for v in col], pa.string()) for col in zip(*rows)]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+
+
+WRITERS = {'.xlsx': _write_xlsx, '.csv': _write_csv, '.parquet': _write_parquet}
+
+
+def export_store(store, path, progress=None, cancelled=lambda: False, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Write the rows of a UsageStore to `path`; the extension picks the format.
+
+    Returns the number of rows; raises ExportCancelled once `cancelled()`.
+    """
+    writer = WRITERS.get(os.path.splitext(path)[1].lower())
+    if writer is None:
+        raise ExportError(f"Unsupported export format: {os.path.basename(path)} (use .xlsx, .csv or .parquet)")
+    total = len(store)
+
+    def chunks():
+        for start in range(0, total, chunk_rows):
+            if cancelled():
+                raise ExportCancelled()
+            rows, _ = store.rows(start, min(start + chunk_rows, total))
+            yield rows
+            if progress:
+                progress(start + len(rows), total)
+
+    tmp = path + '.part'
+    try:
+        writer(tmp, list(store.columns), chunks())
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return total
@@ -0,0 +1,115 @@
+import queue
+import threading
+from collections import namedtuple
+
+from automic_usage import USAGE_COLUMNS, iter_usage, usage_rows
+
+#----------------------------
+# Targets
+#----------------------------
+
+# Clients offered per environment, and what 'env' or 'env/*' expands to
+ENV_CLIENTS = {
+    'eup4': ['1100'],
+    'eup6': ['1001', '1111'],
+    'eup7': ['1101', '1301', '1401', '7101'],
+}
+TARGET_COLUMN = "Target"
+FANOUT_COLUMNS = (TARGET_COLUMN,) + USAGE_COLUMNS
+
+
+class Target(namedtuple('Target', 'env client')):
+    __slots__ = ()
+
+    def __str__(self):
+        return f"{self.env}/{self.client}"
+
+
+def parse_targets(spec, env_clients=ENV_CLIENTS):
+    """Targets named in `spec`, e.g. 'eup6/1001 eup6/1111' or 'eup6/1001, eup7'.
+
+    Entries are separated by commas, semicolons or spaces; 'eup7' or
+    'eup7/*' stands for every client listed for eup7. Duplicates are
+    dropped, order is kept. Raises ValueError on an entry it cannot read.
+    """
+    targets = []
+    for entry in spec.replace(',', ' ').replace(';', ' ').split():
+        env, _, client = entry.partition('/')
+        if client in ('', '*'):
+            if env not in env_clients:
+                raise ValueError(f"unknown environment {env!r} (known: {', '.join(env_clients)})")
+            clients = env_clients[env]
+        elif client.isdigit():
+            clients = [client]
+        else:
+            raise ValueError(f"bad target {entry!r}: expected env/client, e.g. eup7/1301")
+        targets.extend(Target(env, str(c)) for c in clients)
+    if not targets:
+        raise ValueError("no targets given")
+    return list(dict.fromkeys(targets))
+
+#----------------------------
+# Concurrent runs
+#----------------------------
+
+FANOUT_QUEUE = 1000  # results buffered ahead of the consumer
+_DONE = object()
+
+
+def fan_out(targets, fn):
+    """Run `fn(target)` for every target at once, one thread each.
+
+    Yields (target, item, None) as items arrive, or (target, None, error).
+    """
+    results = queue.Queue(maxsize=FANOUT_QUEUE)
+    stop = threading.Event()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                results.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def run(target):
+        try:
+            for item in fn(target):
+                if not put((target, item, None)):
+                    return
+        except Exception as e:
+            put((target, None, str(e)))
+        finally:
+            put((target, _DONE, None))
+
+    for target in targets:
+        threading.Thread(target=run, args=(target,), name=f"fan-out {target}", daemon=True).start()
+    remaining = len(targets)
+    try:
+        while remaining:
+            target, item, error = results.get()
+            if item is _DONE:
+                remaining -= 1
+                continue
+            yield target, item, error
+    finally:
+        stop.set()
+
+
+def fan_out_usage(connect, targets, names, max_workers=10, cancelled=lambda: False, log=print):
+    """Yield (target, obj_name, references, last_execution, error) for every
+    name on every target. `connect(target)` returns that target's session;
+    a target that fails as a whole yields a single result with obj_name None.
+    """
+    names = list(names)
+    for target, item, error in fan_out(targets, lambda t: iter_usage(connect(t), names, max_workers, cancelled, log=lambda msg: log(f"{t}: {msg}"))):
+        if error:
+            yield target, None, [], None, error
+        else:
+            yield (target,) + item
+
+
+def fanout_rows(target, obj_name, refs, last_exec):
+    """Table rows for one object on one target, in FANOUT_COLUMNS order."""
+    return [(str(target),) + row for row in usage_rows(obj_name, refs, last_exec)]
@@ -0,0 +1,125 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from automic_usage import fetch_references
+
+#----------------------------
+# Usage graph
+#----------------------------
+
+CRAWL_DEPTH = 3
+CRAWL_MAX_NODES = 50000
+GRAPH_FILE_TYPES = [("GraphML", "*.graphml"), ("Graphviz DOT", "*.dot"), ("JSON", "*.json")]
+
+
+class UsageGraph:
+    """Objects found by a usage crawl (`nodes`) and who uses whom (`edges`)."""
+
+    def __init__(self, roots=()):
+        self.roots = list(dict.fromkeys(roots))
+        self.nodes = {}
+        self.edges = {}  # (user, used) -> None, a set that keeps insertion order
+        self.errors = {}
+        self.truncated = False
+
+    def add_node(self, name, depth, type=None, folder=None):
+        """Add `name` if new and return True; otherwise fill in what it lacked."""
+        node = self.nodes.get(name)
+        if node is None:
+            self.nodes[name] = {'type': type, 'folder': folder, 'depth': depth}
+            return True
+        if type and not node['type']:
+            node.update(type=type, folder=folder)
+        return False
+
+    def add_edge(self, user, used):
+        self.edges[(user, used)] = None
+
+    def export(self, path):
+        ext = os.path.splitext(path)[1].lower()
+        writer = {'.graphml': self.write_graphml, '.dot': self.write_dot, '.gv': self.write_dot, '.json': self.write_json}.get(ext)
+        if writer is None:
+            raise ValueError(f"Unsupported graph format: {os.path.basename(path)} (use .graphml, .dot or .json)")
+        with open(path, 'w', encoding='utf-8') as f:
+            writer(f)
+        return path
+
+    def write_json(self, f):
+        json.dump({
+            'roots': self.roots,
+            'nodes': [dict(id=name, **attrs) for name, attrs in self.nodes.items()],
+            'edges': [{'source': user, 'target': used} for user, used in self.edges],
+            'errors': self.errors,
+            'truncated': self.truncated,
+        }, f, indent=1)
+
+    def write_dot(self, f):
+        def q(value):
+            return '"' + str(value).replace('\\', '\\\\').replace('"', '\\"') + '"'
+        f.write('digraph usage {\n')
+        for name, attrs in self.nodes.items():
+            fields = [f"{key}={q(value)}" for key, value in attrs.items() if value is not None]
+            if name in self.roots:
+                fields.append('shape=box')
+            f.write(f"  {q(name)} [{', '.join(fields)}];\n")
+        for user, used in self.edges:
+            f.write(f"  {q(user)} -> {q(used)};\n")
+        f.write('}\n')
+
+    def write_graphml(self, f):
+        # xml.sax.saxutils pulls in urllib.request and ssl; keep them out of start-up
+        from xml.sax.saxutils import escape, quoteattr
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+                '<graphml xmlns="http://graphml.graphdrawing.org/xmlns">\n'
+                '  <key id="type" for="node" attr.name="type" attr.type="string"/>\n'
+                '  <key id="folder" for="node" attr.name="folder" attr.type="string"/>\n'
+                '  <key id="depth" for="node" attr.name="depth" attr.type="int"/>\n'
+                '  <graph id="usage" edgedefault="directed">\n')
+        for name, attrs in self.nodes.items():
+            data = ''.join(f'<data key="{key}">{escape(str(value))}</data>' for key, value in attrs.items() if value is not None)
+            f.write(f"    <node id={quoteattr(name)}>{data}</node>\n")
+        for user, used in self.edges:
+            f.write(f"    <edge source={quoteattr(user)} target={quoteattr(used)}/>\n")
+        f.write('  </graph>\n</graphml>\n')
+
+#----------------------------
+# Breadth-first crawl
+#----------------------------
+
+def crawl_usage(session, roots, max_depth=CRAWL_DEPTH, max_workers=10, max_nodes=CRAWL_MAX_NODES,
+                cancelled=lambda: False, on_result=None, log=print):
+    """Follow usage references breadth-first from `roots`, `max_depth` levels deep.
+
+    Each object is fetched at most once; returns the UsageGraph.
+    """
+    graph = UsageGraph(roots)
+    frontier = [name for name in graph.roots if graph.add_node(name, 0)]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for depth in range(max_depth):
+            if not frontier or cancelled():
+                break
+            futures = [executor.submit(lambda n: None if cancelled() else fetch_references(session, n, log), name) for name in frontier]
+            frontier = []
+            try:
+                for future in as_completed(futures):
+                    result = future.result()
+                    if result is None:
+                        continue
+                    name, refs, error = result
+                    if error:
+                        graph.errors[name] = error
+                    for ref in refs:
+                        user = ref["name"]
+                        if user not in graph.nodes and len(graph.nodes) >= max_nodes:
+                            graph.truncated = True
+                            continue
+                        if graph.add_node(user, depth + 1, ref.get("type"), ref.get("folderpath")):
+                            frontier.append(user)
+                        graph.add_edge(user, name)
+                    if on_result:
+                        on_result(name, refs, depth, error)
+            finally:
+                for future in futures:
+                    future.cancel()
+    return graph
@@ -0,0 +1,161 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+from automic_usage import iter_usage
+
+#----------------------------
+# Usage index
+#----------------------------
+
+USAGE_INDEX_PATH = os.path.join(os.path.expanduser('~'), '.automic_tools_usage.db')
+# Entries younger than INDEX_FRESH seconds are used as they are; older ones
+# are still served at once but refreshed in the background; past
+# INDEX_MAX_AGE they are fetched again before use. Both can be set in
+# ~/.automic_tools.json as USAGE_INDEX_FRESH / USAGE_INDEX_MAX_AGE.
+INDEX_FRESH = 6 * 3600
+INDEX_MAX_AGE = 30 * 86400
+INDEX_BATCH = 500  # names per query, under SQLite's bound-parameter limit
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    env TEXT NOT NULL, client INTEGER NOT NULL, name TEXT NOT NULL,
+    last_exec TEXT, fetched REAL NOT NULL,
+    PRIMARY KEY (env, client, name)
+);
+CREATE TABLE IF NOT EXISTS refs (
+    env TEXT NOT NULL, client INTEGER NOT NULL, name TEXT NOT NULL,
+    ref_name TEXT NOT NULL, ref_type TEXT, folderpath TEXT, lastmodified TEXT
+);
+CREATE INDEX IF NOT EXISTS refs_by_object ON refs (env, client, name);
+CREATE INDEX IF NOT EXISTS refs_by_usage ON refs (env, client, ref_name);
+"""
+
+IndexEntry = namedtuple('IndexEntry', 'name refs last_exec fetched')
+
+
+def index_settings(config=None):
+    config = config or {}
+    return {'fresh': config.get('USAGE_INDEX_FRESH', INDEX_FRESH),
+            'max_age': config.get('USAGE_INDEX_MAX_AGE', INDEX_MAX_AGE)}
+
+
+class UsageIndex:
+    """Local SQLite index of usage lookups, keyed by (env, client, object name).
+
+    One connection shared under a lock; WAL lets the CLI and the app share the file.
+    """
+
+    def __init__(self, path=USAGE_INDEX_PATH, fresh=INDEX_FRESH, max_age=INDEX_MAX_AGE):
+        self.path = path
+        self.fresh = fresh
+        self.max_age = max_age
+        self.refreshing = set()
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._lock:
+            self.conn.execute('PRAGMA journal_mode=WAL')
+            self.conn.execute('PRAGMA synchronous=NORMAL')
+            self.conn.executescript(SCHEMA)
+        self.prune()
+
+    def lookup(self, env, client, names):
+        """{name: IndexEntry} for the names indexed within `max_age`."""
+        names = list(dict.fromkeys(names))
+        oldest = time.time() - self.max_age
+        entries = {}
+        with self._lock:
+            for i in range(0, len(names), INDEX_BATCH):
+                batch = names[i:i + INDEX_BATCH]
+                marks = ','.join('?' * len(batch))
+                rows = self.conn.execute(
+                    f"SELECT name, last_exec, fetched FROM objects WHERE env=? AND client=? AND fetched>=? AND name IN ({marks})",
+                    [env, client, oldest, *batch]).fetchall()
+                found = {name: IndexEntry(name, [], last_exec, fetched) for name, last_exec, fetched in rows}
+                if not found:
+                    continue
+                marks = ','.join('?' * len(found))
+                for name, ref_name, ref_type, folderpath, lastmodified in self.conn.execute(
+                        f"SELECT name, ref_name, ref_type, folderpath, lastmodified FROM refs WHERE env=? AND client=? AND name IN ({marks}) ORDER BY rowid",
+                        [env, client, *found]):
+                    found[name].refs.append({'name': ref_name, 'type': ref_type, 'folderpath': folderpath, 'lastmodified': lastmodified})
+                entries.update(found)
+        return entries
+
+    def split(self, env, client, names):
+        """Return (entries, stale, missing): indexed entries to serve, the
+        names among them due for a refresh, and names not usable from the index."""
+        entries = self.lookup(env, client, names)
+        due = time.time() - self.fresh
+        stale = [name for name, entry in entries.items() if entry.fetched < due]
+        missing = [name for name in dict.fromkeys(names) if name not in entries]
+        return entries, stale, missing
+
+    def store(self, env, client, results):
+        """Record (name, refs, last_exec) results, replacing earlier ones."""
+        now = time.time()
+        rows = [(name, refs, last_exec) for name, refs, last_exec in results if last_exec != "Error"]
+        if not rows:
+            return 0
+        with self._lock, self.conn:
+            for name, refs, last_exec in rows:
+                self.conn.execute("DELETE FROM refs WHERE env=? AND client=? AND name=?", (env, client, name))
+                self.conn.execute("INSERT OR REPLACE INTO objects VALUES (?, ?, ?, ?, ?)", (env, client, name, last_exec, now))
+                self.conn.executemany("INSERT INTO refs VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                      [(env, client, name, r["name"], r["type"], r["folderpath"], r["lastmodified"]) for r in refs])
+        return len(rows)
+
+    def find_usage(self, env, client, pattern):
+        """Index rows whose Usage entry matches `pattern` (* and ? wildcards):
+        every indexed object that lists it among its references. No requests."""
+        with self._lock:
+            return self.conn.execute(
+                "SELECT r.name, r.ref_name, r.ref_type, r.folderpath, substr(r.lastmodified, 1, 10), o.last_exec "
+                "FROM refs r JOIN objects o ON o.env=r.env AND o.client=r.client AND o.name=r.name "
+                "WHERE r.env=? AND r.client=? AND r.ref_name GLOB ? ORDER BY r.name, r.ref_name",
+                (env, client, pattern)).fetchall()
+
+    def refresh(self, session, names, max_workers=8, on_done=None, log=print):
+        """Re-fetch `names` on a background thread and store the results.
+
+        Names already being refreshed are skipped. `on_done(count)` is
+        called from that thread with the number of entries updated; errors
+        go to `log`.
+        """
+        key = (session.env, session.client_id)
+        with self._lock:
+            names = [name for name in names if (key, name) not in self.refreshing]
+            self.refreshing.update((key, name) for name in names)
+        if not names:
+            return None
+
+        def run():
+            count = 0
+            try:
+                results = [(name, refs, last_exec) for name, refs, last_exec, error in iter_usage(session, names, max_workers, log=log) if not error]
+                count = self.store(session.env, session.client_id, results)
+            except Exception as e:
+                log(f"Error refreshing usage index: {e}")
+            finally:
+                with self._lock:
+                    self.refreshing.difference_update((key, name) for name in names)
+                if on_done:
+                    on_done(count)
+
+        thread = threading.Thread(target=run, name='usage-index-refresh', daemon=True)
+        thread.start()
+        return thread
+
+    def prune(self):
+        """Drop entries past `max_age`."""
+        oldest = time.time() - self.max_age
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM refs WHERE rowid IN (SELECT r.rowid FROM refs r JOIN objects o "
+                              "ON o.env=r.env AND o.client=r.client AND o.name=r.name WHERE o.fetched<?)", (oldest,))
+            self.conn.execute("DELETE FROM objects WHERE fetched<?", (oldest,))
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
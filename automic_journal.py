@@ -0,0 +1,206 @@
+import json
+import os
+import threading
+from datetime import datetime
+
+#----------------------------
+# Run journal
+#----------------------------
+
+RUNS_DIR = os.path.join(os.path.expanduser('~'), '.automic_tools_runs')
+
+
+class RunJournal:
+    """Append-only record of one bulk creation run, one JSON object per line.
+
+    Reopening the file rebuilds which objects were created, so a later run
+    can resume with only the outstanding pairs.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.settings = {}
+        self.pairs = []
+        self.status = {}  # object name -> (ok, status), latest attempt wins
+        self.posted = {}  # object name -> kind, in creation order
+        self.deleted_names = set()
+        self.partial_names = set()
+        self.cancelled_at = None
+        self._known = set()
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            self.load()
+        self.file = None
+
+    @classmethod
+    def start(cls, settings, directory=RUNS_DIR):
+        """Create a new journal under `directory` for a run with `settings`."""
+        os.makedirs(directory, exist_ok=True)
+        label = settings.get('folder', 'run').replace('/', '_')
+        path = os.path.join(directory, f"{datetime.now():%Y%m%d-%H%M%S-%f}_{label}.jsonl")
+        journal = cls(path)
+        journal.settings = dict(settings)
+        journal._write({'event': 'run', 'started': datetime.now().isoformat(timespec='seconds'), **settings})
+        return journal
+
+    def load(self):
+        with open(self.path, 'r') as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    continue  # a line cut short by a crash
+                event = rec.pop('event', None)
+                if event == 'run':
+                    rec.pop('started', None)
+                    self.settings = rec
+                elif event == 'pair':
+                    self.pairs.append((rec['pair'], rec['objects']))
+                    self._known.add(json.dumps(rec['pair'], sort_keys=True))
+                elif event == 'result':
+                    self._absorb(rec['kind'], rec['name'], rec['ok'], rec['status'])
+                elif event == 'partial':
+                    self.partial_names.update(rec['names'])
+                elif event == 'cancelled':
+                    self.cancelled_at = rec['at']
+                elif event == 'deleted':
+                    self._forget(rec['names'])
+
+    def _write(self, rec):
+        with self._lock:
+            if self.file is None:
+                self.file = open(self.path, 'a', encoding='utf-8')
+            self.file.write(json.dumps(rec) + '\n')
+            self.file.flush()
+
+    def pair(self, pair, objects):
+        """Record `pair` and its object names, once per journal."""
+        key = json.dumps(pair, sort_keys=True)
+        if key in self._known:
+            return
+        self._known.add(key)
+        self.pairs.append((pair, list(objects)))
+        self._write({'event': 'pair', 'pair': pair, 'objects': list(objects)})
+
+    def _absorb(self, kind, name, ok, status):
+        self.status[name] = (ok, status)
+        self.partial_names.discard(name)
+        if ok and isinstance(status, int):  # 'exists', 'updated', ... were there before
+            self.posted.setdefault(name, kind)
+            self.deleted_names.discard(name)
+
+    def _forget(self, names):
+        for name in names:
+            self.status[name] = (False, 'deleted')
+            self.posted.pop(name, None)
+            self.partial_names.discard(name)
+            self.deleted_names.add(name)
+
+    def result(self, result):
+        self._absorb(result.kind, result.name, result.ok, result.status)
+        self._write({'event': 'result', 'kind': result.kind, 'name': result.name,
+                     'ok': result.ok, 'status': result.status})
+
+    def mark_partial(self, names):
+        """Record `names` as built over only part of the run."""
+        names = list(names)
+        self.partial_names.update(names)
+        self._write({'event': 'partial', 'names': names})
+
+    def mark_cancelled(self):
+        self.cancelled_at = datetime.now().isoformat(timespec='seconds')
+        self._write({'event': 'cancelled', 'at': self.cancelled_at})
+
+    def deleted(self, names):
+        """Record `names` as deleted by a rollback; a resume creates them again."""
+        names = list(names)
+        self._forget(names)
+        self._write({'event': 'deleted', 'names': names})
+
+    def created(self):
+        return {name for name, (ok, _) in self.status.items() if ok and name not in self.partial_names}
+
+    def partial(self):
+        return set(self.partial_names)
+
+    def failed(self):
+        return {name for name, (ok, _) in self.status.items() if not ok}
+
+    def recorded_pairs(self):
+        return [pair for pair, _ in self.pairs]
+
+    def outstanding(self):
+        """Pairs with at least one object not created yet."""
+        done = self.created()
+        return [pair for pair, objects in self.pairs if not objects or not set(objects) <= done]
+
+    def summary(self):
+        done = self.created()
+        objects = [name for _, names in self.pairs for name in names]
+        text = f"{sum(1 for name in objects if name in done)}/{len(objects)} objects created, {len(self.outstanding())} of {len(self.pairs)} pairs outstanding"
+        if self.partial_names:
+            text += f", {len(self.partial_names)} partial jobplans to rebuild"
+        if self.deleted_names:
+            text += f", {len(self.deleted_names)} deleted by rollback"
+        return text
+
+    def close(self):
+        with self._lock:
+            if self.file:
+                self.file.close()
+                self.file = None
+
+#----------------------------
+# Resuming
+#----------------------------
+
+class RunState:
+    """What a creation run takes from its journal and writes back to it.
+
+    Objects in `done` were created by an earlier run and are skipped; those
+    in `rebuild` are overwritten. Without a journal, or on a dry run,
+    nothing is written.
+    """
+
+    def __init__(self, journal=None, done=(), rebuild=(), dry_run=False):
+        self.journal = None if dry_run else journal
+        self.rebuild = set(rebuild)
+        self.done = set(done) - self.rebuild
+        self._done_keys = {name.upper() for name in self.done}
+
+    def pair(self, pair, names):
+        if self.journal:
+            self.journal.pair(pair, names)
+
+    def result(self, result):
+        if self.journal:
+            self.journal.result(result)
+
+    def rejected(self, pair, names, results, taken=()):
+        """Journal a pair refused before posting; names another pair owns
+        (`taken`, upper case) or an earlier run created keep their entries."""
+        if self.journal:
+            self.journal.pair(pair, names)
+            for result in results:
+                if result.name.upper() not in taken and result.name.upper() not in self._done_keys:
+                    self.journal.result(result)
+
+    def outstanding(self, unit):
+        """The steps of `unit` whose object an earlier run did not create."""
+        return [step for step in unit if step[1] not in self.done]
+
+    def cancelled(self):
+        if self.journal:
+            self.journal.mark_cancelled()
+
+    def partial(self, names):
+        if names and self.journal:
+            self.journal.mark_partial(names)
+
+
+def latest_journal(directory=RUNS_DIR):
+    try:
+        names = sorted(n for n in os.listdir(directory) if n.endswith('.jsonl'))
+    except FileNotFoundError:
+        return None
+    return os.path.join(directory, names[-1]) if names else None
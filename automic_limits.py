@@ -0,0 +1,206 @@
+import threading
+import time
+
+#----------------------------
+# Per-environment limits
+#----------------------------
+
+# Request caps per environment: `rate`/`burst` feed a token bucket (requests
+# per second), `max_concurrency` bounds the adaptive in-flight limit. Can be
+# overridden with a 'RATE_LIMITS' mapping in ~/.automic_tools.json, e.g.
+# {"eup7": {"rate": 30, "burst": 60, "max_concurrency": 24}}.
+DEFAULT_RATE_LIMITS = {
+    'eup4': {'rate': 10, 'burst': 20, 'max_concurrency': 8},
+    'eup6': {'rate': 20, 'burst': 40, 'max_concurrency': 16},
+    'eup7': {'rate': 20, 'burst': 40, 'max_concurrency': 16},
+}
+FALLBACK_RATE_LIMITS = {'rate': 10, 'burst': 20, 'max_concurrency': 8}
+
+
+def limits_for(env, config=None):
+    limits = dict(DEFAULT_RATE_LIMITS.get(env, FALLBACK_RATE_LIMITS))
+    override = ((config or {}).get('RATE_LIMITS') or {}).get(env) or {}
+    for key in limits:
+        try:
+            if override.get(key) is not None:
+                limits[key] = max(1, float(override[key]) if key == 'rate' else int(override[key]))
+        except (TypeError, ValueError):
+            pass
+    return limits
+
+#----------------------------
+# Token bucket
+#----------------------------
+
+class TokenBucket:
+    """Allows `rate` acquisitions per second on average, `burst` at once."""
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.capacity = float(burst or rate)
+        self.tokens = self.capacity
+        self.stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self):
+        """Take a token if one is available; otherwise return seconds to wait."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.stamp) * self.rate)
+            self.stamp = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0
+            return (1 - self.tokens) / self.rate
+
+    def acquire(self):
+        wait = self.take()
+        while wait:
+            time.sleep(wait)
+            wait = self.take()
+
+#----------------------------
+# Shared environment caps
+#----------------------------
+
+class SharedLimits:
+    """What every limiter of one environment shares, whichever client it
+    serves: the token bucket and a cap of `max_concurrency` requests in
+    flight across all of them, so a fan-out over several clients still
+    sends the server no more than its configured ceiling.
+    """
+
+    def __init__(self, max_concurrency, rate=None, burst=None):
+        self.max_concurrency = max_concurrency
+        self.bucket = TokenBucket(rate, burst) if rate else None
+        self.in_flight = 0
+        self.cond = threading.Condition()
+        self.waiters = []  # futures of event loops waiting for a slot
+
+
+def _wake(waiter):
+    if not waiter.done():
+        waiter.set_result(None)
+
+#----------------------------
+# Adaptive concurrency
+#----------------------------
+
+def call_kind(label, data=None):
+    """Latency class of a call: its label and the size of its body in powers of 4 bytes."""
+    return label, (len(data).bit_length() + 1) // 2 if data else 0
+
+
+class AdaptiveLimiter:
+    """AIMD limit on in-flight requests to one environment.
+
+    Grows by about one per round of fast successes up to `max_limit`; a 429,
+    5xx, error or slow reply (per `kind` of call) halves it.
+    """
+
+    def __init__(self, max_limit=8, min_limit=1, initial=None, rate=None, burst=None,
+                 latency_factor=3.0, latency_slack=0.05, backoff=0.5, shared=None):
+        self.max_limit = max_limit
+        self.min_limit = min_limit
+        self.limit = float(initial or max(min_limit, max_limit // 2))
+        self.latency_factor = latency_factor
+        self.latency_slack = latency_slack
+        self.backoff = backoff
+        self.shared = shared or SharedLimits(max_limit, rate, burst)
+        self.bucket = self.shared.bucket
+        self.in_flight = 0
+        self.baselines = {}
+        self.last_decrease = 0.0
+        self.throttled = 0
+        self._cond = self.shared.cond
+
+    def _take_slot(self):
+        """Take a slot if both this limit and the shared cap allow one; call with the lock held."""
+        if self.in_flight >= int(self.limit) or self.shared.in_flight >= self.shared.max_concurrency:
+            return False
+        self.in_flight += 1
+        self.shared.in_flight += 1
+        return True
+
+    def _free_slot(self):
+        self.in_flight -= 1
+        self.shared.in_flight -= 1
+        self._cond.notify_all()
+        waiters, self.shared.waiters = self.shared.waiters, []
+        for waiter in waiters:
+            waiter.get_loop().call_soon_threadsafe(_wake, waiter)
+
+    def acquire(self):
+        with self._cond:
+            while not self._take_slot():
+                self._cond.wait()
+        if self.bucket:
+            self.bucket.acquire()
+
+    def wait_slot(self, loop):
+        """Acquire for event loops: None once a slot is taken, else a future on
+        `loop` resolved when one may have come free, to try again then.
+
+        The caller still owes the token bucket: see `bucket.take()`.
+        """
+        with self._cond:
+            if self._take_slot():
+                return None
+            waiter = loop.create_future()
+            self.shared.waiters.append(waiter)
+            return waiter
+
+    def discard(self):
+        """Free a slot without a signal, e.g. for a request cancelled by the user."""
+        with self._cond:
+            self._free_slot()
+
+    def release(self, latency, status=None, kind=None):
+        """Record one finished request; `status` is None when it raised."""
+        now = time.monotonic()
+        with self._cond:
+            self._free_slot()
+            congested = status is None or status == 429 or status >= 500
+            if not congested:
+                baseline = self.baselines.get(kind)
+                if baseline is None or latency < baseline:
+                    baseline = latency
+                else:
+                    baseline += (latency - baseline) * 0.01  # follow slow drifts
+                self.baselines[kind] = baseline
+                congested = latency > baseline * self.latency_factor + self.latency_slack
+            if congested:
+                if now - self.last_decrease > latency:
+                    self.limit = max(self.min_limit, self.limit * self.backoff)
+                    self.last_decrease = now
+                    self.throttled += 1
+            else:
+                self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+
+    def summary(self):
+        return f"concurrency {int(self.limit)}/{self.max_limit}, {self.in_flight} in flight, {self.throttled} back-offs"
+
+#----------------------------
+# Limiter registry
+#----------------------------
+
+_shared = {}
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def limiter_for(env, config=None, client=None):
+    """Return the limiter shared by every session talking to `client` of `env`.
+
+    All clients of an environment draw on one SharedLimits.
+    """
+    settings = limits_for(env, config)
+    key = (env, None if client is None else str(client))
+    with _limiters_lock:
+        entry = _shared.get(env)
+        if entry is None or entry[0] != settings:
+            entry = _shared[env] = (settings, SharedLimits(settings['max_concurrency'], settings['rate'], settings['burst']))
+        limiter = _limiters.get(key)
+        if limiter is None or limiter.shared is not entry[1]:
+            limiter = _limiters[key] = AdaptiveLimiter(max_limit=settings['max_concurrency'], shared=entry[1])
+        return limiter
@@ -0,0 +1,43 @@
+import logging
+import os
+import queue
+from collections import deque
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+
+#----------------------------
+# Log sink
+#----------------------------
+
+LOG_PATH = os.path.join(os.path.expanduser('~'), '.automic_tools.log')
+
+
+class LogSink:
+    """Thread-safe log buffer drained by the UI on a timer."""
+
+    def __init__(self, path=LOG_PATH, max_bytes=5 * 1024 * 1024, backups=3):
+        self.queue = queue.SimpleQueue()
+        self.file_log = logging.getLogger(f'automic_tools.{path}')
+        self.file_log.propagate = False
+        self.file_log.setLevel(logging.INFO)
+        if path and not self.file_log.handlers:
+            try:
+                handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding='utf-8')
+                handler.setFormatter(logging.Formatter('%(message)s'))
+                self.file_log.addHandler(handler)
+            except OSError:
+                pass  # still log to the widget if the file is not writable
+
+    def write(self, msg):
+        self.queue.put((datetime.now(), msg))
+
+    def drain(self, keep=None):
+        lines = deque(maxlen=keep)
+        while True:
+            try:
+                stamp, msg = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            self.file_log.info(f"{stamp:%Y-%m-%d %H:%M:%S} {msg}")
+            lines.append(msg)
+        return list(lines)
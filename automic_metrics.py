@@ -0,0 +1,191 @@
+import json
+import re
+import threading
+import time
+from datetime import datetime
+
+#----------------------------
+# Histograms
+#----------------------------
+
+# Upper bounds in seconds; the last bucket takes everything slower.
+LATENCY_BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, float('inf'))
+
+
+class Histogram:
+    """Fixed-bucket latency histogram; percentiles are bucket upper bounds."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, q):
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(self.buckets, self.counts):
+            seen += n
+            if seen >= rank:
+                return self.max if bound == float('inf') else min(bound, self.max)
+        return self.max
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'mean': self.total / self.count if self.count else None,
+            'p50': self.percentile(0.5),
+            'p90': self.percentile(0.9),
+            'p99': self.percentile(0.99),
+            'max': self.max,
+            'buckets': {('+Inf' if b == float('inf') else str(b)): n for b, n in zip(self.buckets, self.counts)},
+        }
+
+#----------------------------
+# Run metrics
+#----------------------------
+
+_ID_SEGMENT = re.compile(r'^/objects/[^/]+')
+
+
+def call_name(method, path):
+    """'GET /objects/{name}/usage' style label for a REST path."""
+    return f"{method} " + _ID_SEGMENT.sub('/objects/{name}', path)
+
+
+class CallStats:
+    def __init__(self):
+        self.latency = Histogram()
+        self.ok = 0
+        self.failed = 0
+        self.statuses = {}
+        self.in_flight = 0
+
+
+class Metrics:
+    """Counters, in-flight gauges and latency histograms for one run.
+
+    Sessions report every REST call through `call_started`/`call_finished`
+    (see AutomicSession.observed); the run reports finished objects through
+    `advance`. Safe to update from any thread and to read from the UI.
+    """
+
+    def __init__(self, name='run', total=None):
+        self.name = name
+        self.total = total
+        self.done = 0
+        self.failed = 0
+        self.calls = {}
+        self.started = time.monotonic()
+        self.started_at = datetime.now()
+        self.finished = None
+        self._lock = threading.Lock()
+
+    def _stats(self, label):
+        stats = self.calls.get(label)
+        if stats is None:
+            stats = self.calls[label] = CallStats()
+        return stats
+
+    def call_started(self, label):
+        with self._lock:
+            self._stats(label).in_flight += 1
+
+    def call_finished(self, label, latency, status):
+        """`status` is the HTTP status, or None when the call raised."""
+        with self._lock:
+            stats = self._stats(label)
+            stats.in_flight -= 1
+            stats.latency.observe(latency)
+            key = str(status) if status is not None else 'error'
+            stats.statuses[key] = stats.statuses.get(key, 0) + 1
+            if status is not None and 200 <= status < 400:
+                stats.ok += 1
+            else:
+                stats.failed += 1
+
+    def advance(self, ok=True, count=1):
+        with self._lock:
+            self.done += count
+            if self.total is not None and self.done > self.total:
+                self.total = self.done  # the total was an estimate
+            if not ok:
+                self.failed += count
+
+    def finish(self):
+        self.finished = time.monotonic()
+
+    def elapsed(self):
+        return (self.finished or time.monotonic()) - self.started
+
+    def rate(self):
+        elapsed = self.elapsed()
+        return self.done / elapsed if elapsed > 0 else 0.0
+
+    def eta(self):
+        """Seconds left at the current rate, or None when unknown."""
+        rate = self.rate()
+        if not self.total or not rate:
+            return None
+        return max(0.0, (self.total - self.done) / rate)
+
+    def in_flight(self):
+        with self._lock:
+            return sum(s.in_flight for s in self.calls.values())
+
+    def latency(self):
+        """Histogram over every call, for the panel's p50/p99."""
+        merged = Histogram()
+        with self._lock:
+            for stats in self.calls.values():
+                h = stats.latency
+                merged.counts = [a + b for a, b in zip(merged.counts, h.counts)]
+                merged.count += h.count
+                merged.total += h.total
+                merged.max = max(merged.max, h.max)
+        return merged
+
+    def summary(self):
+        """One line for the progress panel and logs."""
+        done = f"{self.done}/{self.total}" if self.total else f"{self.done}"
+        text = f"{done} objects, {self.rate():.1f} obj/s"
+        eta = self.eta()
+        if eta is not None and not self.finished:
+            text += f", ETA {int(eta) // 60:02d}:{int(eta) % 60:02d}"
+        if self.failed:
+            text += f", {self.failed} failed"
+        latency = self.latency()
+        if latency.count:
+            text += f", {self.in_flight()} in flight, p50 {latency.percentile(0.5) * 1000:.0f} ms, p99 {latency.percentile(0.99) * 1000:.0f} ms"
+        return text
+
+    def snapshot(self):
+        with self._lock:
+            calls = {label: {'ok': s.ok, 'failed': s.failed, 'in_flight': s.in_flight,
+                             'statuses': dict(s.statuses), 'latency': s.latency.to_dict()}
+                     for label, s in self.calls.items()}
+        return {
+            'name': self.name,
+            'started': self.started_at.isoformat(timespec='seconds'),
+            'elapsed_s': round(self.elapsed(), 3),
+            'objects': {'total': self.total, 'done': self.done, 'failed': self.failed},
+            'objects_per_s': round(self.rate(), 3),
+            'calls': calls,
+        }
+
+    def export(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.snapshot(), f, indent=2)
+        return path
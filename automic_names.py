@@ -0,0 +1,83 @@
+#----------------------------
+# Naming rules
+#----------------------------
+
+# Automic object names hold at most 200 characters: A-Z, 0-9 and the ones
+# in NAME_CHARS. The server folds lower case to upper case, so names are
+# checked and compared that way too. Stricter rules can be set per client in
+# ~/.automic_tools.json, e.g. "NAME_RULES": {"1001": {"max_length": 64}}.
+NAME_MAX_LENGTH = 200
+NAME_CHARS = '$@_.#-'
+DEFAULT_NAME_RULES = {}
+
+# Characters of the template name kept in generated names, per object type
+BASE_LENGTHS = {'1111': {'JOBS': 21, 'JOBP': 31}}
+DEFAULT_BASE_LENGTHS = {'JOBS': 15, 'JOBP': 23}
+
+
+def name_rules_for(client, config=None):
+    rules = {'max_length': NAME_MAX_LENGTH, 'chars': NAME_CHARS}
+    rules.update(DEFAULT_NAME_RULES.get(str(client)) or {})
+    rules.update(((config or {}).get('NAME_RULES') or {}).get(str(client)) or {})
+    return rules
+
+
+def base_name(template_name, client, kind):
+    """The prefix of generated `kind` names: the template name, cut to the client's length."""
+    return template_name[:BASE_LENGTHS.get(str(client), DEFAULT_BASE_LENGTHS)[kind]]
+
+
+def name_problem(name, rules):
+    """Why Automic would refuse `name` under `rules`, or None."""
+    if not name:
+        return "empty name"
+    if len(name) > rules['max_length']:
+        return f"longer than {rules['max_length']} characters ({len(name)})"
+    bad = sorted({c for c in name.upper() if not (c.isascii() and c.isalnum()) and c not in rules['chars']})
+    if bad:
+        return f"invalid characters {''.join(bad)!r}"
+    return None
+
+#----------------------------
+# Name checks
+#----------------------------
+
+class NameChecker:
+    """Checks the names of pairs one by one, as they are read.
+
+    A pair is rejected as a whole when one of its names breaks `rules`,
+    repeats a name of an earlier accepted pair, or belongs to an object
+    that `existing` ({NAME: folder}, names in upper case) has elsewhere.
+    The names of accepted pairs are kept in `seen` ({NAME: line}).
+    """
+
+    def __init__(self, rules):
+        self.rules = rules
+        self.seen = {}
+        self.line = 0
+
+    def check(self, names, existing=None):
+        """Why the next pair's `names` are refused, or None once they are taken."""
+        self.line += 1
+        keys = [name.upper() for name in names]
+        for i, (name, key) in enumerate(zip(names, keys)):
+            problem = name_problem(name, self.rules)
+            if problem is None and (key in self.seen or key in keys[:i]):
+                problem = f"same name as line {self.seen.get(key, self.line)}"
+            if problem is None and existing and key in existing:
+                problem = f"already exists in {existing[key]}"
+            if problem:
+                return f"{name}: {problem}"
+        self.seen.update((key, self.line) for key in keys)
+        return None
+
+
+def describe_rejected(rejected):
+    """One line of counts by cause, e.g. '2 too long, 1 duplicate'."""
+    counts = {}
+    for _, _, reason in rejected:
+        cause = ('too long' if 'longer than' in reason else 'invalid characters' if 'invalid characters' in reason
+                 else 'duplicate' if 'same name as' in reason else 'existing elsewhere' if 'already exists' in reason
+                 else 'invalid')
+        counts[cause] = counts.get(cause, 0) + 1
+    return ', '.join(f"{n} {cause}" for cause, n in counts.items())
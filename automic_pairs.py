@@ -0,0 +1,128 @@
+import os
+import re
+
+#----------------------------
+# Pair parsing
+#----------------------------
+
+HEADERS_BY_LENGTH = {
+    1: ["jobp"],
+    3: ["jobname", "program", "variant"],
+    4: ["jobname", "program", "variant", "user"],
+    5: ["jobname", "program", "variant", "user", "language"],
+    6: ["jobname", "program", "variant", "user", "language", "extra"]
+}
+KNOWN_COLUMNS = {"jobp", "jobname", "program", "variant", "user", "language", "extra", "login"}
+
+
+def sanitize_string(s):
+    s = re.sub(r'^[^0-9A-Za-z_]+', '', s)
+    return re.sub(r'[^0-9A-Za-z_]', '_', s)
+
+
+def bsh_pair(program, variant):
+    jobname = f"C_{sanitize_string(program)}_{sanitize_string(variant)}"
+    return {"jobname": jobname, "program": program, "variant": variant, "isBSH": True}
+
+
+def parse_pair_parts(parts):
+    n = len(parts)
+    if n == 2:
+        return bsh_pair(*parts)
+    if n in HEADERS_BY_LENGTH:
+        return dict(zip(HEADERS_BY_LENGTH[n], parts))
+    return {f"col_{i+1}": v for i, v in enumerate(parts)}
+
+
+def iter_pairs_lines(lines):
+    for line in lines:
+        parts = line.split()
+        if parts:  # Skip blank lines
+            yield parse_pair_parts(parts)
+
+
+def iter_pairs_text(data):
+    return iter_pairs_lines(data.splitlines())
+
+
+def parse_flexible_pairs(data):
+    return list(iter_pairs_text(data))
+
+#----------------------------
+# File input
+#----------------------------
+
+PAIRS_FILE_TYPES = [("Pairs files", "*.csv *.tsv *.txt *.xlsx"), ("All files", "*.*")]
+
+
+def _iter_rows_csv(path, sep, chunksize):
+    import pandas as pd
+    reader = pd.read_csv(path, sep=sep, header=None, dtype=str, keep_default_na=False,
+                         skip_blank_lines=True, chunksize=chunksize)
+    for chunk in reader:
+        yield from chunk.itertuples(index=False, name=None)
+
+
+def _iter_rows_xlsx(path):
+    # pandas.read_excel always loads the whole sheet; openpyxl's read-only
+    # mode (the engine pandas uses for xlsx) streams it row by row instead.
+    from openpyxl import load_workbook
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        for row in wb.worksheets[0].iter_rows(values_only=True):
+            yield tuple('' if v is None else str(v) for v in row)
+    finally:
+        wb.close()
+
+
+def iter_pairs_file(path, chunksize=2000):
+    """Yield parsed pairs from a CSV, TSV, XLSX or text file without loading it whole.
+
+    Text files use the pairs box format. For the others, a first row made
+    only of known column names (jobname, program, variant, ...) is used as
+    a header; otherwise rows are read positionally like pasted lines.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.txt':
+        with open(path, 'r') as f:
+            yield from iter_pairs_lines(f)
+        return
+    if ext in ('.xlsx', '.xlsm'):
+        rows = _iter_rows_xlsx(path)
+    else:
+        rows = _iter_rows_csv(path, '\t' if ext == '.tsv' else ',', chunksize)
+
+    header = None
+    for index, row in enumerate(rows):
+        parts = [str(v).strip() for v in row]
+        if index == 0 and parts and all(p.lower() in KNOWN_COLUMNS for p in parts if p):
+            header = [p.lower() for p in parts]
+            continue
+        if header:
+            pair = {h: v for h, v in zip(header, parts) if h and v}
+            if not pair:
+                continue
+            if "jobname" not in pair and "program" in pair and "variant" in pair:
+                pair = dict(bsh_pair(pair["program"], pair["variant"]), **pair)
+            yield pair
+        else:
+            parts = [p for p in parts if p]
+            if parts:
+                yield parse_pair_parts(parts)
+
+
+def estimate_pairs_file(path):
+    """Rough pair count of `path` for progress totals, or None if unknown.
+
+    Rows are counted, not parsed, so a header row counts as a pair.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext in ('.xlsx', '.xlsm'):
+        from openpyxl import load_workbook
+        wb = load_workbook(path, read_only=True)
+        try:
+            return wb.worksheets[0].max_row
+        finally:
+            wb.close()
+    with open(path, 'r', errors='replace') as f:
+        return sum(1 for line in f if line.strip())
@@ -0,0 +1,147 @@
+import itertools
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from automic_engine import CreationError, find_objects
+from automic_names import NameChecker, describe_rejected, name_problem
+
+#----------------------------
+# Object plan
+#----------------------------
+
+def object_signature(obj):
+    """The parts of a JOBS/JOBP body this tool fills in, for change detection."""
+    scripts = [proc['process'] for proc in obj.get('scripts', []) if 'process' in proc]
+    nodes = [(wf.get('object_type'), wf.get('object_name')) for wf in obj.get('workflow_definitions', [])]
+    return scripts, nodes
+
+
+class ObjectPlan:
+    """Decides what a run does with each object, from the target folder's listing.
+
+    `existing` holds the names already in the folder. Names in `rebuild` are
+    overwritten regardless; with `check_changes` an existing object is read
+    and overwritten only when its body differs.
+    """
+
+    def __init__(self, session, existing=(), rebuild=(), check_changes=False, retry=None):
+        if retry is None:
+            from automic_session import RetryPolicy
+            retry = RetryPolicy()
+        self.session = session
+        self.existing = existing
+        self.rebuild = set(rebuild)
+        self.check_changes = check_changes
+        self.retry = retry
+
+    def action(self, name, obj):
+        """'create', 'update', 'exists' or 'unchanged' for one object."""
+        if name in self.rebuild:
+            return 'update'
+        if name not in self.existing:
+            return 'create'
+        if not self.check_changes:
+            return 'exists'
+        res = self.retry.call(lambda: self.session.get_object(name))
+        if res.status != 200 or not res.response.get('data'):
+            raise CreationError(f"could not read existing object ({res.status})")
+        current = next(iter(res.response['data'].values()))
+        return 'unchanged' if object_signature(current) == object_signature(obj) else 'update'
+
+#----------------------------
+# Name check
+#----------------------------
+
+# Pairs whose names are looked up in other folders with one search per object type
+NAME_CHECK_CHUNK = 500
+
+
+def check_main_name(main_name, children, fan_out, lanes, rules):
+    """Raise CreationError if the main jobplan, or a sub-jobplan it may need, has a bad name.
+
+    `children` is None when the number of pairs is not known yet.
+    """
+    names = [main_name]
+    if children is None or children > max(1, int(fan_out) // max(1, int(lanes))):
+        names.append(f"{main_name}_{children or 0:03d}")  # the longest sub-jobplan name
+    for name in names:
+        problem = name_problem(name, rules)
+        if problem:
+            raise CreationError(f"Main jobplan name {name}: {problem}")
+
+
+class PairCheck:
+    """Checks the names of (pair, names) as they are read, NAME_CHECK_CHUNK at a time.
+
+    Each chunk's names are searched in other folders while the chunk before
+    it is checked and posted. Refused pairs go to `reject(pair, names,
+    reason, taken)`, `taken` being the names of accepted pairs.
+    """
+
+    def __init__(self, session, folder, rules, reject, retry=None, log=print):
+        self.session = session
+        self.folder = folder
+        self.checker = NameChecker(rules)
+        self.reject = reject
+        self.retry = retry
+        self.log = log
+        self.searched = {}  # prefix -> {NAME: folder} found under it
+
+    def elsewhere(self, groups):
+        """{NAME: folder} of the names in `groups` held by objects outside the target folder.
+
+        Each group (names of one object type) is searched by its common
+        prefix, unless a prefix searched earlier covers it.
+        """
+        wanted = {name.upper() for group in groups for name in group}
+        prefixes = [os.path.commonprefix(group).upper() for group in groups if group]
+        missing = [prefix for prefix in dict.fromkeys(prefixes)
+                   if not any(prefix.startswith(done) for done in self.searched)]
+        if missing:
+            found = find_objects(self.session, [f"{prefix}*" for prefix in missing], retry=self.retry)
+            for prefix in missing:
+                self.searched[prefix] = {name: where for name, where in found.items() if name.startswith(prefix)}
+        folder = self.folder.strip('/').upper()
+        return {name: where for objects in self.searched.values() for name, where in objects.items()
+                if name in wanted and where.strip('/').upper() != folder}
+
+    def iter_checked(self, planned, lookup=True, cancelled=lambda: False):
+        """Yield the (pair, names) of `planned` that pass, rejecting the others.
+
+        Without `lookup` only the names themselves are checked. A search that
+        still fails after retries leaves that chunk's clashes to the server.
+        """
+        counts = {'ready': 0, 'rejected': []}
+
+        def check(chunk, found):
+            existing = None
+            if found:
+                try:
+                    existing = found.result()
+                except Exception as e:
+                    self.log(f"Name check: could not look up names in other folders ({e}); "
+                             "clashes there are left to the server")
+            for p, names in chunk:
+                reason = self.checker.check(names, existing)
+                if reason:
+                    counts['rejected'].append((p, names, reason))
+                    self.reject(p, names, reason, self.checker.seen)
+                else:
+                    counts['ready'] += 1
+                    yield p, names
+
+        planned = iter(planned)
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            ahead = None
+            for chunk in iter(lambda: list(itertools.islice(planned, NAME_CHECK_CHUNK)), []):
+                groups = [[names[i] for _, names in chunk if len(names) > i] for i in (0, 1)]
+                # Pairs read after a cancel are only journaled: no lookup for them
+                job = (chunk, pool.submit(self.elsewhere, groups) if lookup and not cancelled() else None)
+                if ahead:
+                    yield from check(*ahead)
+                ahead = job
+            if ahead:
+                yield from check(*ahead)
+        rejected = counts['rejected']
+        self.log(f"Name check: {counts['ready']} of {counts['ready'] + len(rejected)} pairs passed"
+                 + (f", {len(rejected)} rejected ({describe_rejected(rejected)})" if rejected else ''))
@@ -0,0 +1,95 @@
+from automic_engine import FALLBACK_CONCURRENCY, CreationEngine, list_folder
+
+#----------------------------
+# Rollback
+#----------------------------
+
+def rollback_units(journal):
+    """Deletion units for what a journaled run created: (head, pairs).
+
+    `head` deletes the main jobplan, then the sub-jobplans newest first;
+    each pair unit deletes its JOBP before its JOBS.
+    """
+    created = journal.posted
+    in_pairs = set()
+    pairs = []
+    for _, objects in journal.pairs:
+        in_pairs.update(objects)
+        unit = [(created[name], name, None) for name in reversed(objects) if name in created]
+        if unit:
+            pairs.append(unit)
+    main_name = journal.settings.get('main_name')
+    # A rebuilt main jobplan keeps its first place in creation order; its subs may be newer
+    plans = sorted((name for name in created if name not in in_pairs), key=lambda name: name == main_name)
+    head = [(created[name], name, None) for name in reversed(plans)]
+    return head, pairs
+
+
+class Rollback:
+    """Deletes the objects a creation run made, working from its journal only.
+
+    If a jobplan cannot be deleted the pairs are left alone, since it still lists them.
+    """
+
+    def __init__(self, session, journal, max_workers=FALLBACK_CONCURRENCY, log=print, on_result=None, retry=None):
+        if retry is None:
+            from automic_session import RetryPolicy
+            retry = RetryPolicy()
+        self.session = session
+        self.journal = journal
+        self.max_workers = max_workers
+        self.log = log
+        self.on_result = on_result
+        self.retry = retry
+        self.dry_run = False
+        self.head, self.pairs = rollback_units(journal)
+        self.targets = [name for unit in [self.head] + self.pairs for _, name, _ in unit]
+
+    def delete(self, kind, name, body=None):
+        if self.dry_run:
+            return True, 'would delete'
+        def on_retry(attempt, delay, reason):
+            self.log(f"RETRY delete {kind}: {name} ({reason}), attempt {attempt + 1}/{self.retry.attempts} in {delay:.1f}s")
+        res = self.retry.call(lambda: self.session.delete_object(name), on_retry)
+        if res.status == 404:
+            return True, 'already gone'
+        return res.ok, 'deleted' if res.ok else res.status
+
+    def record(self, result):
+        if result.ok and not self.dry_run:
+            self.journal.deleted([result.name])
+        if self.on_result:
+            self.on_result(result)
+
+    def run(self, cancelled=lambda: False, dry_run=False):
+        """Delete the run's objects; returns the PostResults."""
+        self.dry_run = dry_run
+        if not self.targets:
+            self.log("Nothing to roll back: the journal lists no objects created by this run.")
+            return []
+        self.log(f"Rolling back {len(self.targets)} objects from {self.journal.settings.get('folder')}"
+                 + (" (dry run: nothing will be deleted)" if dry_run else ''))
+        engine = CreationEngine(self.delete, max_workers=self.max_workers, log=self.log, on_result=self.record,
+                                cancelled=cancelled)
+        results = []
+        if self.head:
+            results = engine.run([self.head])
+            stuck = next((r for r in results if not r.ok), None)
+            if stuck:
+                self.log(f"Rollback stopped: {stuck.name} could not be deleted ({stuck.status}); "
+                         "the objects it lists are kept")
+                return results
+        if self.pairs and not cancelled():
+            results += engine.run(self.pairs)
+        return results
+
+    def verify(self):
+        """Names of the run's objects still in its folder, after one listing."""
+        listed = list_folder(self.session, self.journal.settings['folder'])
+        remaining = [name for name in self.targets if name in listed]
+        if remaining:
+            self.log(f"Verification: {len(remaining)} of {len(self.targets)} objects still exist: "
+                     + ', '.join(remaining[:20]) + (' ...' if len(remaining) > 20 else ''))
+        else:
+            self.log(f"Verification: none of the {len(self.targets)} objects is left in {self.journal.settings['folder']}")
+        return remaining
@@ -0,0 +1,209 @@
+import base64
+import json
+import random
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import quote
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import InsecureRequestWarning
+
+from automic_limits import call_kind
+from automic_metrics import call_name
+
+requests.packages.urllib3.disable_warnings(InsecureRequestWarning)
+
+#----------------------------
+# Responses
+#----------------------------
+
+def api_url(env):
+    return f'https://rb-{env}-api.bosch.com'
+
+
+class AutomicResponse:
+    """Same attributes the automic_rest call objects expose, plus `ok`."""
+
+    def __init__(self, r):
+        self.url = r.request.url
+        self.body = r.request.body
+        self.headers = r.headers
+        self.content = r.content
+        self.text = r.text
+        self.status = r.status_code
+        try:
+            self.response = r.json() if r.content else {}
+        except ValueError:
+            self.response = {}
+
+    @property
+    def ok(self):
+        return 200 <= self.status < 300
+
+#----------------------------
+# Retries
+#----------------------------
+
+TRANSIENT_STATUS = {408, 429, 500, 502, 503, 504}
+
+
+class RetryPolicy:
+    """Retries transient failures with full-jitter exponential backoff."""
+
+    def __init__(self, attempts=4, base=0.5, cap=30.0, sleep=time.sleep):
+        self.attempts = max(1, attempts)
+        self.base = base
+        self.cap = cap
+        self.sleep = sleep
+
+    def delay(self, retry, res=None):
+        retry_after = res.headers.get('Retry-After') if res is not None else None
+        if retry_after and retry_after.isdigit():
+            return min(self.cap, float(retry_after))
+        return random.uniform(0, min(self.cap, self.base * 2 ** retry))
+
+    def call(self, fn, on_retry=None):
+        """Run `fn()`; `on_retry(attempt, delay, reason)` is told about each retry."""
+        for attempt in range(1, self.attempts + 1):
+            res = None
+            try:
+                res = fn()
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == self.attempts:
+                    raise
+                reason = type(e).__name__
+            else:
+                if res.status not in TRANSIENT_STATUS or attempt == self.attempts:
+                    return res
+                reason = res.status
+            wait = self.delay(attempt - 1, res)
+            if on_retry:
+                on_retry(attempt, wait, reason)
+            self.sleep(wait)
+
+#----------------------------
+# Pooled session
+#----------------------------
+
+class AutomicSession:
+    """Keep-alive HTTP client for one (env, client_id, user), safe to share across threads."""
+
+    def __init__(self, env, client_id, user, password, pool_size=10, timeout=120, verify=False, base_url=None, limiter=None):
+        self.env = env
+        self.client_id = int(client_id)
+        self.user = user
+        self.timeout = timeout
+        self.url = (base_url or api_url(env)).rstrip('/') + '/ae/api/v1'
+        self.pool_size = 0
+        self.limiter = limiter
+        self.observers = ()
+        self._lock = threading.Lock()
+        self.http = requests.Session()
+        self.http.trust_env = False  # same as automic.connection(noproxy=True)
+        self.http.verify = verify
+        self.http.headers.update({'Content-type': 'application/json', 'Accept': 'application/json'})
+        self.set_password(password)
+        self.ensure_pool(pool_size)
+
+    def set_password(self, password):
+        auth = base64.b64encode(f"{self.user}:{password}".encode()).decode()
+        self.http.headers['Authorization'] = f"Basic {auth}"
+
+    def ensure_pool(self, pool_size):
+        """Grow the connection pool to at least `pool_size` connections."""
+        with self._lock:
+            if pool_size <= self.pool_size:
+                return
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=False)
+            self.http.mount('https://', adapter)
+            self.http.mount('http://', adapter)
+            self.pool_size = pool_size
+
+    @contextmanager
+    def observed(self, metrics):
+        """Report every request to `metrics` while the block runs."""
+        with self._lock:
+            self.observers = self.observers + (metrics,)
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self.observers = tuple(o for o in self.observers if o is not metrics)
+
+    def request(self, method, path, query=None, body=None, headers=None):
+        url = f"{self.url}/{self.client_id}{path}" + (f"?{query}" if query else '')
+        data = json.dumps(body) if body is not None else None
+        limiter = self.limiter
+        observers = self.observers
+        if limiter is None and not observers:
+            return AutomicResponse(self.http.request(method, url, data=data, headers=headers, timeout=self.timeout))
+        if limiter:
+            limiter.acquire()
+        label = call_name(method, path)
+        for o in observers:
+            o.call_started(label)
+        status = None
+        started = time.monotonic()
+        try:
+            r = self.http.request(method, url, data=data, headers=headers, timeout=self.timeout)
+            status = r.status_code
+        finally:
+            latency = time.monotonic() - started
+            if limiter:
+                limiter.release(latency, status, call_kind(label, data))
+            for o in observers:
+                o.call_finished(label, latency, status)
+        return AutomicResponse(r)
+
+    def get_object(self, object_name, query=None, headers=None):
+        return self.request('GET', f"/objects/{quote(object_name, safe='')}", query, headers=headers)
+
+    def post_objects(self, body, query=None):
+        return self.request('POST', '/objects', query, body)
+
+    def delete_object(self, object_name):
+        return self.request('DELETE', f"/objects/{quote(object_name, safe='')}")
+
+    def search_objects(self, body, query=None):
+        return self.request('POST', '/search', query, body)
+
+    def usage(self, object_name):
+        return self.request('GET', f"/objects/{quote(object_name, safe='')}/usage")
+
+    def list_executions(self, query=None):
+        return self.request('GET', '/executions', query)
+
+    def close(self):
+        self.http.close()
+
+#----------------------------
+# Session registry
+#----------------------------
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def get_session(env, client_id, user, password, pool_size=10, base_url=None, limiter=None):
+    """Return the shared session for (env, client_id, user), creating it on first use."""
+    key = (env, str(client_id), user, base_url)
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None:
+            session = AutomicSession(env, client_id, user, password, pool_size=pool_size, base_url=base_url, limiter=limiter)
+            _sessions[key] = session
+            return session
+    session.set_password(password)
+    if limiter is not None:
+        session.limiter = limiter
+    session.ensure_pool(pool_size)
+    return session
+
+
+def close_sessions():
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
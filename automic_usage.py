@@ -0,0 +1,274 @@
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import quote
+
+#----------------------------
+# Usage lookups
+#----------------------------
+
+USAGE_COLUMNS = ("Object Name", "Usage", "Type", "Folder", "Last Modified", "Last Execution")
+
+
+def format_start_time(raw_time):
+    dt = datetime.strptime(raw_time, "%Y-%m-%dT%H:%M:%SZ")
+    return dt.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def get_last_execution(session, obj_name, log=print):
+    try:
+        re = session.list_executions(query=f"{obj_name}&max_results=1")
+        o = re.response.get('data', [])
+        if o:
+            return format_start_time(o[0]["start_time"])
+        else:
+            return "N/A"
+    except Exception as e:
+        log(f"Error fetching last execution for {obj_name}: {e}")
+        return "Error"
+
+
+def fetch_references(session, obj_name, log=print):
+    """Return (obj_name, references, error) for one object."""
+    try:
+        result = session.usage(obj_name)
+        return obj_name, result.response.get("references", []), None
+    except Exception as e:
+        log(f"Error fetching {obj_name}: {e}")
+        return obj_name, [], str(e)
+
+
+def fetch_usage(session, obj_name, log=print):
+    """Return (obj_name, references, last_execution, error) for one object."""
+    obj_name, refs, error = fetch_references(session, obj_name, log)
+    if error:
+        return obj_name, refs, None, error
+    return obj_name, refs, get_last_execution(session, obj_name, log), None
+
+#----------------------------
+# Bulk last executions
+#----------------------------
+
+EXECUTION_PAGE_SIZE = 1000
+EXECUTION_MAX_PAGES = 10
+EXECUTION_MIN_PREFIX = 3
+
+
+class ExecutionResolver:
+    """Resolve the last execution of many objects with a few listExecutions pages.
+
+    `on_found({name: last execution})` is called after each page; names the
+    capped scan misses fall back to the per-object query.
+    """
+
+    def __init__(self, session, cache=None, page_size=EXECUTION_PAGE_SIZE, max_pages=EXECUTION_MAX_PAGES, max_workers=10,
+                 log=print):
+        self.session = session
+        self.log = log
+        self.cache = cache
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.max_workers = max_workers
+        self.requests = 0
+
+    def _key(self, name):
+        return (self.session.env, self.session.client_id, name)
+
+    def resolve(self, names, cancelled=lambda: False, on_found=None):
+        """Return {name: last execution} for every name given."""
+        result, wanted = self._split_cached(names)
+        if result and on_found:
+            on_found(dict(result))
+        if not wanted:
+            return result
+        found, exhausted = self._scan(wanted, cancelled, on_found)
+        missing = self._unresolved(wanted, found, exhausted)
+        if missing and not cancelled():
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                for name, last_exec in zip(missing, executor.map(lambda n: get_last_execution(self.session, n, self.log), missing)):
+                    found[name] = last_exec
+        self._remember(found)
+        result.update(found)
+        return result
+
+    def _scan(self, wanted, cancelled, on_found=None):
+        """Page through executions newest first; return (found, exhausted)."""
+        found = {}
+        base = self._base_query(wanted)
+        last_run_id = None
+        for _ in range(self.max_pages):
+            if cancelled():
+                break
+            try:
+                res = self.session.list_executions(query=self._page_query(base, last_run_id))
+            except Exception as e:
+                self.log(f"Error listing executions: {e}")
+                break
+            finished, exhausted, last_run_id = self._absorb(res, wanted, found, on_found)
+            if finished:
+                return found, exhausted
+        return found, False
+
+    # The steps below do no I/O, so the asyncio resolver shares them.
+
+    def _split_cached(self, names):
+        result, wanted = {}, set()
+        for name in names:
+            cached = self.cache.get(self._key(name)) if self.cache else None
+            if cached is not None:
+                result[name] = cached
+            else:
+                wanted.add(name)
+        return result, wanted
+
+    def _base_query(self, wanted):
+        prefix = os.path.commonprefix(list(wanted))
+        base = f"max_results={self.page_size}"
+        if len(prefix) >= EXECUTION_MIN_PREFIX:
+            base += f"&name={quote(prefix, safe='')}*"
+        return base
+
+    @staticmethod
+    def _page_query(base, last_run_id):
+        return base + (f"&last_run_id={last_run_id}" if last_run_id is not None else '')
+
+    def _absorb(self, res, wanted, found, on_found=None):
+        """Join one page into `found`; return (finished, exhausted, next_run_id)."""
+        self.requests += 1
+        if not res.ok:
+            return True, False, None
+        data = res.response.get('data', [])
+        new = {}
+        for record in data:
+            name = record.get("name")
+            if name in wanted and name not in found and name not in new and record.get("start_time"):
+                new[name] = format_start_time(record["start_time"])
+        found.update(new)
+        if new and on_found:
+            on_found(new)
+        if len(found) == len(wanted):
+            return True, False, None
+        if not data or not res.response.get('hasmore', len(data) >= self.page_size):
+            return True, True, None
+        last_run_id = data[-1].get("run_id")
+        return last_run_id is None, False, last_run_id
+
+    @staticmethod
+    def _unresolved(wanted, found, exhausted):
+        if exhausted:
+            # The whole (prefix-filtered) history was read: the rest never ran.
+            found.update((name, "N/A") for name in wanted - found.keys())
+        return [name for name in wanted if name not in found]
+
+    def _remember(self, found):
+        if self.cache:
+            for name, last_exec in found.items():
+                if last_exec != "Error":
+                    self.cache.set(self._key(name), last_exec)
+
+
+def usage_rows(obj_name, refs, last_exec):
+    """Table rows for one object, in USAGE_COLUMNS order."""
+    if not refs:
+        return [(obj_name, "None", "None", "None", "None", last_exec)]
+    return [(obj_name, r["name"], r["type"], r["folderpath"], r["lastmodified"][:10], last_exec) for r in refs]
+
+
+def iter_usage(session, object_names, max_workers=10, cancelled=lambda: False, executions=None, log=print):
+    """Yield (obj_name, references, last_execution, error) as lookups complete.
+
+    A row is yielded once its references are in and its last execution turned up.
+    """
+    object_names = list(object_names)
+    resolver = executions or ExecutionResolver(session, max_workers=max_workers, log=log)
+    events = queue.Queue()
+    with ThreadPoolExecutor(max_workers=1) as resolving, ThreadPoolExecutor(max_workers=max_workers) as executor:
+        last_execs = resolving.submit(resolver.resolve, object_names, cancelled, lambda found: events.put(('found', found)))
+        last_execs.add_done_callback(lambda future: events.put(('resolved', future)))
+        futures = [executor.submit(lambda n: None if cancelled() else fetch_references(session, n, log), name) for name in object_names]
+        for future in futures:
+            future.add_done_callback(lambda future: events.put(('refs', future)))
+        known, final = {}, None
+        waiting = {}  # name -> [refs] fetched before its last execution was known
+        remaining = len(futures)
+        try:
+            while (remaining or waiting) and not cancelled():
+                try:
+                    kind, item = events.get(timeout=0.5)
+                except queue.Empty:
+                    continue
+                if kind == 'found':
+                    known.update(item)
+                    for obj_name in item:
+                        for refs in waiting.pop(obj_name, []):
+                            yield obj_name, refs, item[obj_name], None
+                elif kind == 'resolved':
+                    final = item.result()
+                    for obj_name, pending in list(waiting.items()):
+                        for refs in pending:
+                            yield obj_name, refs, final.get(obj_name, "N/A"), None
+                    waiting.clear()
+                else:
+                    remaining -= 1
+                    result = item.result()
+                    if result is None:
+                        continue
+                    obj_name, refs, error = result
+                    if error:
+                        yield obj_name, refs, None, error
+                    elif obj_name in known:
+                        yield obj_name, refs, known[obj_name], None
+                    elif final is not None:
+                        yield obj_name, refs, final.get(obj_name, "N/A"), None
+                    else:
+                        waiting.setdefault(obj_name, []).append(refs)
+        finally:
+            for future in futures:
+                future.cancel()
+
+#----------------------------
+# Result store
+#----------------------------
+
+class UsageStore:
+    """Columnar, append-only table of usage rows.
+
+    The fetch thread appends while the UI reads windows of rows, whole
+    columns or single rows, so the widget never has to hold every row.
+    """
+
+    def __init__(self, columns=USAGE_COLUMNS):
+        self.columns = tuple(columns)
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self.data = {c: [] for c in self.columns}
+            self.tags = []
+
+    def extend(self, rows, tag=None):
+        with self._lock:
+            for row in rows:
+                for c, v in zip(self.columns, row):
+                    self.data[c].append(v)
+                self.tags.append(tag)
+
+    def __len__(self):
+        return len(self.tags)
+
+    def row(self, index):
+        with self._lock:
+            return tuple(self.data[c][index] for c in self.columns)
+
+    def rows(self, start=0, stop=None):
+        with self._lock:
+            cols = [self.data[c][start:stop] for c in self.columns]
+            return list(zip(*cols)), self.tags[start:stop]
+
+    def column(self, name):
+        with self._lock:
+            return list(self.data[name])
+
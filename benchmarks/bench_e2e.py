@@ -0,0 +1,217 @@
+"""End-to-end benchmark of creation runs and usage fetches against the mock server.
+
+Runs the Job Creator's creation path (`automic_cli.py create`: BulkCreator
+with precheck, batching and journal) and the Usage Viewer's batch fetch
+(`automic_cli.py usage`: iter_usage with bulk last executions) headlessly,
+each case in a fresh interpreter against its own MockAutomic, and records
+objects/s, requests sent, p50/p99 call latency (the run's own metrics
+histograms) and peak RSS of that interpreter; each measure keeps its best of
+`--repeat` runs, as thread scheduling and allocator arenas make single runs
+noisy. Fails when a case sends more requests than the stored baseline (any
+more at all unless the mock injects errors, whose retries vary), has a higher
+p99 or peak RSS beyond the tolerance, or when objects fail that should not. p99 is read from the fixed histogram buckets, so it only
+counts as worse once it is two buckets up. Objects/s swing too much with the
+machine and its load to fail on; they are printed next to the baseline's.
+
+    python benchmarks/bench_e2e.py
+    python benchmarks/bench_e2e.py --sizes 100 1000 --latency 0.02 --error-rate 0.01
+    python benchmarks/bench_e2e.py --write
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from automic_metrics import Histogram, LATENCY_BUCKETS
+from mock_automic import MockAutomic
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'e2e_baseline.json')
+SIZES = (100, 1000, 10000)
+SCENARIOS = ('create', 'usage')
+ENV = 'bench'
+CLIENT = 1001
+# Generous caps so the limiter does not set the pace; the mock does
+CONFIG = {
+    'RATE_LIMITS': {ENV: {'rate': 10000, 'burst': 10000, 'max_concurrency': 16}},
+}
+
+CHILD = r'''
+import json, sys
+sys.path.insert(0, sys.argv[1])
+import automic_cli
+code = automic_cli.main(sys.argv[3:])
+try:
+    import resource
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == 'darwin' else 1024)
+except ImportError:  # Windows
+    rss = None
+with open(sys.argv[2], 'w') as f:
+    json.dump({'code': code, 'rss': rss}, f)
+'''
+
+
+def latency_of(snapshot):
+    """One Histogram over every call in a metrics snapshot."""
+    merged = Histogram()
+    for call in snapshot['calls'].values():
+        latency = call['latency']
+        counts = [latency['buckets']['+Inf' if b == float('inf') else str(b)] for b in LATENCY_BUCKETS]
+        merged.counts = [a + b for a, b in zip(merged.counts, counts)]
+        merged.count += latency['count']
+        merged.max = max(merged.max, latency['max'])
+    return merged
+
+
+def run_case(scenario, size, settings, workdir):
+    """Run one case in a child interpreter; return its result dict."""
+    home = os.path.join(workdir, f"{scenario}-{size}")
+    os.makedirs(home)
+    config = os.path.join(home, 'config.json')
+    with open(config, 'w') as f:
+        json.dump(CONFIG, f)
+    metrics_path = os.path.join(home, 'metrics.json')
+    result_path = os.path.join(home, 'result.json')
+    mock_settings = {k: settings[k] for k in ('latency', 'jitter', 'error_rate', 'throttle_rate', 'refs', 'seed')}
+
+    with MockAutomic(tls=settings['tls'], objects=size if scenario == 'usage' else 0, **mock_settings) as mock:
+        argv = [scenario, '--env', ENV, '--client', str(CLIENT), '--user', 'BENCH', '--url', mock.url,
+                '--config', config, '--metrics', metrics_path]
+        if scenario == 'create':
+            pairs = os.path.join(home, 'pairs.txt')
+            with open(pairs, 'w') as f:
+                # A JOBS and a JOBP per pair
+                f.writelines(f"JOB_{i} PROG_{i} VAR\n" for i in range(size // 2))
+            argv += ['--armt', 'A000', '--job-template', 'JOBS.BENCH.TEMPLATE',
+                     '--jobplan-template', 'JOBP.BENCH.TEMPLATE', '--pairs', pairs]
+        else:
+            names = os.path.join(home, 'names.txt')
+            with open(names, 'w') as f:
+                f.writelines(f"MOCK_JOBS_{i}\n" for i in range(size))
+            argv += ['--input', names]
+        env = dict(os.environ, HOME=home, USERPROFILE=home, AUTOMIC_PASSWORD='bench')
+        started = time.perf_counter()
+        proc = subprocess.run([sys.executable, '-c', CHILD, ROOT, result_path] + argv, cwd=ROOT, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        wall = time.perf_counter() - started
+        requests = mock.state.requests
+        injected = {str(status): n for status, n in mock.state.injected.items()}
+    if proc.returncode or not os.path.exists(result_path):
+        sys.exit(f"FAIL: {scenario} {size} did not run:\n{proc.stderr}")
+    with open(result_path) as f:
+        child = json.load(f)
+    with open(metrics_path) as f:
+        snapshot = json.load(f)
+    latency = latency_of(snapshot)
+    return {
+        'objects': snapshot['objects']['done'],
+        'failed': snapshot['objects']['failed'],
+        'exit_code': child['code'],
+        'seconds': snapshot['elapsed_s'],
+        'wall_s': round(wall, 3),
+        'objects_per_s': snapshot['objects_per_s'],
+        'requests': requests,
+        'injected': injected,
+        'p50_ms': round(latency.percentile(0.5) * 1000, 1) if latency.count else None,
+        'p99_ms': round(latency.percentile(0.99) * 1000, 1) if latency.count else None,
+        'peak_rss_mb': round(child['rss'] / 2**20, 1) if child['rss'] else None,
+    }
+
+
+def best_of(runs):
+    """The fastest run, with the lowest p99 and peak RSS seen in any run."""
+    best = dict(max(runs, key=lambda run: run['objects_per_s']))
+    for measure in ('p50_ms', 'p99_ms', 'peak_rss_mb'):
+        values = [run[measure] for run in runs if run[measure] is not None]
+        best[measure] = min(values) if values else None
+    best['exit_code'] = max(run['exit_code'] for run in runs)
+    best['failed'] = max(run['failed'] for run in runs)
+    return best
+
+
+def bucket(ms):
+    return next(i for i, bound in enumerate(LATENCY_BUCKETS) if ms / 1000 <= bound)
+
+
+def regressions(key, result, base, tolerance, request_slack=0.0):
+    """Messages for every measure of `result` worse than `base` beyond `tolerance`."""
+    found = []
+    if result['requests'] > base['requests'] * (1 + request_slack):
+        found.append(f"{key}: {result['requests']} requests, baseline {base['requests']}")
+    if result['p99_ms'] and base.get('p99_ms') and bucket(result['p99_ms']) > bucket(base['p99_ms']) + 1:
+        found.append(f"{key}: p99 {result['p99_ms']:.0f} ms, baseline {base['p99_ms']:.0f} ms")
+    if result['peak_rss_mb'] and base.get('peak_rss_mb') and result['peak_rss_mb'] > base['peak_rss_mb'] * (1 + tolerance):
+        found.append(f"{key}: peak RSS {result['peak_rss_mb']:.0f} MB, baseline {base['peak_rss_mb']:.0f} MB")
+    return found
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--sizes', type=int, nargs='+', default=SIZES, help='objects per case')
+    ap.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=SCENARIOS)
+    ap.add_argument('--latency', type=float, default=0.005, help='mock seconds added to every answer')
+    ap.add_argument('--jitter', type=float, default=0.005, help='mock extra latency, up to this many seconds')
+    ap.add_argument('--error-rate', type=float, default=0.0, help='share of requests the mock answers 503')
+    ap.add_argument('--throttle-rate', type=float, default=0.0, help='share of requests the mock answers 429')
+    ap.add_argument('--refs', type=int, default=2, help='references per usage lookup')
+    ap.add_argument('--seed', type=int, default=1)
+    ap.add_argument('--tls', action='store_true', help='serve the mock over TLS')
+    ap.add_argument('--repeat', type=int, default=3, help='runs per case; each measure keeps its best')
+    ap.add_argument('--baseline', default=BASELINE, help='stored results to compare with')
+    ap.add_argument('--tolerance', type=float, default=0.3, help='allowed share worse than the baseline')
+    ap.add_argument('--write', action='store_true', help='store these results as the new baseline')
+    ap.add_argument('--output', metavar='PATH', help='also save the results as JSON')
+    args = ap.parse_args()
+    settings = {'latency': args.latency, 'jitter': args.jitter, 'error_rate': args.error_rate,
+                'throttle_rate': args.throttle_rate, 'refs': args.refs, 'seed': args.seed, 'tls': args.tls}
+
+    results = {}
+    print(f"{'case':<14}{'objects':>9}{'seconds':>9}{'obj/s':>8}{'requests':>10}{'p50 ms':>8}{'p99 ms':>8}{'RSS MB':>8}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for scenario in args.scenarios:
+            for size in args.sizes:
+                key = f"{scenario}/{size}"
+                runs = [run_case(scenario, size, settings, os.path.join(workdir, str(i))) for i in range(max(1, args.repeat))]
+                r = results[key] = best_of(runs)
+                print(f"{key:<14}{r['objects']:>9}{r['seconds']:>9.2f}{r['objects_per_s']:>8.0f}{r['requests']:>10}"
+                      f"{r['p50_ms'] or 0:>8.0f}{r['p99_ms'] or 0:>8.0f}{r['peak_rss_mb'] or 0:>8.0f}")
+    report = {'python': sys.version.split()[0], 'platform': sys.platform, 'settings': settings, 'results': results}
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.write:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"baseline written to {args.baseline}")
+
+    problems = [f"{key}: {r['failed']} objects failed (exit {r['exit_code']})" for key, r in results.items()
+                if r['exit_code'] and not (args.error_rate or args.throttle_rate)]
+    if not args.write:
+        try:
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        except FileNotFoundError:
+            baseline = None
+            print(f"no baseline at {args.baseline}; run with --write to store one")
+        if baseline and baseline['settings'] != settings:
+            print(f"baseline settings differ ({baseline['settings']}); not compared")
+        elif baseline:
+            request_slack = args.tolerance if args.error_rate or args.throttle_rate else 0.0
+            for key, r in results.items():
+                if key in baseline['results']:
+                    base = baseline['results'][key]
+                    print(f"{key}: {r['objects_per_s']:.0f} obj/s, baseline {base['objects_per_s']:.0f}"
+                          f" ({r['objects_per_s'] / base['objects_per_s']:.0%})")
+                    problems += regressions(key, r, base, args.tolerance, request_slack)
+    if problems:
+        sys.exit("FAIL:\n  " + "\n  ".join(problems))
+    print("no regressions")
+
+
+if __name__ == '__main__':
+    main()
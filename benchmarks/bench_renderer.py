@@ -0,0 +1,89 @@
+"""Per-pair body building: copy.deepcopy of the templates vs TemplateRenderer.
+
+    python benchmarks/bench_renderer.py --pairs 5000
+"""
+import argparse
+import copy
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from automic_engine import TemplateRenderer, job_script
+
+
+def make_templates(attrs=150, nodes=40):
+    """Synthetic templates roughly the size of real R3 JOBS/JOBP exports."""
+    def attributes(prefix):
+        return {f"{prefix}_{i}": {'value': f"v{i}", 'flags': [0, 1, 0], 'meta': {'inherited': False}} for i in range(attrs)}
+    jobs = {
+        'general_attributes': dict(attributes('ga'), name='JOBS.R3.TEMPLATE'),
+        'job_attributes': attributes('ja'),
+        'rollback': attributes('rb'),
+        'scripts': [{'process': [f"! line {i}" for i in range(20)]},
+                    {'pre_process': [f"! pre {i}" for i in range(20)]},
+                    {'post_process': [f"! post {i}" for i in range(20)]}],
+    }
+    defs = [dict({f"k{j}": j for j in range(15)}, line_number=i, object_type='JOBS',
+                 object_name='JOBS.R3.TEMPLATE' if i == 2 else f"OTHER_{i}") for i in range(1, nodes)]
+    jobp = {
+        'general_attributes': dict(attributes('ga'), name='JOBP.TEMPLATE'),
+        'jobp_attributes': attributes('jp'),
+        'workflow_definitions': defs,
+        'line_conditions': [{'workflow_line_number': i, 'line_number': 1, 'predecessor_line_number': i - 1} for i in range(2, nodes)],
+    }
+    return jobs, jobp
+
+
+def deepcopy_path(jobs, jobp, pairs):
+    for jn, p in pairs:
+        nj = copy.deepcopy(jobs)
+        nj['general_attributes']['name'] = f"JOBS_{jn}"
+        for proc in nj.get('scripts', []):
+            if 'process' in proc:
+                proc['process'] = job_script(1001, jn, p, 'SY-BATCH')
+        njp = copy.deepcopy(jobp)
+        njp['general_attributes']['name'] = f"JOBP_{jn}"
+        for wf in njp.get('workflow_definitions', []):
+            if wf.get('object_name') == jobs['general_attributes']['name']:
+                wf['object_name'] = f"JOBS_{jn}"
+        yield nj, njp
+
+
+def renderer_path(jobs, jobp, pairs):
+    rj = TemplateRenderer(jobs)
+    rp = TemplateRenderer(jobp, jobs['general_attributes']['name'])
+    for jn, p in pairs:
+        yield (rj.render(f"JOBS_{jn}", script=job_script(1001, jn, p, 'SY-BATCH')),
+               rp.render(f"JOBP_{jn}", job_name=f"JOBS_{jn}"))
+
+
+def timed(path, jobs, jobp, pairs, serialise):
+    start = time.perf_counter()
+    for nj, njp in path(jobs, jobp, pairs):
+        if serialise:
+            json.dumps(nj), json.dumps(njp)
+    return time.perf_counter() - start
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--pairs', type=int, default=5000)
+    args = ap.parse_args()
+    jobs, jobp = make_templates()
+    pairs = [(f"J{i}", {'program': f"ZPROG{i}", 'variant': f"VAR{i}"}) for i in range(args.pairs)]
+
+    # Both paths must produce identical request bodies
+    for a, b in zip(deepcopy_path(jobs, jobp, pairs[:50]), renderer_path(jobs, jobp, pairs[:50])):
+        assert json.dumps(a) == json.dumps(b)
+
+    print(f"{args.pairs} pairs, template sizes {len(json.dumps(jobs))} / {len(json.dumps(jobp))} bytes")
+    print(f"{'path':<12}{'build s':>10}{'build+json s':>14}")
+    for label, path in (('deepcopy', deepcopy_path), ('renderer', renderer_path)):
+        print(f"{label:<12}{timed(path, jobs, jobp, pairs, False):>10.3f}{timed(path, jobs, jobp, pairs, True):>14.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""Handshake savings of the pooled session layer against the mock server.
+
+Compares the old path (module-global `automic.connection`, one new TLS
+connection per `automic_rest` call) with `automic_session.get_session`.
+
+    python benchmarks/bench_sessions.py --calls 500 --workers 10
+"""
+import argparse
+import base64
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import automic_rest as automic
+from automic_session import get_session, close_sessions
+from mock_automic import MockAutomic
+
+CLIENT = 1001
+
+
+def run(call, names, workers):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(call, names))
+    return time.perf_counter() - start
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--calls', type=int, default=500)
+    ap.add_argument('--workers', type=int, default=10)
+    args = ap.parse_args()
+    names = [f"JOBS_BENCH_{i}" for i in range(args.calls)]
+
+    with MockAutomic() as mock:
+        auth = base64.b64encode(b"bench:bench").decode()
+        automic.connection(url=mock.url, auth=auth, noproxy=True, sslverify=False)
+        before = mock.state.connections
+        old = run(lambda n: automic.usageObject(client_id=CLIENT, object_name=n), names, args.workers)
+        old_conns = mock.state.connections - before
+
+        session = get_session('mock', CLIENT, 'bench', 'bench', pool_size=args.workers, base_url=mock.url)
+        before = mock.state.connections
+        new = run(session.usage, names, args.workers)
+        new_conns = mock.state.connections - before
+        close_sessions()
+
+    print(f"{'path':<22}{'seconds':>10}{'calls/s':>10}{'TLS conns':>11}")
+    print(f"{'automic_rest globals':<22}{old:>10.2f}{args.calls / old:>10.0f}{old_conns:>11}")
+    print(f"{'pooled session':<22}{new:>10.2f}{args.calls / new:>10.0f}{new_conns:>11}")
+    print(f"speed-up: {old / new:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""Import-time profile and cold-start check of the Tk app.
+
+Loads `# Ultimate Tool.py` in a fresh interpreter under `-X importtime`,
+prints the slowest top-level imports and fails when a heavy dependency is
+imported at start-up or launch takes longer than the budget. With a display
+(or --window) it also builds the main window and times it up to the first
+drawn frame.
+
+    python benchmarks/import_profile.py
+    python benchmarks/import_profile.py --window --write benchmarks/import_profile.txt
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, '# Ultimate Tool.py')
+
+# Must stay out of start-up: imported on first use instead
+HEAVY = ('pandas', 'numpy', 'openpyxl', 'requests', 'urllib3', 'aiohttp', 'automic_rest')
+
+CHILD = r'''
+import json, sys, time
+started = time.perf_counter()
+import importlib.util
+spec = importlib.util.spec_from_file_location('ultimate_tool', sys.argv[1])
+app = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(app)
+result = {'import_s': time.perf_counter() - started}
+if sys.argv[2] == '1':
+    root = app.tk.Tk()
+    app.AutomicToolsApp(root)
+    root.update()
+    result['window_s'] = time.perf_counter() - started
+    root.destroy()
+result['modules'] = sorted(sys.modules)
+print(json.dumps(result))
+'''
+
+
+def run_child(window, importtime=False):
+    cmd = [sys.executable] + (['-X', 'importtime'] if importtime else []) + ['-c', CHILD, APP, '1' if window else '0']
+    started = time.perf_counter()
+    proc = subprocess.run(cmd, cwd=ROOT, capture_output=True, text=True)
+    wall = time.perf_counter() - started
+    if proc.returncode:
+        sys.exit(proc.stderr)
+    return json.loads(proc.stdout.strip().splitlines()[-1]), proc.stderr, wall
+
+
+def parse_importtime(stderr):
+    """(cumulative_us, self_us, module) for every top-level import."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative, name = line[len('import time:'):].split('|')
+        if not name.startswith('  '):  # nested imports are indented further
+            rows.append((int(cumulative), int(self_us), name.strip()))
+    return sorted(rows, reverse=True)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--window', action='store_true', default=bool(os.environ.get('DISPLAY')) or sys.platform == 'win32',
+                    help='also build the main window (needs a display)')
+    ap.add_argument('--top', type=int, default=15)
+    ap.add_argument('--budget-ms', type=float, default=1000, help='fail when launch takes longer')
+    ap.add_argument('--write', metavar='PATH', help='also save the report to PATH')
+    args = ap.parse_args()
+
+    profile, stderr, _ = run_child(False, importtime=True)
+    timing, _, wall = run_child(args.window)
+    rows = parse_importtime(stderr)
+
+    lines = [f"{'cumulative ms':>13}  {'self ms':>8}  module"]
+    lines += [f"{c / 1000:13.1f}  {s / 1000:8.1f}  {name}" for c, s, name in rows[:args.top]]
+    lines.append('')
+    lines.append(f"app import: {timing['import_s'] * 1000:.0f} ms")
+    if 'window_s' in timing:
+        lines.append(f"window drawn: {timing['window_s'] * 1000:.0f} ms")
+    lines.append(f"process wall time: {wall * 1000:.0f} ms (interpreter start-up included)")
+    heavy = [m for m in HEAVY if m in profile['modules']]
+    lines.append(f"heavy modules at start-up: {', '.join(heavy) or 'none'}")
+    report = '\n'.join(lines)
+    print(report)
+    if args.write:
+        with open(args.write, 'w') as f:
+            f.write(f"Python {sys.version.split()[0]} on {sys.platform}\n\n{report}\n")
+
+    launch = timing.get('window_s', timing['import_s']) * 1000
+    if heavy or launch > args.budget_ms:
+        sys.exit(f"FAIL: launch {launch:.0f} ms (budget {args.budget_ms:.0f} ms), heavy modules: {heavy or 'none'}")
+
+
+if __name__ == '__main__':
+    main()
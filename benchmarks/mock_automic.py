@@ -0,0 +1,352 @@
+"""Minimal stand-in for the Automic REST endpoints the tools call.
+
+Run directly to serve on a local port, or use `MockAutomic` from a
+benchmark. Counts accepted TCP connections so keep-alive reuse is visible.
+
+Every answer can be delayed (`latency` seconds, plus up to `jitter` more),
+a share of requests refused with 503 (`error_rate`) or 429
+(`throttle_rate`) before they touch any state, and each client can start
+out holding `objects` existing JOBS with one execution each, named
+MOCK_JOBS_<n> in folder MOCK/DATA. Usage lookups return `refs` references.
+Like Automic, an object still listed in a jobplan cannot be deleted, and
+every object carries a `date_modified` (also in search results) that
+changes whenever it is posted again.
+
+    python benchmarks/mock_automic.py --no-tls --latency 0.05 --error-rate 0.01 --objects 10000
+"""
+import argparse
+import fnmatch
+import json
+import os
+import random
+import re
+import ssl
+import subprocess
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+CLIENT_RE = re.compile(r'^/ae/api/v1/(\d+)/')
+OBJECT_RE = re.compile(r'^/ae/api/v1/(\d+)/objects/([^/]+)$')
+USAGE_RE = re.compile(r'^/ae/api/v1/(\d+)/objects/([^/]+)/usage$')
+POST_RE = re.compile(r'^/ae/api/v1/(\d+)/objects$')
+EXEC_RE = re.compile(r'^/ae/api/v1/(\d+)/executions$')
+SEARCH_RE = re.compile(r'^/ae/api/v1/(\d+)/search$')
+
+
+def make_template(name, kind):
+    if kind == 'jobp':
+        defs = [
+            {'line_number': 1, 'object_type': '<START>', 'object_name': 'START', 'row': 1, 'column': 1},
+            {'line_number': 2, 'object_type': 'JOBS', 'object_name': name.replace('JOBP', 'JOBS'), 'row': 1, 'column': 2, 'predecessors': 1},
+            {'line_number': 3, 'object_type': '<END>', 'object_name': 'END', 'row': 1, 'column': 3, 'predecessors': 1},
+        ]
+        return {'general_attributes': {'name': name, 'type': 'JOBP'}, 'workflow_definitions': defs, 'line_conditions': []}
+    return {
+        'general_attributes': {'name': name, 'type': 'JOBS'},
+        'scripts': [{'process': [":PUT_ATT LOGIN='LOGIN_R3_060_SY-BATCH-PM'", "R3_ACTIVATE_REPORT REPORT='X'"]}],
+    }
+
+
+def modified_now():
+    return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+
+
+class MockState:
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, throttle_rate=0.0, objects=0, refs=2, seed=None):
+        self.clients = {}
+        self.connections = 0
+        self.requests = 0
+        self.injected = {}  # status -> requests refused on purpose
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.objects = objects
+        self.refs = refs
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def client(self, client_id):
+        """The objects of one client, holding `objects` existing JOBS at first."""
+        with self.lock:
+            if client_id not in self.clients:
+                self.clients[client_id] = MockClient(self.lock)
+                self.clients[client_id].populate(self.objects)
+            return self.clients[client_id]
+
+    def delay(self):
+        with self.lock:
+            extra = self.random.random() * self.jitter if self.jitter else 0.0
+        if self.latency or extra:
+            time.sleep(self.latency + extra)
+
+    def injected_status(self):
+        """503 or 429 for a request picked to fail, else None."""
+        if not (self.error_rate or self.throttle_rate):
+            return None
+        with self.lock:
+            draw = self.random.random()
+            status = 503 if draw < self.error_rate else 429 if draw < self.error_rate + self.throttle_rate else None
+            if status:
+                self.injected[status] = self.injected.get(status, 0) + 1
+        return status
+
+
+class MockClient:
+    def __init__(self, lock):
+        self.objects = {}
+        self.folders = {}  # object name -> folder path it was posted to
+        self.executions = []  # newest last; one run per created object
+        self.used_by = {}  # object name -> jobplans listing it
+        self.lock = lock
+
+    def store(self, obj, folder):
+        """Add or replace `obj`, stamping its date_modified; the caller holds the lock."""
+        name = obj['general_attributes']['name']
+        obj['general_attributes']['date_modified'] = modified_now()
+        self.unlink(name)
+        self.objects[name] = obj
+        self.folders[name] = folder
+        for node in obj.get('workflow_definitions', []):
+            self.used_by.setdefault(node.get('object_name'), set()).add(name)
+        self.executions.append({
+            'run_id': 1000 + len(self.executions), 'name': name,
+            'type': obj['general_attributes'].get('type', 'JOBS'),
+            'start_time': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+        })
+
+    def unlink(self, name):
+        for node in self.objects.get(name, {}).get('workflow_definitions', []):
+            self.used_by.get(node.get('object_name'), set()).discard(name)
+
+    def delete(self, name):
+        """HTTP status and error for deleting `name`."""
+        with self.lock:
+            if name not in self.objects:
+                return 404, {'code': 20399, 'error': 'Object not found'}
+            users = sorted(self.used_by.get(name) or ())
+            if users:
+                return 400, {'code': 45070, 'error': f'Object {name} is used by {users[0]}'}
+            self.unlink(name)
+            del self.objects[name]
+            self.folders.pop(name, None)
+        return 200, None
+
+    def populate(self, count, folder='MOCK/DATA'):
+        """Add `count` existing JOBS named MOCK_JOBS_<n>, each run once."""
+        started = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+        for i in range(count):
+            name = f"MOCK_JOBS_{i}"
+            self.objects[name] = make_template(name, 'jobs')
+            self.objects[name]['general_attributes']['date_modified'] = started
+            self.folders[name] = folder
+            self.executions.append({'run_id': 1000 + len(self.executions), 'name': name, 'type': 'JOBS', 'start_time': started})
+
+    def lookup(self, name):
+        """The object called `name`; any name with TEMPLATE in it exists, in TEMPLATES."""
+        with self.lock:
+            obj = self.objects.get(name)
+            if obj is None and 'TEMPLATE' in name:
+                obj = self.objects[name] = make_template(name, 'jobp' if 'JOBP' in name else 'jobs')
+                obj['general_attributes']['date_modified'] = modified_now()
+                self.folders[name] = 'TEMPLATES'
+        return obj
+
+    def search(self, body):
+        """Objects matching the object_name filter (wildcards allowed), directly
+        in body['folder'] or anywhere without one, paged by max_results/start_at."""
+        folder = body['folder'].strip('/') if 'folder' in body else None
+        pattern = next((f.get('object_name') for f in body.get('filters', []) if f.get('filter_identifier') == 'object_name'), '*')
+        start = int(body.get('start_at') or 0)
+        limit = int(body.get('max_results') or 1000)
+        with self.lock:
+            names = sorted(n for n, f in self.folders.items()
+                           if (folder is None or f.strip('/') == folder) and fnmatch.fnmatchcase(n.upper(), pattern.upper()))
+            data = [{'name': n, 'type': self.objects[n]['general_attributes'].get('type', 'JOBS'),
+                     'folder': '/' + self.folders[n].strip('/'),
+                     'date_modified': self.objects[n]['general_attributes'].get('date_modified')}
+                    for n in names[start:start + limit]]
+        return data, start + limit < len(names)
+
+    def list_executions(self, query):
+        """Newest first, filtered by `name` (wildcards allowed) and paged by `last_run_id`."""
+        params = dict(parse_qsl(query, keep_blank_values=True))
+        # the per-object lookup sends the bare name as the first parameter
+        pattern = params.get('name') or next((k for k, v in params.items() if v == ''), '*')
+        limit = int(params.get('max_results') or 1000)
+        last_run_id = int(params.get('last_run_id') or 0)
+        with self.lock:
+            records = [e for e in reversed(self.executions)
+                       if (not last_run_id or e['run_id'] < last_run_id) and fnmatch.fnmatchcase(e['name'], pattern)]
+        return records[:limit], len(records) > limit
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out as two writes; without TCP_NODELAY the
+    # client's delayed ACK adds ~40 ms to every answer.
+    disable_nagle_algorithm = True
+    state = None
+
+    def log_message(self, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        with self.state.lock:
+            self.state.connections += 1
+
+    def send_json(self, status, payload=None):
+        data = json.dumps(payload).encode() if payload is not None else b''
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def client_for(self, path):
+        m = CLIENT_RE.match(path)
+        return self.state.client(int(m.group(1))) if m else None
+
+    def refuse(self):
+        """Delay the answer, and send an injected failure if one is drawn."""
+        self.state.delay()
+        status = self.state.injected_status()
+        if status:
+            self.send_json(status, {'code': status, 'error': 'Injected by the mock server'})
+        return status
+
+    def do_GET(self):
+        with self.state.lock:
+            self.state.requests += 1
+        if self.refuse():
+            return
+        path = urlsplit(self.path).path
+        client = self.client_for(path)
+        m = USAGE_RE.match(path)
+        if m:
+            name = unquote(m.group(2))
+            refs = [{'name': f"{name}_REF{i}", 'type': 'JOBP', 'folderpath': '/MOCK', 'lastmodified': '2024-01-01T00:00:00Z'} for i in range(self.state.refs)]
+            return self.send_json(200, {'references': refs, 'hasmore': False})
+        m = OBJECT_RE.match(path)
+        if m:
+            obj = client.lookup(unquote(m.group(2)))
+            if obj is None:
+                return self.send_json(404, {'code': 20399, 'error': 'Object not found'})
+            kind = obj['general_attributes'].get('type', 'JOBS').lower()
+            return self.send_json(200, {'total': 1, 'data': {kind: obj}, 'client': int(m.group(1)), 'hasmore': False})
+        if EXEC_RE.match(path):
+            data, hasmore = client.list_executions(urlsplit(self.path).query)
+            return self.send_json(200, {'data': data, 'total': len(data), 'hasmore': hasmore})
+        self.send_json(404, {'error': 'unknown endpoint'})
+
+    def do_POST(self):
+        with self.state.lock:
+            self.state.requests += 1
+        length = int(self.headers.get('Content-Length') or 0)
+        body = json.loads(self.rfile.read(length) or b'{}')
+        if self.refuse():
+            return
+        url = urlsplit(self.path)
+        client = self.client_for(url.path)
+        if SEARCH_RE.match(url.path):
+            data, hasmore = client.search(body)
+            return self.send_json(200, {'data': data, 'total': len(data), 'hasmore': hasmore})
+        if not POST_RE.match(url.path):
+            return self.send_json(404, {'error': 'unknown endpoint'})
+        overwrite = 'overwrite_existing_objects=true' in url.query
+        data = body.get('data') or {}
+        # One object is sent as {kind: obj}, several as [{kind: obj}, ...]
+        objs = [obj for entry in (data if isinstance(data, list) else [data]) for obj in entry.values()]
+        # An import is all or nothing; names containing INVALID are refused
+        invalid = next((o['general_attributes']['name'] for o in objs if 'INVALID' in o['general_attributes']['name']), None)
+        if invalid is not None:
+            return self.send_json(400, {'code': 45100, 'error': f'Object {invalid} is invalid'})
+        with client.lock:
+            clash = next((o['general_attributes']['name'] for o in objs
+                          if not overwrite and o['general_attributes']['name'] in client.objects), None)
+            if clash is None:
+                for obj in objs:
+                    client.store(obj, body.get('path') or '')
+        if clash is not None:
+            return self.send_json(400, {'code': 45134, 'error': f'Object {clash} already exists'})
+        # Automic answers a successful import with an empty body
+        self.send_json(200)
+
+
+    def do_DELETE(self):
+        with self.state.lock:
+            self.state.requests += 1
+        if self.refuse():
+            return
+        path = urlsplit(self.path).path
+        m = OBJECT_RE.match(path)
+        if not m:
+            return self.send_json(404, {'error': 'unknown endpoint'})
+        status, payload = self.client_for(path).delete(unquote(m.group(2)))
+        self.send_json(status, payload)
+
+
+def self_signed_context(workdir):
+    cert = os.path.join(workdir, 'cert.pem')
+    key = os.path.join(workdir, 'key.pem')
+    subprocess.run(
+        ['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '1',
+         '-subj', '/CN=localhost', '-keyout', key, '-out', cert],
+        check=True, capture_output=True)
+    ctx = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    ctx.load_cert_chain(cert, key)
+    return ctx
+
+
+class MockAutomic:
+    """Runs the mock server on a background thread: `with MockAutomic() as m: m.url`."""
+
+    def __init__(self, port=0, tls=True, **settings):
+        """`settings` go to MockState: latency, jitter, error_rate, throttle_rate, objects, refs, seed."""
+        self.state = MockState(**settings)
+        handler = type('BoundHandler', (Handler,), {'state': self.state})
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+        self.server.daemon_threads = True
+        self.scheme = 'http'
+        if tls:
+            self._tmp = tempfile.TemporaryDirectory()
+            ctx = self_signed_context(self._tmp.name)
+            self.server.socket = ctx.wrap_socket(self.server.socket, server_side=True, do_handshake_on_connect=False)
+            self.scheme = 'https'
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        return f"{self.scheme}://127.0.0.1:{self.server.server_address[1]}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--port', type=int, default=8443)
+    ap.add_argument('--no-tls', action='store_true')
+    ap.add_argument('--latency', type=float, default=0.0, help='seconds added to every answer')
+    ap.add_argument('--jitter', type=float, default=0.0, help='up to this many seconds more, at random')
+    ap.add_argument('--error-rate', type=float, default=0.0, help='share of requests answered 503')
+    ap.add_argument('--throttle-rate', type=float, default=0.0, help='share of requests answered 429')
+    ap.add_argument('--objects', type=int, default=0, help='existing JOBS per client (MOCK_JOBS_<n>)')
+    ap.add_argument('--refs', type=int, default=2, help='references per usage lookup')
+    ap.add_argument('--seed', type=int, help='seed for jitter and injected failures')
+    args = ap.parse_args()
+    with MockAutomic(port=args.port, tls=not args.no_tls, latency=args.latency, jitter=args.jitter,
+                     error_rate=args.error_rate, throttle_rate=args.throttle_rate, objects=args.objects,
+                     refs=args.refs, seed=args.seed) as mock:
+        print(f"Mock Automic listening on {mock.url}")
+        mock.thread.join()
@@ -0,0 +1,31 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT, os.path.join(ROOT, 'benchmarks')]
+
+from automic_session import AutomicSession  # noqa: E402
+from mock_automic import MockAutomic  # noqa: E402
+
+CLIENT = 1001
+
+
+@pytest.fixture
+def mock():
+    with MockAutomic(tls=False) as server:
+        yield server
+
+
+@pytest.fixture
+def session(mock):
+    session = AutomicSession('eup6', CLIENT, 'TEST', 'secret', base_url=mock.url)
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def server_objects(mock):
+    """The mock's objects for the test client, by name."""
+    return mock.state.client(CLIENT).objects
@@ -0,0 +1,102 @@
+import threading
+
+from automic_bulk import BulkCreator
+from automic_journal import RunJournal
+
+FOLDER = 'TEST/BULK'
+
+
+def make_pairs(*jobnames):
+    return [{'jobname': jn, 'program': f"PROG_{jn}", 'variant': 'VAR'} for jn in jobnames]
+
+
+def make_creator(session, **kwargs):
+    creator = BulkCreator(session, FOLDER, log=lambda msg: None, max_workers=1, **kwargs)
+    creator.load_templates('JOBS.TEST.TEMPLATE', 'JOBP.TEST.TEMPLATE')
+    return creator
+
+
+def record_posts(session):
+    """Wrap session.post_objects; returns the list of object counts it was called with."""
+    sizes = []
+    post_objects = session.post_objects
+
+    def counted(body, query=None):
+        sizes.append(body['total'])
+        return post_objects(body, query)
+    session.post_objects = counted
+    return sizes
+
+
+def by_name(results):
+    return {r.name: r for r in results}
+
+
+def test_batch_split_isolates_the_refused_object(session, server_objects):
+    creator = make_creator(session, batch_size=8)
+    sizes = record_posts(session)
+    pairs = make_pairs('J0', 'J1', 'J2', 'INVALID3', 'J4', 'J5', 'J6', 'J7')
+    results = by_name(creator.run(pairs))
+
+    bad_jobs, bad_jobp = creator.names_for(pairs[3])
+    # 8 JOBS refused; the half holding INVALID3 is split down to it, the other half goes
+    # through whole; then one post for the 7 JOBP of the pairs that got through
+    assert sizes == [8, 4, 2, 2, 1, 1, 4, 7]
+    assert not results[bad_jobs].ok and results[bad_jobs].status == 400
+    assert results[bad_jobp].status == 'skipped'
+    assert bad_jobs not in server_objects and bad_jobp not in server_objects
+    for p in pairs[:3] + pairs[4:]:
+        for name in creator.names_for(p):
+            assert results[name].ok and name in server_objects
+
+
+def test_failed_jobs_skips_its_jobplan(session, server_objects):
+    creator = make_creator(session)
+    sizes = record_posts(session)
+    pairs = make_pairs('J0', 'INVALID1', 'J2')
+    results = by_name(creator.run(pairs, precheck=False))
+
+    bad_jobs, bad_jobp = creator.names_for(pairs[1])
+    assert results[bad_jobs].status == 400
+    assert results[bad_jobp].status == 'skipped'
+    assert len(sizes) == 5  # 3 JOBS, 2 JOBP
+    assert bad_jobp not in server_objects
+    assert creator.jobps_list == [creator.names_for(pairs[0])[1], creator.names_for(pairs[2])[1]]
+
+
+def test_resume_after_cancel(session, server_objects, tmp_path):
+    pairs = make_pairs(*(f"J{i}" for i in range(30)))
+    journal = RunJournal.start({'folder': FOLDER, 'main_name': 'MAIN_TEST'}, str(tmp_path))
+    stop = threading.Event()
+    posted = []
+
+    def on_result(result):
+        posted.append(result)
+        if len(posted) == 10:
+            stop.set()
+    creator = make_creator(session, journal=journal, on_result=on_result)
+    creator.run(pairs, main_name='MAIN_TEST', cancelled=stop.is_set)
+    journal.close()
+
+    first = RunJournal(journal.path)
+    assert first.cancelled_at
+    assert len(first.recorded_pairs()) == 30  # pairs read after the cancel are journaled too
+    assert 0 < len(first.outstanding()) < 30
+    assert first.partial() == {'MAIN_TEST'}
+    assert 'MAIN_TEST' in server_objects
+
+    done = first.created()
+    sizes = record_posts(session)
+    resumed = make_creator(session, journal=first)
+    resumed.run(first.recorded_pairs(), main_name='MAIN_TEST', done=done, rebuild=first.partial())
+    first.close()
+
+    again = RunJournal(journal.path)
+    assert again.outstanding() == []
+    assert again.partial() == set()
+    assert resumed.main_result.ok and resumed.main_result.status == 'updated'
+    # Nothing created by the first run is posted again
+    assert len(sizes) == 60 - len(done) + 1
+    main = server_objects['MAIN_TEST']
+    nodes = {wf['object_name'] for wf in main['workflow_definitions']}
+    assert {resumed.names_for(p)[1] for p in pairs} <= nodes
@@ -0,0 +1,61 @@
+from automic_limits import AdaptiveLimiter
+
+
+def finish(limiter, latency, status=200, kind='GET'):
+    limiter.acquire()
+    limiter.release(latency, status, kind)
+
+
+def test_limit_grows_by_about_one_per_round():
+    limiter = AdaptiveLimiter(max_limit=8, initial=2)
+    for _ in range(2):
+        finish(limiter, 0.01)
+    assert 2.8 < limiter.limit < 3.0
+    for _ in range(100):
+        finish(limiter, 0.01)
+    assert limiter.limit == 8
+    assert limiter.throttled == 0
+
+
+def test_throttle_and_errors_halve_the_limit():
+    limiter = AdaptiveLimiter(max_limit=8, initial=8)
+    finish(limiter, 0.0, 429)
+    assert limiter.limit == 4
+    finish(limiter, 0.0, 503)
+    assert limiter.limit == 2
+    finish(limiter, 0.0, None)  # the request raised
+    assert limiter.limit == 1
+    finish(limiter, 0.0, 429)
+    assert limiter.limit == limiter.min_limit
+    assert limiter.throttled == 4
+
+
+def test_one_back_off_per_round_trip():
+    limiter = AdaptiveLimiter(max_limit=8, initial=8)
+    # A burst of failures answered within one latency counts once
+    for _ in range(5):
+        finish(limiter, 10.0, 503)
+    assert limiter.limit == 4
+    assert limiter.throttled == 1
+
+
+def test_slow_replies_back_off_per_kind():
+    limiter = AdaptiveLimiter(max_limit=8, initial=4)
+    finish(limiter, 0.01, kind='GET')
+    finish(limiter, 0.5, kind='POST')  # slower, but the first of its kind
+    assert limiter.limit > 4
+    assert set(limiter.baselines) == {'GET', 'POST'}
+    before = limiter.limit
+    finish(limiter, 0.5, kind='GET')  # 50 times the GET baseline
+    assert limiter.limit == before / 2
+    assert limiter.baselines['GET'] < 0.02
+
+
+def test_acquire_waits_for_the_limit():
+    limiter = AdaptiveLimiter(max_limit=8, initial=2)
+    limiter.acquire()
+    limiter.acquire()
+    assert limiter.in_flight == 2
+    assert not limiter._take_slot()
+    limiter.release(0.01, 200)
+    assert limiter._take_slot()
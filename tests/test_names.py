@@ -0,0 +1,42 @@
+from automic_names import NameChecker, describe_rejected, name_rules_for
+
+
+def checker(**rules):
+    return NameChecker({**name_rules_for(1001), **rules})
+
+
+def test_accepts_valid_names():
+    names = checker()
+    assert names.check(['JOBS.A_1', 'JOBP.A_1']) is None
+    assert names.check(['jobs.b$@#-', 'JOBP.B']) is None
+    assert names.seen == {'JOBS.A_1': 1, 'JOBP.A_1': 1, 'JOBS.B$@#-': 2, 'JOBP.B': 2}
+
+
+def test_rejects_bad_names():
+    names = checker(max_length=10)
+    assert names.check(['JOBS.A', 'JOBP.TOO_LONG_1']) == "JOBP.TOO_LONG_1: longer than 10 characters (15)"
+    assert names.check(['JOBS A/B', 'JOBP.B']) == "JOBS A/B: invalid characters ' /'"
+    assert names.check(['', 'JOBP.C']) == ": empty name"
+    assert names.seen == {}
+
+
+def test_rejects_duplicates_case_insensitively():
+    names = checker()
+    assert names.check(['JOBS.A', 'JOBP.A']) is None
+    assert names.check(['jobs.a', 'JOBP.B']) == "jobs.a: same name as line 1"
+    assert names.check(['JOBS.C', 'JOBS.C']) == "JOBS.C: same name as line 3"
+    # A refused pair does not claim its names
+    assert names.check(['JOBS.C', 'JOBP.B']) is None
+
+
+def test_rejects_names_existing_elsewhere():
+    names = checker()
+    existing = {'JOBP.A': '/OTHER/FOLDER'}
+    assert names.check(['JOBS.A', 'jobp.a'], existing) == "jobp.a: already exists in /OTHER/FOLDER"
+    assert names.check(['JOBS.A', 'JOBP.B'], existing) is None
+
+
+def test_describe_rejected():
+    rejected = [(None, [], "A: longer than 10 characters (15)"), (None, [], "B: same name as line 1"),
+                (None, [], "C: same name as line 2"), (None, [], "D: already exists in /X")]
+    assert describe_rejected(rejected) == "1 too long, 2 duplicate, 1 existing elsewhere"
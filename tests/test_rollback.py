@@ -0,0 +1,57 @@
+from automic_journal import RunJournal
+from automic_rollback import Rollback, rollback_units
+
+from test_bulk import FOLDER, make_creator, make_pairs
+
+
+def created_run(session, tmp_path, count=10, fan_out=4):
+    """Journal of a run that created `count` pairs under a split main jobplan."""
+    journal = RunJournal.start({'folder': FOLDER, 'main_name': 'MAIN_TEST'}, str(tmp_path))
+    creator = make_creator(session, journal=journal)
+    creator.run(make_pairs(*(f"J{i}" for i in range(count))), main_name='MAIN_TEST', fan_out=fan_out)
+    assert creator.sub_results and all(r.ok for r in creator.sub_results)
+    journal.close()
+    return RunJournal(journal.path), creator
+
+
+def test_rollback_units_order(session, tmp_path):
+    journal, creator = created_run(session, tmp_path)
+    head, pairs = rollback_units(journal)
+
+    assert head[0][1] == 'MAIN_TEST'
+    # Sub-jobplans newest first, so none is deleted while a later one still lists it
+    assert [name for _, name, _ in head[1:]] == [r.name for r in reversed(creator.sub_results)]
+    assert [[kind for kind, _, _ in unit] for unit in pairs] == [['JOBP', 'JOBS']] * 10
+
+
+def test_rollback_deletes_everything_in_order(session, server_objects, tmp_path):
+    journal, creator = created_run(session, tmp_path)
+    deleted = []
+    rollback = Rollback(session, journal, log=lambda msg: None, on_result=deleted.append)
+    results = rollback.run()
+
+    # The mock refuses to delete an object a remaining jobplan lists
+    assert results and all(r.ok for r in results)
+    names = [r.name for r in deleted]
+    subs = {r.name for r in creator.sub_results}
+    assert names[0] == 'MAIN_TEST'
+    assert set(names[1:1 + len(subs)]) == subs
+    for jobs, jobp in zip(creator.jobs_list, creator.jobps_list):
+        assert names.index(jobp) < names.index(jobs)
+    assert not set(names) & set(server_objects)
+    assert rollback.verify() == []
+    journal.close()
+    assert RunJournal(journal.path).posted == {}
+
+
+def test_rollback_keeps_pairs_when_a_jobplan_stays(mock, session, server_objects, tmp_path):
+    journal, creator = created_run(session, tmp_path)
+    # Another jobplan now lists the newest sub-jobplan, so it cannot be deleted
+    blocker = creator.sub_results[-1].name
+    mock.state.client(session.client_id).used_by[blocker].add('OTHER_JOBP')
+    results = Rollback(session, journal, log=lambda msg: None).run()
+
+    assert [(r.name, r.ok) for r in results[:2]] == [('MAIN_TEST', True), (blocker, False)]
+    assert all(r.status == 'skipped' for r in results[2:])  # the older sub-jobplans
+    assert set(creator.jobs_list + creator.jobps_list) <= set(server_objects)
+    journal.close()
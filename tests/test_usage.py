@@ -0,0 +1,64 @@
+from types import SimpleNamespace
+
+from automic_usage import ExecutionResolver
+
+
+def page(*records, hasmore=None, ok=True):
+    response = {'data': [{'name': name, 'run_id': run_id, 'start_time': start} for name, run_id, start in records]}
+    if hasmore is not None:
+        response['hasmore'] = hasmore
+    return SimpleNamespace(ok=ok, response=response)
+
+
+def resolver(page_size=3):
+    return ExecutionResolver(session=None, page_size=page_size, log=lambda msg: None)
+
+
+def test_absorb_keeps_the_newest_run_and_reports_new_names():
+    executions = resolver()
+    wanted, found, reported = {'A', 'B', 'C'}, {}, []
+    res = page(('A', 30, '2026-01-03T00:00:00Z'), ('X', 29, '2026-01-02T00:00:00Z'), ('A', 28, '2026-01-01T00:00:00Z'))
+    assert executions._absorb(res, wanted, found, reported.append) == (False, False, 28)
+    assert found == {'A': '2026-01-03 00:00:00'}
+    assert reported == [{'A': '2026-01-03 00:00:00'}]
+
+    res = page(('A', 27, '2025-12-31T00:00:00Z'), ('B', 26, '2025-12-30T00:00:00Z'), ('B', 25, '2025-12-29T00:00:00Z'))
+    assert executions._absorb(res, wanted, found, reported.append) == (False, False, 25)
+    assert found['A'] == '2026-01-03 00:00:00'
+    assert reported[-1] == {'B': '2025-12-30 00:00:00'}
+    assert executions.requests == 2
+
+
+def test_absorb_finishes_once_every_name_is_found():
+    executions = resolver()
+    found = {}
+    res = page(('A', 2, '2026-01-02T00:00:00Z'), ('B', 1, '2026-01-01T00:00:00Z'), ('C', 0, '2026-01-01T00:00:00Z'))
+    assert executions._absorb(res, {'A', 'B'}, found) == (True, False, None)
+    assert set(found) == {'A', 'B'}
+
+
+def test_absorb_stops_at_the_end_of_the_list():
+    executions = resolver()
+    # A short page, or hasmore false, means the history is exhausted
+    assert executions._absorb(page(('A', 5, '2026-01-01T00:00:00Z')), {'A', 'B'}, {}) == (True, True, None)
+    full = page(('X', 3, '2026-01-01T00:00:00Z'), ('Y', 2, '2026-01-01T00:00:00Z'), ('Z', 1, '2026-01-01T00:00:00Z'),
+                hasmore=False)
+    assert executions._absorb(full, {'A'}, {}) == (True, True, None)
+    assert executions._absorb(page(), {'A'}, {}) == (True, True, None)
+
+
+def test_absorb_gives_up_on_a_failed_page():
+    found = {}
+    assert resolver()._absorb(page(ok=False), {'A'}, found) == (True, False, None)
+    assert found == {}
+
+
+def test_resolve_against_the_mock(mock, session):
+    mock.state.objects = 8
+    names = [f"MOCK_JOBS_{i}" for i in range(8)] + ['NEVER_RAN']
+    reported = {}
+    executions = ExecutionResolver(session, page_size=5, log=lambda msg: None)
+    result = executions.resolve(names, on_found=reported.update)
+    assert result['NEVER_RAN'] == 'N/A'
+    assert all(result[name] not in ('N/A', 'Error') for name in names[:8])
+    assert reported == {name: result[name] for name in names[:8]}